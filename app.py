@@ -1,10 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import bisect
+import functools
+import heapq
+import html
+import itertools
+import json
 import os
+import pickle
+import random
+import re
 import requests
-import schedule
+import sqlite3
+from requests.adapters import HTTPAdapter
 import time
 import threading
-from datetime import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 import pytz
 import yfinance as yf
 from bs4 import BeautifulSoup
@@ -20,6 +35,8 @@ _scheduler_started = False
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
+# Boleh lebih dari satu chat, dipisah koma: "12345,-100987654"
+TELEGRAM_CHAT_IDS = [chat.strip() for chat in TELEGRAM_CHAT_ID.split(",") if chat.strip()]
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "")
 SECTORS_API_KEY = os.getenv("SECTORS_API_KEY", "")
 
@@ -28,33 +45,1156 @@ WIB = pytz.timezone("Asia/Jakarta")
 # Konstanta untuk konversi USD ke IDR (update manual atau gunakan API)
 USD_TO_IDR = 15800  # Rata-rata kurs USD ke IDR
 
-def send_telegram_message(text):
-    """Mengirim pesan ke Telegram"""
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        error_msg = "TELEGRAM_BOT_TOKEN atau TELEGRAM_CHAT_ID belum diset!"
-        print(f"⚠️ {error_msg}")
-        return False, error_msg
+# ================== METRICS ==================
+
+# Bucket histogram latency (detik)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def _format_labels(labels):
+    """Format tuple (name, value) ke {name="value",...} Prometheus"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+class Counter:
+    """Counter monotonic dengan label (format Prometheus)"""
     
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": text,
-        "parse_mode": "HTML"
-    }
+    type_name = "counter"
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+    
+    def _key(self, labels):
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def value(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+    
+    def render(self):
+        with self.lock:
+            items = list(self.values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+class Histogram:
+    """Histogram latency dengan label; observe O(log bucket)"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}  # key -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+    
+    def observe(self, value, **labels):
+        key = tuple((name, labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+    
+    def render(self):
+        with self.lock:
+            items = [(key, list(series)) for key, series in self.values.items()]
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+class timed:
+    """
+    Ukur durasi ke Histogram, bisa sebagai context manager atau decorator
+    
+        with timed(TELEGRAM_SEND_SECONDS): ...
+        @timed(INDICATOR_COMPUTE_SECONDS)
+    
+    failures (Counter, optional) di-increment jika blok/fungsi raise exception.
+    """
+    
+    def __init__(self, histogram, failures=None, **labels):
+        self.histogram = histogram
+        self.failures = failures
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None and self.failures is not None:
+            self.failures.inc(**self.labels)
+        return False
+    
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if self.failures is not None:
+                    self.failures.inc(**self.labels)
+                raise
+            finally:
+                self.histogram.observe(time.perf_counter() - start, **self.labels)
+        return wrapper
+
+class MetricsRegistry:
+    """Registry metric + collector callback (dipanggil saat scrape) untuk exposition /metrics"""
+    
+    def __init__(self, prefix="hybridscalper_"):
+        self.prefix = prefix
+        self.metrics = []
+        self.collectors = []
+    
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(self.prefix + name, documentation, labelnames)
+        self.metrics.append(metric)
+        return metric
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(self.prefix + name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+    
+    def register_collector(self, func):
+        """func() -> iterable (name, type, documentation, [(labels dict, value), ...])"""
+        self.collectors.append(func)
+        return func
+    
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"⚠️ Metrics collector {collector.__name__} error: {e}")
+                continue
+            for name, type_name, documentation, samples in families:
+                lines.append(f"# HELP {self.prefix}{name} {documentation}")
+                lines.append(f"# TYPE {self.prefix}{name} {type_name}")
+                lines.extend(f"{self.prefix}{name}{_format_labels(tuple(labels.items()))} {value}"
+                             for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+UPSTREAM_REQUEST_SECONDS = metrics.histogram(
+    "upstream_request_duration_seconds", "Latency request HTTP ke upstream per attempt", ("host", "status"))
+UPSTREAM_FAILURES = metrics.counter(
+    "upstream_failures_total", "Request upstream gagal (connection error / status >= 400)", ("host", "reason"))
+SCREENING_SOURCE_SECONDS = metrics.histogram(
+    "screening_source_duration_seconds", "Durasi fetch per tier screening", ("market", "source", "outcome"))
+SCREENING_TIER_WINS = metrics.counter(
+    "screening_tier_wins_total", "Tier screening yang menang per cycle", ("market", "source"))
+INDICATOR_COMPUTE_SECONDS = metrics.histogram(
+    "indicator_compute_duration_seconds", "Durasi compute indikator teknikal (vectorized engine)")
+CRYPTO_ENRICHMENT_SECONDS = metrics.histogram(
+    "crypto_enrichment_duration_seconds", "Durasi analisis + enrichment per coin")
+TELEGRAM_SEND_SECONDS = metrics.histogram(
+    "telegram_send_duration_seconds", "Latency kirim pesan Telegram")
+TELEGRAM_MESSAGES = metrics.counter(
+    "telegram_messages_total", "Pesan Telegram per hasil", ("outcome",))
+WEBHOOK_ALERTS = metrics.counter(
+    "webhook_alerts_total", "Alert webhook TradingView per hasil", ("outcome",))
+STREAM_ALERT_LATENCY_SECONDS = metrics.histogram(
+    "stream_alert_latency_seconds", "Waktu dari pesan stream crypto yang memicu alert sampai masuk outbox Telegram")
+JOB_DURATION_SECONDS = metrics.histogram(
+    "job_duration_seconds", "Durasi job alert end-to-end", ("job",))
+JOB_FAILURES = metrics.counter(
+    "job_failures_total", "Job alert yang raise exception", ("job",))
+
+# ================== HTTP CLIENT ==================
+
+# Rate limit per upstream host: (kapasitas burst, token per detik)
+# Multi-worker: bucket disimpan di shared_state, jadi limit berlaku untuk semua worker bersama
+HTTP_RATE_LIMITS = {
+    "api.coingecko.com": (30, 30 / 60),       # Free tier: 30 calls/min
+    "api.coinlore.net": (10, 1),              # Rekomendasi: 1 request/detik
+    "www.alphavantage.co": (5, 5 / 60),       # Free tier: 5 calls/min
+    "api.telegram.org": (30, 30),             # Global: ~30 pesan/detik
+    "fapi.binance.com": (40, 40),             # 2400 weight/min
+    "api.alternative.me": (10, 1),
+    "api.sectors.app": (10, 1),
+    "www.idx.co.id": (5, 1)
+}
+
+# Status HTTP yang layak di-retry
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class RateLimitTimeout(requests.RequestException):
+    """Token rate limit tidak tersedia dalam batas waktu tunggu"""
+
+class TokenBucket:
+    """
+    Token bucket thread-safe untuk rate limiting per host
+    
+    shared_key: jika shared_state aktif (multi-worker), state bucket disimpan di sana dengan key ini
+    sehingga limit berlaku untuk seluruh deployment, bukan N x limit untuk N worker.
+    """
+    
+    def __init__(self, capacity, rate, shared_key=None):
+        self.capacity = capacity
+        self.rate = rate
+        self.shared_key = shared_key
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+    
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    @property
+    def shared(self):
+        return self.shared_key is not None and shared_state.enabled
+    
+    def _acquire_shared(self, max_wait):
+        wait = shared_state.reserve_token(f"http:{self.shared_key}", self.capacity, self.rate, max_wait)
+        if wait is None:
+            return False
+        with self.lock:
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.wait_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return True
+    
+    def acquire(self, max_wait=30.0):
+        """Ambil satu token, blok sampai tersedia (maks max_wait detik). Return False jika timeout."""
+        if self.shared:
+            return self._acquire_shared(max_wait)
+        deadline = time.monotonic() + max_wait
+        waited = False
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.acquired += 1
+                    if waited:
+                        self.throttled += 1
+                    return True
+                sleep_for = (1 - self.tokens) / self.rate
+            if now + sleep_for > deadline:
+                return False
+            waited = True
+            time.sleep(sleep_for)
+            with self.lock:
+                self.wait_seconds += sleep_for
+    
+    def stats(self):
+        shared = self.shared
+        tokens = shared_state.token_level(f"http:{self.shared_key}", self.capacity, self.rate) if shared else None
+        with self.lock:
+            self._refill(time.monotonic())
+            return {
+                "capacity": self.capacity,
+                "rate_per_sec": round(self.rate, 4),
+                "shared": shared,
+                "tokens_available": round(self.tokens if tokens is None else tokens, 2),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3)
+            }
+
+def _parse_retry_after(value):
+    """Parse header Retry-After (detik atau HTTP-date) ke detik"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(pytz.UTC)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class HttpClient:
+    """
+    HTTP client bersama: connection pool keep-alive per host, retry dengan jittered
+    exponential backoff (menghormati Retry-After), dan token bucket per upstream.
+    
+    Method GET di-retry untuk connection error & status HTTP_RETRY_STATUSES.
+    Method lain (POST) hanya di-retry untuk 429, karena request ditolak sebelum diproses.
+    """
+    
+    def __init__(self, pool_connections=20, pool_maxsize=10, max_retries=3,
+                 backoff_base=0.5, backoff_max=10.0, max_retry_after=30.0, rate_limits=None,
+                 host_overrides=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.adapter = adapter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.limiters = {host: TokenBucket(*limit, shared_key=host) for host, limit in (rate_limits or {}).items()}
+        # host -> base URL pengganti (mis. stub server lokal untuk benchmark)
+        self.host_overrides = dict(host_overrides or {})
+        self.lock = threading.Lock()
+        self.host_stats = {}
+    
+    def _record(self, host, key, amount=1):
+        with self.lock:
+            stats = self.host_stats.setdefault(host, {"requests": 0, "retries": 0, "errors": 0})
+            stats[key] += amount
+    
+    def _backoff(self, attempt):
+        # Full jitter: uniform(0, min(max, base * 2^attempt))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
     
+    def request(self, method, url, **kwargs):
+        """Kirim request dengan rate limit + retry. Return Response terakhir atau raise exception terakhir."""
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        if host in self.host_overrides:
+            url = self.host_overrides[host].rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+        limiter = self.limiters.get(host)
+        idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+        kwargs.setdefault("timeout", 10)
+        # Override per panggilan (mis. outbox Telegram yang menjadwalkan retry sendiri)
+        max_retries = kwargs.pop("max_retries", self.max_retries)
+        
+        for attempt in range(max_retries + 1):
+            if limiter and not limiter.acquire():
+                raise RateLimitTimeout(f"Rate limit {host} penuh")
+            
+            self._record(host, "requests")
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, host=host, status="error")
+                UPSTREAM_FAILURES.inc(host=host, reason=type(e).__name__)
+                self._record(host, "errors")
+                if not idempotent or attempt >= max_retries:
+                    raise
+                self._record(host, "retries")
+                time.sleep(self._backoff(attempt))
+                continue
+            
+            UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, host=host, status=response.status_code)
+            if response.status_code >= 400:
+                UPSTREAM_FAILURES.inc(host=host, reason=f"http_{response.status_code}")
+            
+            retryable = response.status_code == 429 or (idempotent and response.status_code in HTTP_RETRY_STATUSES)
+            if not retryable or attempt >= max_retries:
+                return response
+            
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None and retry_after > self.max_retry_after:
+                return response
+            
+            self._record(host, "retries")
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            response.close()
+            time.sleep(delay)
+        
+        return response
+    
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def pool_stats(self):
+        """Statistik connection pool urllib3: koneksi baru (handshake) vs request yang dilayani"""
+        pools = {}
+        container = self.adapter.poolmanager.pools
+        with container.lock:
+            keys = list(container.keys())
+        for key in keys:
+            pool = container.get(key)
+            if pool is None:
+                continue
+            pools[f"{key.key_scheme}://{key.key_host}"] = {
+                "connections_opened": pool.num_connections,
+                "requests_served": pool.num_requests,
+                "handshakes_saved": max(0, pool.num_requests - pool.num_connections),
+                "idle_connections": sum(1 for conn in pool.pool.queue if conn is not None) if pool.pool else 0
+            }
+        return pools
+    
+    def stats(self):
+        with self.lock:
+            host_stats = {host: dict(stats) for host, stats in self.host_stats.items()}
+        return {
+            "hosts": host_stats,
+            "pools": self.pool_stats(),
+            "rate_limiters": {host: limiter.stats() for host, limiter in self.limiters.items()}
+        }
+
+http_client = HttpClient(rate_limits=HTTP_RATE_LIMITS)
+
+# ================== SHARED STATE ==================
+
+# Store key-value yang dibagi semua worker Gunicorn (default DATA_DIR/shared_state.db)
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH")
+
+def shared_state_configured():
+    """
+    Shared tier hanya berguna jika ada lebih dari satu worker: aktif jika WEB_CONCURRENCY > 1,
+    atau dipaksa lewat SHARED_STATE_ENABLED=1/0 (mis. worker diatur lewat --workers saja)
+    """
+    flag = os.getenv("SHARED_STATE_ENABLED")
+    if flag is not None:
+        return flag == "1"
     try:
-        response = requests.post(url, json=payload, timeout=10)
-        if response.status_code == 200:
-            print(f"✅ Pesan terkirim ke Telegram")
-            return True, "Pesan berhasil dikirim"
+        return int(os.getenv("WEB_CONCURRENCY", "1")) > 1
+    except ValueError:
+        return False
+
+SHARED_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shared_state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS shared_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shared_queue_namespace ON shared_queue (namespace, id);
+CREATE TABLE IF NOT EXISTS shared_token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+class SharedStateStore:
+    """
+    Key-value antar proses di SQLite (WAL), value di-pickle
+    
+    Tier kedua untuk TTLCache dan tempat leader mem-publish snapshot sinyal, sehingga worker
+    lain tidak mengulang fetch upstream. Juga menyimpan token bucket rate limit per host dan
+    antrian FIFO follower -> leader (lihat LeaderRelay). Nonaktif (semua operasi no-op) sampai init_scheduler()
+    menyalakannya untuk deployment multi-worker (shared_state_configured); satu worker atau import
+    tanpa scheduler (mis. benchmark) tetap murni in-process tanpa I/O SQLite.
+    """
+    
+    UNCHANGED = object()
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = False
+        self.local = threading.local()
+        self.errors = 0
+    
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            self.path = self.path or os.path.join(DATA_DIR, "shared_state.db")
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SHARED_STATE_SCHEMA)
+            self.local.conn = conn
+        return conn
+    
+    def _query(self, sql, params=()):
+        try:
+            return self._conn().execute(sql, params).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            print(f"⚠️ Shared state gagal dibaca: {e}")
+            return []
+    
+    def _write(self, sql, params=()):
+        """Return jumlah baris yang berubah, None jika gagal"""
+        try:
+            conn = self._conn()
+            with conn:
+                return conn.execute(sql, params).rowcount
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            print(f"⚠️ Shared state gagal ditulis: {e}")
+            return None
+    
+    def _transaction(self, fn, default):
+        """Jalankan fn(conn) dalam satu transaksi write; BEGIN IMMEDIATE mengunci sejak awal (read-modify-write)"""
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                return fn(conn)
+        except (sqlite3.Error, OSError) as e:
+            self.errors += 1
+            print(f"⚠️ Shared state gagal ditulis: {e}")
+            return default
+    
+    def _dumps(self, namespace, key, value):
+        try:
+            return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"⚠️ Shared state: value {namespace}/{key} tidak bisa di-pickle: {e}")
+            return None
+    
+    def _loads(self, blob):
+        try:
+            return pickle.loads(blob)
+        except Exception as e:
+            # Mis. definisi class berubah antar deploy
+            self.errors += 1
+            print(f"⚠️ Shared state tidak bisa dibaca ulang, diabaikan: {e}")
+            return self.UNCHANGED
+    
+    def get(self, namespace, key, known_at=None):
+        """
+        (updated_at, value) atau None
+        
+        Jika updated_at sama dengan known_at, value = UNCHANGED tanpa unpickle (pembaca yang
+        menyimpan copy lokal cukup membandingkan timestamp).
+        """
+        if not self.enabled:
+            return None
+        rows = self._query("SELECT updated_at, CASE WHEN updated_at = ? THEN NULL ELSE value END "
+                           "FROM shared_state WHERE namespace = ? AND key = ?", (known_at, namespace, key))
+        if not rows:
+            return None
+        updated_at, blob = rows[0]
+        if blob is None:
+            return updated_at, self.UNCHANGED
+        value = self._loads(blob)
+        return None if value is self.UNCHANGED else (updated_at, value)
+    
+    def items(self, namespace):
+        """Semua key -> value dalam namespace"""
+        if not self.enabled:
+            return {}
+        rows = self._query("SELECT key, value FROM shared_state WHERE namespace = ?", (namespace,))
+        values = ((key, self._loads(blob)) for key, blob in rows)
+        return {key: value for key, value in values if value is not self.UNCHANGED}
+    
+    def put(self, namespace, key, value, updated_at=None, replace=True):
+        """Simpan value; replace=False hanya menulis jika key belum ada. Return True jika tertulis."""
+        if not self.enabled:
+            return False
+        blob = self._dumps(namespace, key, value)
+        if blob is None:
+            return False
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        changed = self._write(f"{verb} INTO shared_state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                              (namespace, key, blob, updated_at or time.time()))
+        return bool(changed)
+    
+    def delete(self, namespace, key=None):
+        """Hapus satu key, atau seluruh namespace jika key None"""
+        if not self.enabled:
+            return
+        if key is None:
+            self._write("DELETE FROM shared_state WHERE namespace = ?", (namespace,))
         else:
-            error_msg = response.json().get("description", response.text)
-            print(f"❌ Gagal kirim Telegram: {error_msg}")
-            return False, error_msg
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Error kirim Telegram: {error_msg}")
+            self._write("DELETE FROM shared_state WHERE namespace = ? AND key = ?", (namespace, key))
+    
+    def push(self, namespace, value):
+        """Tambahkan value di ujung antrian FIFO namespace. Return True jika tertulis."""
+        if not self.enabled:
+            return False
+        blob = self._dumps(namespace, "queue", value)
+        if blob is None:
+            return False
+        return bool(self._write("INSERT INTO shared_queue (namespace, value, created_at) VALUES (?, ?, ?)",
+                                (namespace, blob, time.time())))
+    
+    def pop(self, namespace, limit=100):
+        """Ambil & hapus maksimal limit item terlama dari antrian namespace (urutan push)"""
+        if not self.enabled or limit <= 0:
+            return []
+        def take(conn):
+            rows = conn.execute("SELECT id, value FROM shared_queue WHERE namespace = ? ORDER BY id LIMIT ?",
+                                (namespace, limit)).fetchall()
+            if rows:
+                conn.execute("DELETE FROM shared_queue WHERE namespace = ? AND id <= ?", (namespace, rows[-1][0]))
+            return rows
+        values = (self._loads(blob) for _, blob in self._transaction(take, []))
+        return [value for value in values if value is not self.UNCHANGED]
+    
+    def queue_depth(self, namespace):
+        if not self.enabled:
+            return 0
+        rows = self._query("SELECT COUNT(*) FROM shared_queue WHERE namespace = ?", (namespace,))
+        return rows[0][0] if rows else 0
+    
+    def reserve_token(self, name, capacity, rate, max_wait):
+        """
+        Token bucket antar proses: reservasi satu token dalam satu transaksi
+        
+        Token boleh minus (antrian reservasi), jadi pemanggil cukup sleep selama detik yang dikembalikan.
+        None jika harus menunggu lebih dari max_wait (token tidak diambil). Jika store gagal diakses
+        return 0.0: lebih baik request lolos daripada semua worker terblokir.
+        """
+        def reserve(conn):
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM shared_token_buckets WHERE name = ?", (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+            wait = max(0.0, (1 - tokens) / rate)
+            if wait > max_wait:
+                return None
+            conn.execute("INSERT OR REPLACE INTO shared_token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                         (name, tokens - 1, now))
+            return wait
+        return self._transaction(reserve, 0.0)
+    
+    def token_level(self, name, capacity, rate):
+        """Token tersedia saat ini di bucket bersama (negatif = ada reservasi yang sedang menunggu)"""
+        rows = self._query("SELECT tokens, updated_at FROM shared_token_buckets WHERE name = ?", (name,))
+        if not rows:
+            return float(capacity)
+        tokens, updated_at = rows[0]
+        return min(capacity, tokens + max(0.0, time.time() - updated_at) * rate)
+    
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False}
+        rows = self._query("SELECT namespace, COUNT(*), SUM(LENGTH(value)) FROM shared_state GROUP BY namespace")
+        queues = self._query("SELECT namespace, COUNT(*) FROM shared_queue GROUP BY namespace")
+        return {"enabled": True, "path": self.path, "errors": self.errors,
+                "namespaces": {namespace: {"keys": count, "bytes": size} for namespace, count, size in rows},
+                "queues": dict(queues)}
+
+shared_state = SharedStateStore(SHARED_STATE_PATH)
+
+# ================== CACHE ==================
+
+class TTLCache:
+    """
+    Cache in-process thread-safe dengan TTL, stale-while-revalidate, dan LRU eviction
+    
+    - Umur < ttl: nilai langsung dipakai (hit)
+    - ttl <= umur < ttl + stale_ttl: nilai lama dipakai, refresh jalan di background
+    - Selain itu: load sinkron; request bersamaan untuk key yang sama hanya memanggil loader sekali
+    
+    shared=True: hasil load juga ditulis ke shared_state, dan entry lokal yang tidak fresh diganti
+    entry worker lain yang lebih baru sebelum memanggil loader (multi-worker Gunicorn).
+    """
+    
+    def __init__(self, name, ttl, stale_ttl=0, max_size=256, shared=False):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.shared = shared
+        self.entries = OrderedDict()  # key -> (value, fetched_at)
+        self.inflight = {}  # key -> threading.Event
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "evictions": 0, "shared_hits": 0}
+        _caches.append(self)
+    
+    def _store(self, key, value, fetched_at):
+        """Dipanggil dengan self.lock dipegang"""
+        self.entries[key] = (value, fetched_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+    
+    def _load(self, key, loader, cache_if, event):
+        try:
+            value = loader()
+            keep = cache_if is None or cache_if(value)
+            with self.lock:
+                self.counters["loads"] += 1
+                if keep:
+                    self._store(key, value, time.monotonic())
+            if keep and self.shared:
+                shared_state.put(f"cache:{self.name}", repr(key), value)
+            return value
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            event.set()
+    
+    def _refresh(self, key, loader, cache_if, event):
+        try:
+            self._load(key, loader, cache_if, event)
+        except Exception as e:
+            print(f"⚠️ Cache {self.name}: background refresh gagal: {e}")
+    
+    def _adopt_shared(self, key):
+        """Pakai entry dari worker lain jika lebih baru dari entry lokal"""
+        found = shared_state.get(f"cache:{self.name}", repr(key))
+        if found is None:
+            return
+        updated_at, value = found
+        age = max(0.0, time.time() - updated_at)
+        if age >= self.ttl + self.stale_ttl:
+            return
+        fetched_at = time.monotonic() - age
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < fetched_at:
+                self._store(key, value, fetched_at)
+                self.counters["shared_hits"] += 1
+    
+    def get_or_load(self, key, loader, cache_if=None):
+        if self.shared and shared_state.enabled:
+            with self.lock:
+                entry = self.entries.get(key)
+                fresh = entry is not None and time.monotonic() - entry[1] < self.ttl
+            if not fresh:
+                self._adopt_shared(key)
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = time.monotonic() - fetched_at
+                if age < self.ttl:
+                    self.counters["hits"] += 1
+                    self.entries.move_to_end(key)
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self.counters["stale_hits"] += 1
+                    self.entries.move_to_end(key)
+                    if key not in self.inflight:
+                        event = self.inflight[key] = threading.Event()
+                        threading.Thread(target=self._refresh, args=(key, loader, cache_if, event), daemon=True).start()
+                    return value
+            
+            self.counters["misses"] += 1
+            event = self.inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self.inflight[key] = threading.Event()
+        
+        if leader:
+            return self._load(key, loader, cache_if, event)
+        
+        # Tunggu loader yang sedang jalan untuk key yang sama
+        event.wait()
+        with self.lock:
+            entry = self.entries.get(key)
+        return entry[0] if entry is not None else loader()
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        with self.lock:
+            return {"size": len(self.entries), "max_size": self.max_size, "ttl": self.ttl,
+                    "stale_ttl": self.stale_ttl, **self.counters}
+
+_caches = []
+
+def cached(cache, cache_if=None):
+    """Decorator: cache hasil fungsi berdasarkan argumen posisi"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            return cache.get_or_load(args, lambda: func(*args), cache_if)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def cache_stats():
+    """Statistik semua TTLCache yang terdaftar"""
+    return {cache.name: cache.stats() for cache in _caches}
+
+# TTL per endpoint (detik): Fear & Greed berubah harian, derivatives per beberapa menit
+fear_greed_cache = TTLCache("fear_greed", ttl=3600, stale_ttl=6 * 3600, max_size=1, shared=True)
+binance_symbols_cache = TTLCache("binance_symbols", ttl=6 * 3600, stale_ttl=24 * 3600, max_size=1, shared=True)
+premium_index_cache = TTLCache("premium_index", ttl=300, stale_ttl=900, max_size=1, shared=True)
+open_interest_cache = TTLCache("open_interest", ttl=300, stale_ttl=900, max_size=512, shared=True)
+idx_universe_cache = TTLCache("idx_universe", ttl=3600, stale_ttl=24 * 3600, max_size=1, shared=True)
+
+# ================== TELEGRAM DELIVERY ==================
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+# Ruang untuk tag penutup/pembuka ulang saat pesan HTML dipecah
+TELEGRAM_SPLIT_TAG_RESERVE = 128
+# Jeda minimum antar pesan ke chat yang sama (detik): private ~1/detik, grup ~20/menit
+TELEGRAM_PRIVATE_INTERVAL = 1.0
+TELEGRAM_GROUP_INTERVAL = 3.0
+
+_HTML_TOKEN_RE = re.compile(r"<[^>]*>|&#?[a-zA-Z0-9]+;|[^<&]+|[<&]")
+_HTML_TAG_RE = re.compile(r"<(/?)([a-zA-Z0-9-]+)[^>]*>")
+_SPLIT_SEPARATORS = ("\n\n", "\n", " ")
+
+def _pack_pieces(pieces, budget):
+    """Gabungkan potongan berurutan secara greedy menjadi chunk <= budget"""
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > budget:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_pieces(text, budget, separators=_SPLIT_SEPARATORS):
+    """Pecah text di separator paling kasar yang cukup (paragraf > baris > spasi > token)"""
+    if len(text) <= budget:
+        return [text]
+    if not separators:
+        # Hard split: tag dan entity (&amp; dll) tidak pernah dipotong
+        pieces = []
+        for token in _HTML_TOKEN_RE.findall(text):
+            if len(token) > 1 and token[0] in "<&":
+                pieces.append(token)
+            else:
+                pieces.extend(token[i:i + budget] for i in range(0, len(token), budget))
+        return _pack_pieces(pieces, budget)
+    
+    sep, rest = separators[0], separators[1:]
+    # Separator di dalam tag (mis. spasi di <a href="...">) tidak dipakai sebagai titik potong
+    parts = re.split(f"(?<={re.escape(sep)})(?![^<]*>)", text)
+    pieces = []
+    for part in parts:
+        pieces.extend(_split_pieces(part, budget, rest) if len(part) > budget else [part])
+    return _pack_pieces(pieces, budget)
+
+def split_telegram_html(text, limit=TELEGRAM_MAX_MESSAGE_LENGTH):
+    """
+    Pecah pesan HTML Telegram menjadi bagian <= limit karakter.
+    Tag yang masih terbuka di akhir bagian ditutup, lalu dibuka ulang di bagian berikutnya.
+    """
+    if len(text) <= limit:
+        return [text]
+    
+    chunks = []
+    open_tags = []  # [(nama tag, tag pembuka asli)]
+    for piece in _split_pieces(text, limit - TELEGRAM_SPLIT_TAG_RESERVE):
+        prefix = "".join(tag for _, tag in open_tags)
+        for match in _HTML_TAG_RE.finditer(piece):
+            closing, name = match.group(1), match.group(2).lower()
+            if not closing:
+                open_tags.append((name, match.group(0)))
+                continue
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i][0] == name:
+                    del open_tags[i]
+                    break
+        # Potongan tanpa teks (mis. hanya tag pembuka) tidak dikirim; tag-nya dibawa ke bagian berikutnya
+        if not _HTML_TAG_RE.sub("", piece).strip():
+            continue
+        suffix = "".join(f"</{name}>" for name, _ in reversed(open_tags))
+        chunks.append(prefix + piece.strip() + suffix)
+    return chunks
+
+class TelegramDelivery:
+    """Tanda terima satu pesan (semua bagian, semua chat). wait() untuk caller yang butuh hasil."""
+    
+    def __init__(self, parts, chat_ids):
+        self.parts = len(parts)
+        self.chat_ids = list(chat_ids)
+        self.pending = self.parts * len(self.chat_ids)
+        self.sent = 0
+        self.errors = []
+        self.accepted = True
+        self.event = threading.Event()
+        if not self.pending:
+            self.event.set()
+    
+    @property
+    def ok(self):
+        return self.event.is_set() and self.accepted and not self.errors
+    
+    def reject(self, error):
+        self.accepted = False
+        self.errors.append(error)
+        self.event.set()
+    
+    def wait(self, timeout=None):
+        return self.event.wait(timeout)
+
+class TelegramOutbox:
+    """
+    Antrian kirim Telegram: producer (job, webhook) hanya enqueue ke deque per chat (tanpa I/O),
+    worker thread yang mengirim.
+    
+    - Urutan pesan per chat terjaga; satu chat hanya dikirim oleh satu worker pada satu waktu
+    - Pacing per chat (private vs grup) + token bucket global api.telegram.org dari HttpClient
+    - 429: chat ditunda sesuai parameters.retry_after; 5xx/connection error: backoff, maks max_attempts
+    - Error 4xx lain (chat_id salah, HTML invalid) tidak di-retry
+    """
+    
+    def __init__(self, workers=4, max_attempts=5, max_queue=1000,
+                 private_interval=TELEGRAM_PRIVATE_INTERVAL, group_interval=TELEGRAM_GROUP_INTERVAL):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.max_queue = max_queue
+        self.private_interval = private_interval
+        self.group_interval = group_interval
+        self.queues = {}  # chat_id -> deque[[delivery, text, attempts]]
+        self.ready = []  # heap (ready_at, seq, chat_id); satu entry per chat yang antriannya tidak kosong
+        self.next_allowed = {}  # chat_id -> monotonic
+        self.depth = 0
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.started = False
+        self.counters = {"enqueued": 0, "sent": 0, "throttled": 0, "retried": 0, "failed": 0, "rejected": 0}
+    
+    def ensure_started(self):
+        with self.cond:
+            if self.started:
+                return
+            self.started = True
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"telegram-outbox-{i}", daemon=True).start()
+    
+    def _interval(self, chat_id):
+        return self.group_interval if str(chat_id).startswith("-") else self.private_interval
+    
+    def _schedule(self, chat_id, ready_at):
+        heapq.heappush(self.ready, (ready_at, next(self.seq), chat_id))
+        self.cond.notify()
+    
+    def enqueue(self, text, chat_ids):
+        """Masukkan pesan ke antrian semua chat. O(bagian x chat), tanpa menunggu Telegram."""
+        parts = split_telegram_html(text)
+        delivery = TelegramDelivery(parts, chat_ids)
+        self.ensure_started()
+        with self.cond:
+            if self.depth + delivery.pending > self.max_queue:
+                self.counters["rejected"] += 1
+                delivery.reject(f"Antrian Telegram penuh ({self.depth}/{self.max_queue})")
+                return delivery
+            now = time.monotonic()
+            for chat_id in delivery.chat_ids:
+                queue = self.queues.setdefault(chat_id, deque())
+                idle = not queue
+                queue.extend([delivery, part, 0] for part in parts)
+                if idle:
+                    self._schedule(chat_id, max(now, self.next_allowed.get(chat_id, 0)))
+            self.depth += delivery.pending
+            self.counters["enqueued"] += 1
+        return delivery
+    
+    def _settle(self, delivery, error=None):
+        with self.cond:
+            self.depth -= 1
+            delivery.pending -= 1
+            if error is None:
+                delivery.sent += 1
+            else:
+                delivery.errors.append(error)
+            done = delivery.pending == 0
+        if done:
+            delivery.event.set()
+    
+    def _worker(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.ready:
+                        wait = self.ready[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self.cond.wait(wait)
+                    else:
+                        self.cond.wait()
+                _, _, chat_id = heapq.heappop(self.ready)
+                item = self.queues[chat_id][0]
+            
+            delay, error = self._send(chat_id, item)
+            
+            with self.cond:
+                queue = self.queues[chat_id]
+                if delay is None:
+                    queue.popleft()
+                    delay = self._interval(chat_id)
+                ready_at = time.monotonic() + delay
+                self.next_allowed[chat_id] = ready_at
+                if queue:
+                    self._schedule(chat_id, ready_at)
+                else:
+                    del self.queues[chat_id]
+            if error is not False:
+                self._settle(item[0], error)
+    
+    def _send(self, chat_id, item):
+        """
+        Kirim satu bagian. Return (delay retry, hasil): delay None = item selesai;
+        hasil None = terkirim, str = gagal final, False = akan di-retry setelah delay
+        """
+        text = item[1]
+        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
+        item[2] += 1
+        try:
+            with timed(TELEGRAM_SEND_SECONDS):
+                response = http_client.post(url, json=payload, timeout=10, max_retries=0)
+        except Exception as e:
+            return self._retry_or_fail(item, f"{type(e).__name__}: {e}")
+        
+        if response.status_code == 200:
+            TELEGRAM_MESSAGES.inc(outcome="sent")
+            self._count("sent")
+            return None, None
+        
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        description = body.get("description", response.text[:200])
+        
+        if response.status_code == 429:
+            TELEGRAM_MESSAGES.inc(outcome="throttled")
+            self._count("throttled")
+            retry_after = (body.get("parameters") or {}).get("retry_after")
+            if retry_after is None:
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            print(f"⏳ Telegram throttle chat {chat_id}, retry dalam {retry_after}s")
+            # 429 tidak dihitung sebagai attempt gagal
+            item[2] -= 1
+            return float(retry_after if retry_after is not None else 1), False
+        if response.status_code >= 500:
+            return self._retry_or_fail(item, f"HTTP {response.status_code}: {description}")
+        
+        TELEGRAM_MESSAGES.inc(outcome="failed")
+        self._count("failed")
+        print(f"❌ Gagal kirim Telegram ke {chat_id}: {description}")
+        return None, description
+    
+    def _retry_or_fail(self, item, error):
+        if item[2] >= self.max_attempts:
+            TELEGRAM_MESSAGES.inc(outcome="error")
+            self._count("failed")
+            print(f"❌ Error kirim Telegram (menyerah setelah {item[2]} percobaan): {error}")
+            return None, error
+        self._count("retried")
+        return random.uniform(0, min(60.0, 2.0 ** item[2])), False
+    
+    def _count(self, key):
+        with self.cond:
+            self.counters[key] += 1
+    
+    def stats(self):
+        with self.cond:
+            return {"depth": self.depth, "chats_pending": len(self.queues),
+                    "max_queue": self.max_queue, "workers": self.workers, **self.counters}
+
+telegram_outbox = TelegramOutbox()
+
+def send_telegram_message(text, chat_ids=None, wait=False, timeout=60):
+    """
+    Kirim pesan ke Telegram lewat outbox (default: semua TELEGRAM_CHAT_IDS).
+    wait=False langsung return setelah masuk antrian; wait=True menunggu hasil kirim.
+    
+    Di worker follower, pesan wait=False dititipkan ke outbox leader (LeaderRelay) agar pacing
+    per chat berlaku untuk seluruh deployment; wait=True (diagnostik) tetap dikirim dari sini.
+    """
+    chat_ids = chat_ids or TELEGRAM_CHAT_IDS
+    if not TELEGRAM_BOT_TOKEN or not chat_ids:
+        error_msg = "TELEGRAM_BOT_TOKEN atau TELEGRAM_CHAT_ID belum diset!"
+        print(f"⚠️ {error_msg}")
         return False, error_msg
+    
+    if not wait and leader_relay.active and leader_relay.forward_telegram(text, chat_ids):
+        return True, "Pesan masuk antrian Telegram leader"
+    
+    delivery = telegram_outbox.enqueue(text, chat_ids)
+    if not delivery.accepted:
+        print(f"❌ {delivery.errors[0]}")
+        return False, delivery.errors[0]
+    if not wait:
+        return True, "Pesan masuk antrian Telegram"
+    
+    if not delivery.wait(timeout):
+        return False, f"Timeout menunggu pengiriman Telegram ({timeout}s)"
+    if delivery.errors:
+        return False, "; ".join(delivery.errors)
+    print(f"✅ Pesan terkirim ke Telegram ({delivery.parts} bagian, {len(delivery.chat_ids)} chat)")
+    return True, "Pesan berhasil dikirim"
+
+# ================== RECORD MODEL ==================
+
+@dataclass(slots=True)
+class ScreenedAsset:
+    """
+    Satu baris hasil screener (saham IDX atau crypto). Semua angka tetap numerik;
+    format tampilan (%, B/T, $M) hanya dilakukan di format_alert / format_crypto_alert.
+    """
+    symbol: str
+    price: float
+    change_pct: float
+    volume: float
+    market_cap: float = 0.0  # IDX: Miliar Rupiah, crypto: Juta USD
+    name: str = ""
+
+class ScreeningResult(list):
+    """List ScreenedAsset hasil satu tier, plus metadata scan (coverage full-universe IDX)"""
+    
+    def __init__(self, assets=(), coverage=None):
+        super().__init__(assets)
+        self.coverage = coverage
+
+@dataclass(slots=True)
+class StockSignal:
+    """Sinyal saham IDX (entry, TP, SL) siap diformat"""
+    kode: str
+    sinyal: str
+    entry: float
+    tp1: float
+    tp2: float
+    sl: float
+    volume: float
+    market_cap: float = 0.0
+    change_pct: float = 0.0
+
+@dataclass(slots=True)
+class CryptoSignal:
+    """Sinyal crypto dengan indikator teknikal & sentimen (harga dalam USD)"""
+    symbol: str
+    name: str
+    sinyal: str
+    entry: float
+    tp1: float
+    tp2: float
+    sl: float
+    volume: float
+    market_cap: float
+    change_24h: float = 0.0
+    indicators: dict = field(default_factory=dict)
+    tech_signals: list = field(default_factory=list)
+    confluence: float | None = None  # -1 (semua timeframe bearish) .. +1 (semua bullish)
 
 def get_dynamic_top_movers():
     """Mendapatkan top movers dinamis dari Sectors.app API"""
@@ -72,7 +1212,7 @@ def get_dynamic_top_movers():
             "min_market_cap": 1
         }
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = http_client.get(url, headers=headers, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -86,13 +1226,8 @@ def get_dynamic_top_movers():
                 market_cap = stock.get("market_cap", 0)
                 
                 if price > 0:
-                    stocks.append({
-                        "symbol": symbol,
-                        "price": price,
-                        "change_percent": f"{change_percent}%",
-                        "volume": volume,
-                        "market_cap": market_cap
-                    })
+                    stocks.append(ScreenedAsset(symbol, float(price), float(change_percent or 0),
+                                                float(volume or 0), float(market_cap or 0)))
             
             print(f"✅ Berhasil mendapatkan {len(stocks)} top movers dari Sectors.app")
             return stocks
@@ -103,78 +1238,289 @@ def get_dynamic_top_movers():
         print(f"❌ Error get_dynamic_top_movers: {e}")
         return []
 
-def get_idx_top_gainers_yfinance():
-    """Mendapatkan top gainers dari IDX menggunakan YFinance (100% GRATIS) - dengan improved error handling"""
-    try:
-        print("🔍 Scanning IDX top gainers via YFinance...")
-        
-        # Daftar 100 saham IDX terpopuler
-        idx_tickers = [
-            'BBCA.JK', 'BBRI.JK', 'BMRI.JK', 'TLKM.JK', 'ASII.JK',
-            'BBNI.JK', 'UNVR.JK', 'GOTO.JK', 'AMMN.JK', 'ADRO.JK',
-            'ANTM.JK', 'INDF.JK', 'ICBP.JK', 'KLBF.JK', 'SMGR.JK',
-            'CPIN.JK', 'PTBA.JK', 'INCO.JK', 'ITMG.JK', 'PGAS.JK',
-            'MDKA.JK', 'MEDC.JK', 'GGRM.JK', 'TOWR.JK', 'EMTK.JK',
-            'EXCL.JK', 'TBIG.JK', 'BRPT.JK', 'BYAN.JK', 'ESSA.JK',
-            'INKP.JK', 'TPIA.JK', 'BRIS.JK', 'TKIM.JK', 'BUKA.JK',
-            'PGEO.JK', 'SIDO.JK', 'MNCN.JK', 'ERAA.JK', 'SRTG.JK',
-            'DMAS.JK', 'TINS.JK', 'AKRA.JK', 'UNTR.JK', 'MAPI.JK',
-            'PWON.JK', 'SMSM.JK', 'JPFA.JK', 'ACES.JK', 'MYOR.JK'
-        ]
-        
-        gainers = []
-        success_count = 0
+# Watch universe saham IDX untuk YFinance screener
+IDX_TICKERS = [
+    'BBCA.JK', 'BBRI.JK', 'BMRI.JK', 'TLKM.JK', 'ASII.JK',
+    'BBNI.JK', 'UNVR.JK', 'GOTO.JK', 'AMMN.JK', 'ADRO.JK',
+    'ANTM.JK', 'INDF.JK', 'ICBP.JK', 'KLBF.JK', 'SMGR.JK',
+    'CPIN.JK', 'PTBA.JK', 'INCO.JK', 'ITMG.JK', 'PGAS.JK',
+    'MDKA.JK', 'MEDC.JK', 'GGRM.JK', 'TOWR.JK', 'EMTK.JK',
+    'EXCL.JK', 'TBIG.JK', 'BRPT.JK', 'BYAN.JK', 'ESSA.JK',
+    'INKP.JK', 'TPIA.JK', 'BRIS.JK', 'TKIM.JK', 'BUKA.JK',
+    'PGEO.JK', 'SIDO.JK', 'MNCN.JK', 'ERAA.JK', 'SRTG.JK',
+    'DMAS.JK', 'TINS.JK', 'AKRA.JK', 'UNTR.JK', 'MAPI.JK',
+    'PWON.JK', 'SMSM.JK', 'JPFA.JK', 'ACES.JK', 'MYOR.JK'
+]
+
+# Jumlah ticker per request bulk yf.download
+YF_BULK_CHUNK_SIZE = int(os.getenv("YF_BULK_CHUNK_SIZE", "100"))
+
+# Thread download per request bulk yf.download (argumen threads)
+YF_BULK_THREADS = int(os.getenv("YF_BULK_THREADS", "8"))
+# "full" = seluruh listing IDX dari file universe, "watchlist" = IDX_TICKERS saja
+IDX_UNIVERSE_MODE = os.getenv("IDX_UNIVERSE_MODE", "full")
+# Budget waktu full-universe screening (detik); tetap dipotong oleh deadline tier sesi
+IDX_SCREENING_BUDGET = float(os.getenv("IDX_SCREENING_BUDGET", "60"))
+# File universe di-refresh dari upstream jika lebih tua dari ini (listing baru jarang)
+IDX_UNIVERSE_MAX_AGE = 7 * 86400
+
+# yf.download 0.2.x menyimpan hasil di state global modul (shared._DFS/_ERRORS) dan me-reset-nya
+# tiap panggilan, jadi dua download bersamaan saling menimpa ticker. Semua panggilan lewat lock ini.
+_yf_download_lock = threading.Lock()
+
+def _download_chunk(chunk, period, interval):
+    return yf.download(chunk, period=period, interval=interval, group_by="column",
+                       auto_adjust=True, threads=YF_BULK_THREADS, progress=False, timeout=10)
+
+def yf_bulk_download(tickers, period="2d", interval="1d", chunk_size=None, budget=None, frames=None):
+    """
+    Download OHLCV banyak ticker sekaligus via yf.download (dipecah per chunk)
+    
+    Chunk dijalankan satu per satu (lihat _yf_download_lock); paralelisme ada di dalam tiap
+    chunk (threads=YF_BULK_THREADS). Chunk yang belum mulai saat budget (detik) habis dilewati,
+    sehingga hasil bisa parsial. frames (opsional): list yang diisi DataFrame tiap chunk begitu
+    selesai, agar thread lain bisa membaca hasil parsial selagi download berjalan.
+    Return DataFrame dengan kolom MultiIndex (field, ticker), kosong jika semua chunk gagal.
+    """
+    chunk_size = chunk_size or YF_BULK_CHUNK_SIZE
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    deadline = time.monotonic() + budget if budget else None
+    frames = [] if frames is None else frames
+    
+    for number, chunk in enumerate(chunks, 1):
+        remaining = deadline - time.monotonic() if deadline else -1
+        if deadline and (remaining <= 0 or not _yf_download_lock.acquire(timeout=remaining)):
+            print(f"⏱️ Bulk download: budget {budget:g}s habis, {len(chunks) - number + 1}/{len(chunks)} chunk dilewati")
+            break
+        if not deadline:
+            _yf_download_lock.acquire()
+        try:
+            df = _download_chunk(chunk, period, interval)
+        except Exception as e:
+            print(f"⚠️ Bulk download chunk {number} gagal: {e}")
+            continue
+        finally:
+            _yf_download_lock.release()
+        if df is not None and not df.empty:
+            frames.append(df)
+    
+    return concat_chunks(frames)
+
+def concat_chunks(frames):
+    """Gabungkan DataFrame per chunk yf.download (kolom MultiIndex) jadi satu"""
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).sort_index().sort_index(axis=1)
+
+def idx_universe_path():
+    return os.getenv("IDX_UNIVERSE_PATH") or os.path.join(DATA_DIR, "idx_universe.json")
+
+def _fetch_idx_universe_official():
+    """Daftar kode emiten dari endpoint listed company IDX"""
+    url = "https://www.idx.co.id/primary/ListedCompany/GetCompanyProfiles"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'application/json, text/plain, */*',
+        'Referer': 'https://www.idx.co.id/'
+    }
+    response = http_client.get(url, params={"start": 0, "length": 9999}, headers=headers, timeout=20)
+    response.raise_for_status()
+    return [item["KodeEmiten"].strip() for item in response.json().get("data", []) if item.get("KodeEmiten")]
+
+def _fetch_idx_universe_tradingview():
+    """Daftar symbol IDX dari TradingView screener (fallback)"""
+    _, df = (Query()
+        .select('name', 'exchange')
+        .where(Column('exchange') == 'IDX')
+        .limit(2000)
+        .get_scanner_data())
+    return [str(name).strip() for name in df["name"]] if not df.empty else []
+
+def refresh_idx_universe():
+    """Ambil ulang listing IDX dari upstream dan simpan ke file universe. Return dict universe atau None."""
+    for source, fetch_fn in (("idx", _fetch_idx_universe_official), ("tradingview", _fetch_idx_universe_tradingview)):
+        try:
+            symbols = sorted({symbol.upper() for symbol in fetch_fn() if symbol})
+        except Exception as e:
+            print(f"⚠️ Universe IDX dari {source} gagal: {e}")
+            continue
+        if len(symbols) < len(IDX_TICKERS):
+            print(f"⚠️ Universe IDX dari {source} terlalu sedikit ({len(symbols)} symbol), skip")
+            continue
         
-        for ticker in idx_tickers[:30]:  # Reduce dari 50 ke 30 untuk speed & reliability
-            try:
-                stock = yf.Ticker(ticker)
-                # Gunakan timeout dan handle network issues
-                hist = stock.history(period='2d', timeout=10)
-                
-                if len(hist) >= 2:
-                    latest_close = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2]
-                    volume = hist['Volume'].iloc[-1]
-                    
-                    pct_change = ((latest_close - prev_close) / prev_close) * 100
-                    
-                    # Filter: minimal gain 0.5% dan volume > 100k
-                    if pct_change > 0.5 and volume > 100000:
-                        symbol = ticker.replace('.JK', '')
-                        try:
-                            info = stock.info
-                            market_cap = info.get('marketCap', 0) / 1_000_000_000  # Dalam Miliar
-                        except:
-                            market_cap = 0
-                        
-                        gainers.append({
-                            "symbol": symbol,
-                            "price": latest_close,
-                            "change_percent": f"{pct_change:.2f}%",
-                            "volume": int(volume),
-                            "market_cap": market_cap
-                        })
-                        success_count += 1
-            except Exception as e:
-                # Silent continue untuk avoid spam logs
-                continue
+        universe = {"source": source, "updated_at": time.time(), "symbols": symbols}
+        path = idx_universe_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(universe, f)
+        os.replace(tmp_path, path)
+        print(f"✅ Universe IDX diperbarui dari {source}: {len(symbols)} symbol")
+        return universe
+    return None
+
+@cached(idx_universe_cache)
+def load_idx_universe():
+    """
+    Universe ticker IDX (format .JK) untuk full-universe screening
+    
+    Urutan: file universe yang masih fresh -> refresh dari upstream -> file lama -> IDX_TICKERS.
+    Return dict {tickers, source, updated_at}.
+    """
+    universe = None
+    try:
+        with open(idx_universe_path()) as f:
+            universe = json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    if universe is None or time.time() - universe.get("updated_at", 0) > IDX_UNIVERSE_MAX_AGE:
+        universe = refresh_idx_universe() or universe
+    
+    if not universe or not universe.get("symbols"):
+        return {"tickers": tuple(IDX_TICKERS), "source": "watchlist", "updated_at": None}
+    return {"tickers": tuple(f"{symbol}.JK" for symbol in universe["symbols"]),
+            "source": universe["source"], "updated_at": universe["updated_at"]}
+
+# Filter screener IDX YFinance (juga dipakai backtest.py)
+IDX_MIN_CHANGE = 0.5        # % kenaikan minimal vs close sebelumnya
+IDX_MIN_VOLUME = 100_000    # Volume (lembar) minimal bar terakhir
+IDX_TOP_N = 10
+
+def screen_top_gainers_vectorized(bars, min_change=IDX_MIN_CHANGE, min_volume=IDX_MIN_VOLUME):
+    """
+    Hitung % change & filter volume untuk semua ticker dalam satu pass vectorized
+    
+    Return DataFrame (index=ticker, kolom price/pct_change/volume) urut pct_change desc.
+    """
+    if bars.empty or len(bars) < 2:
+        return pd.DataFrame(columns=["price", "pct_change", "volume"])
+    
+    close = bars["Close"]
+    volume = bars["Volume"]
+    
+    latest_close = close.iloc[-1]
+    prev_close = close.iloc[-2]
+    latest_volume = volume.iloc[-1]
+    pct_change = (latest_close - prev_close) / prev_close * 100
+    
+    # Filter: minimal gain & volume (NaN otomatis tersaring)
+    mask = (pct_change > min_change) & (latest_volume > min_volume)
+    
+    result = pd.DataFrame({
+        "price": latest_close[mask],
+        "pct_change": pct_change[mask],
+        "volume": latest_volume[mask]
+    })
+    return result.sort_values("pct_change", ascending=False)
+
+# Coverage full-universe screening terakhir yang dipakai alert (diisi get_trading_signals, dibaca /scheduler-status)
+idx_screening_coverage = {}
+
+class IdxUniverseScan:
+    """
+    Satu full-universe scan YFinance yang sedang berjalan (single-flight)
+    
+    Pemanggil yang datang saat scan berjalan (job, snapshot, tier yang ditinggal di background) menunggu
+    scan itu, bukan mengantre download sendiri - tapi hanya sampai budget-nya sendiri habis. Setelah itu
+    ia memakai hasil parsial dari chunk yang sudah selesai (frames diisi yf_bulk_download).
+    """
+    
+    def __init__(self):
+        self.universe = {"tickers": (), "source": "unknown", "updated_at": None}
+        self.frames = []
+        self.started = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+    
+    def run(self, budget):
+        try:
+            if IDX_UNIVERSE_MODE == "full":
+                self.universe = load_idx_universe()
+            else:
+                self.universe = {"tickers": tuple(IDX_TICKERS), "source": "watchlist", "updated_at": None}
+            tickers = list(self.universe["tickers"])
+            print(f"🔍 Scanning IDX top gainers via YFinance (bulk, {len(tickers)} ticker, budget {budget:g}s)...")
             
-            # Add small delay to avoid API throttling
-            time.sleep(0.5)
-        
-        # Sort by change percentage
-        gainers.sort(key=lambda x: float(x['change_percent'].replace('%', '')), reverse=True)
+            bars = yf_bulk_download(tickers, period='2d', budget=budget, frames=self.frames)
+            gainers = self.rank(bars)
+            if gainers:
+                print(f"✅ YFinance: Ditemukan {len(gainers)} top gainers "
+                      f"(scanned {gainers.coverage['evaluated']}/{len(tickers)} ticker)")
+            else:
+                print("⚠️ YFinance: Tidak ada gainers ditemukan (possible market closed atau data unavailable)")
+            return gainers
         
-        if gainers:
-            print(f"✅ YFinance: Ditemukan {len(gainers)} top gainers (scanned {success_count} sukses)")
-            return gainers[:10]  # Return top 10
+        except Exception as e:
+            print(f"❌ Error YFinance screener: {e}")
+            return ScreeningResult(coverage=self.coverage(pd.DataFrame()))
+    
+    def partial(self):
+        """Ranking dari chunk yang sudah selesai sejauh ini"""
+        return self.rank(concat_chunks(list(self.frames)))
+    
+    def coverage(self, close):
+        tickers = self.universe["tickers"]
+        evaluated = int((close.iloc[-1].notna() & close.iloc[-2].notna()).sum()) if len(close) >= 2 else 0
+        return {
+            "universe": self.universe["source"], "total": len(tickers), "evaluated": evaluated,
+            "ratio": round(evaluated / len(tickers), 4) if tickers else 0.0,
+            "elapsed_seconds": round(time.monotonic() - self.started, 2),
+            "at_wib": datetime.now(WIB).strftime("%d-%b-%Y %H:%M:%S WIB")
+        }
+    
+    def rank(self, bars):
+        ranked = screen_top_gainers_vectorized(bars).head(IDX_TOP_N)
+        coverage = self.coverage(bars["Close"] if not bars.empty else pd.DataFrame())
+        print(f"📡 Coverage: {coverage['evaluated']}/{coverage['total']} ticker ({coverage['ratio']:.1%}) "
+              f"dalam {coverage['elapsed_seconds']}s")
         
-        print("⚠️ YFinance: Tidak ada gainers ditemukan (possible market closed atau data unavailable)")
-        return []
+        gainers = ScreeningResult(coverage=coverage)
+        if ranked.empty:
+            return gainers
         
-    except Exception as e:
-        print(f"❌ Error YFinance screener: {e}")
-        return []
+        # Market cap (Miliar) dari index metadata lokal, tanpa yf .info per ticker
+        symbol_metadata.refresh_async()
+        for ticker, price, pct_change, volume in ranked.itertuples():
+            market_cap = symbol_metadata.market_cap(ticker, float(price)) or 0
+            gainers.append(ScreenedAsset(ticker.replace('.JK', ''), float(price), float(pct_change), float(volume),
+                                         market_cap / 1_000_000_000))
+        return gainers
+
+_idx_scan_lock = threading.Lock()
+_idx_scan = None
+
+def get_idx_top_gainers_yfinance(budget=None):
+    """
+    Mendapatkan top gainers dari IDX menggunakan YFinance (100% GRATIS) - bulk download + vectorized filter
+    
+    Mode full (IDX_UNIVERSE_MODE) men-scan seluruh listing IDX dalam budget detik; chunk yang tidak
+    selesai tepat waktu dilewati dan tercermin di coverage (ticker yang benar-benar dievaluasi / universe).
+    Jika scan lain sedang berjalan, tunggu scan itu paling lama budget detik lalu pakai hasil parsialnya.
+    Return ScreeningResult dengan atribut coverage.
+    """
+    global _idx_scan
+    budget = budget or IDX_SCREENING_BUDGET
+    deadline = time.monotonic() + budget
+    with _idx_scan_lock:
+        scan = _idx_scan
+        leader = scan is None
+        if leader:
+            scan = _idx_scan = IdxUniverseScan()
+    
+    if leader:
+        try:
+            scan.result = scan.run(budget)
+        finally:
+            with _idx_scan_lock:
+                _idx_scan = None
+            scan.done.set()
+        return scan.result
+    
+    if scan.done.wait(max(0.0, deadline - time.monotonic())) and scan.result is not None:
+        return scan.result
+    print(f"⏱️ Scan IDX yang sedang berjalan belum selesai dalam budget {budget:g}s, pakai hasil parsial")
+    return scan.partial()
 
 def get_idx_top_gainers_scraper():
     """Mendapatkan top gainers dari IDX official website (100% GRATIS) - dengan improved headers"""
@@ -199,7 +1545,7 @@ def get_idx_top_gainers_scraper():
             'Sec-Fetch-Site': 'same-origin'
         }
         
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
+        response = http_client.get(url, headers=headers, timeout=15, allow_redirects=True)
         
         if response.status_code == 200:
             data = response.json()
@@ -219,13 +1565,7 @@ def get_idx_top_gainers_scraper():
                     market_cap = float(item.get('MarketCap', 0)) / 1_000_000_000  # Dalam Miliar
                     
                     if symbol and price > 0:
-                        gainers.append({
-                            "symbol": symbol,
-                            "price": price,
-                            "change_percent": f"{change_percent:.2f}%",
-                            "volume": volume,
-                            "market_cap": market_cap
-                        })
+                        gainers.append(ScreenedAsset(symbol, price, change_percent, volume, market_cap))
                 except:
                     continue
             
@@ -294,13 +1634,7 @@ def get_idx_top_gainers_tradingview():
                     market_cap = float(market_cap_val or 0) / 1_000_000_000  # Dalam Miliar
                     
                     if symbol and price > 0 and change_percent > 0.5:
-                        gainers.append({
-                            "symbol": symbol,
-                            "price": price,
-                            "change_percent": f"{change_percent:.2f}%",
-                            "volume": volume,
-                            "market_cap": market_cap
-                        })
+                        gainers.append(ScreenedAsset(symbol, price, change_percent, volume, market_cap))
                 except Exception as e:
                     print(f"⚠️ Error parsing TradingView row: {e}")
                     continue
@@ -316,6 +1650,108 @@ def get_idx_top_gainers_tradingview():
         print(f"❌ Error TradingView screener: {e}")
         return []
 
+# Filter profesional crypto screener
+CRYPTO_MIN_VOLUME = 500_000         # Min $500k volume 24h
+CRYPTO_MIN_MARKET_CAP = 50_000_000  # Min $50M market cap (mid cap+)
+CRYPTO_CHANGE_RANGE = (3.0, 15.0)   # Momentum 3-15% (tanpa overextended)
+CRYPTO_TOP_N = 10
+# Batas halaman per scan (listing diurutkan market cap desc, biasanya berhenti lebih awal)
+CRYPTO_SCAN_MAX_PAGES = int(os.getenv("CRYPTO_SCAN_MAX_PAGES", "20"))
+
+def passes_crypto_filters(asset):
+    """Filter profesional: likuiditas, market cap, dan range momentum"""
+    low, high = CRYPTO_CHANGE_RANGE
+    return (asset.volume >= CRYPTO_MIN_VOLUME and asset.market_cap * 1_000_000 >= CRYPTO_MIN_MARKET_CAP
+            and low <= asset.change_pct <= high)
+
+def iter_coinlore_pages(page_size=100, max_pages=None):
+    """Generator halaman Coinlore (urut rank/market cap desc) -> list ScreenedAsset per halaman"""
+    url = "https://api.coinlore.net/api/tickers/"
+    for page in range(max_pages or CRYPTO_SCAN_MAX_PAGES):
+        response = http_client.get(url, params={"start": page * page_size, "limit": page_size}, timeout=10)
+        if response.status_code != 200:
+            print(f"⚠️ Coinlore: halaman {page + 1} status {response.status_code}, scan dihentikan")
+            return
+        data = response.json()
+        coins = data.get("data", [])
+        assets = []
+        for coin in coins:
+            try:
+                # market_cap dalam juta USD
+                assets.append(ScreenedAsset(coin.get("symbol", ""), float(coin.get("price_usd", 0)),
+                                            float(coin.get("percent_change_24h", 0)), float(coin.get("volume24", 0)),
+                                            float(coin.get("market_cap_usd", 0)) / 1_000_000, coin.get("name", "")))
+            except (TypeError, ValueError):
+                continue
+        yield assets
+        total = int((data.get("info") or {}).get("coins_num") or 0)
+        if len(coins) < page_size or (total and (page + 1) * page_size >= total):
+            return
+
+def iter_coingecko_pages(page_size=250, max_pages=None):
+    """Generator halaman CoinGecko markets (market cap desc) -> list ScreenedAsset per halaman"""
+    url = "https://api.coingecko.com/api/v3/coins/markets"
+    for page in range(1, (max_pages or CRYPTO_SCAN_MAX_PAGES) + 1):
+        params = {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": page_size,
+            "page": page,
+            "sparkline": "false",
+            "price_change_percentage": "24h"
+        }
+        response = http_client.get(url, params=params, timeout=10)
+        if response.status_code != 200:
+            print(f"⚠️ CoinGecko: halaman {page} status {response.status_code}, scan dihentikan")
+            return
+        coins = response.json()
+        assets = []
+        for coin in coins:
+            try:
+                assets.append(ScreenedAsset(coin.get("symbol", "").upper(), float(coin.get("current_price") or 0),
+                                            float(coin.get("price_change_percentage_24h") or 0),
+                                            float(coin.get("total_volume") or 0),
+                                            float(coin.get("market_cap") or 0) / 1_000_000, coin.get("name", "")))
+            except (TypeError, ValueError):
+                continue
+        yield assets
+        if len(coins) < page_size:
+            return
+
+def scan_crypto_pages(pages, top_n=CRYPTO_TOP_N):
+    """
+    Konsumsi generator halaman (urut market cap desc), filter per halaman, simpan top-N di min-heap
+    
+    Berhenti lebih awal jika market cap valid (> 0) terbesar di halaman sudah < CRYPTO_MIN_MARKET_CAP:
+    halaman berikutnya pasti tidak lolos filter market cap. Coin tanpa market cap (0, umum di
+    listing Coinlore/CoinGecko) diabaikan untuk keputusan ini. Memory O(top_n + page_size).
+    Return (gainers urut change desc, jumlah halaman, jumlah coin yang dievaluasi).
+    """
+    heap = []  # (change_pct, seq, asset); root = kandidat terlemah
+    seq = itertools.count()
+    pages_read = evaluated = 0
+    try:
+        for assets in pages:
+            pages_read += 1
+            evaluated += len(assets)
+            for asset in assets:
+                if not passes_crypto_filters(asset):
+                    continue
+                item = (asset.change_pct, next(seq), asset)
+                if len(heap) < top_n:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+            if not assets:
+                break
+            caps = [asset.market_cap for asset in assets if asset.market_cap > 0]
+            if caps and max(caps) * 1_000_000 < CRYPTO_MIN_MARKET_CAP:
+                break
+    finally:
+        if hasattr(pages, "close"):
+            pages.close()
+    return [asset for _, _, asset in sorted(heap, reverse=True)], pages_read, evaluated
+
 def get_crypto_top_gainers_coinlore():
     """
     Mendapatkan top gainers crypto dari Coinlore API (100% GRATIS, NO API KEY)
@@ -324,58 +1760,16 @@ def get_crypto_top_gainers_coinlore():
     - Volume 24h ≥ $500k (ideal ≥ $1M)
     - Market Cap > $50M (mid to large cap)
     - Price Change 24h: 3% s/d 15% (momentum tanpa overextended)
+    
+    Listing di-scan per halaman sampai market cap turun di bawah batas filter.
     """
     try:
         print("🔍 Scanning crypto top gainers via Coinlore...")
+        gainers, pages, evaluated = scan_crypto_pages(iter_coinlore_pages())
         
-        url = "https://api.coinlore.net/api/tickers/"
-        params = {"start": 0, "limit": 100}
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            coins = data.get("data", [])
-            
-            # Filter dengan parameter profesional
-            gainers = []
-            for coin in coins:
-                try:
-                    symbol = coin.get("symbol", "")
-                    name = coin.get("name", "")
-                    price = float(coin.get("price_usd", 0))
-                    change_24h = float(coin.get("percent_change_24h", 0))
-                    volume_24h = float(coin.get("volume24", 0))
-                    market_cap = float(coin.get("market_cap_usd", 0))
-                    
-                    # FILTER PROFESIONAL:
-                    # A. Likuiditas & Aktivitas
-                    if volume_24h < 500000:  # Min $500k volume
-                        continue
-                    if market_cap < 50000000:  # Min $50M market cap (mid cap+)
-                        continue
-                    
-                    # B. Momentum range (3-15%)
-                    if change_24h < 3.0 or change_24h > 15.0:
-                        continue
-                    
-                    gainers.append({
-                        "symbol": symbol,
-                        "name": name,
-                        "price": price,
-                        "change_percent": f"{change_24h:.2f}%",
-                        "volume": volume_24h,
-                        "market_cap": market_cap / 1_000_000  # Convert to millions
-                    })
-                except Exception as e:
-                    continue
-            
-            # Sort by change_percent descending
-            gainers_sorted = sorted(gainers, key=lambda x: float(x["change_percent"].replace("%", "")), reverse=True)
-            
-            if gainers_sorted:
-                print(f"✅ Coinlore: Ditemukan {len(gainers_sorted)} crypto gainers (filtered)")
-                return gainers_sorted[:10]  # Top 10
+        if gainers:
+            print(f"✅ Coinlore: Ditemukan {len(gainers)} crypto gainers (filtered, {evaluated} coin / {pages} halaman)")
+            return gainers
         
         print("⚠️ Coinlore: Tidak ada gainers yang memenuhi kriteria profesional")
         return []
@@ -392,54 +1786,11 @@ def get_crypto_top_gainers_coingecko():
     """
     try:
         print("🔍 Scanning crypto top gainers via CoinGecko...")
+        gainers, pages, evaluated = scan_crypto_pages(iter_coingecko_pages())
         
-        url = "https://api.coingecko.com/api/v3/coins/markets"
-        params = {
-            "vs_currency": "usd",
-            "order": "percent_change_desc",
-            "per_page": 100,
-            "page": 1,
-            "sparkline": "false",
-            "price_change_percentage": "24h"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            coins = response.json()
-            
-            gainers = []
-            for coin in coins:
-                try:
-                    symbol = coin.get("symbol", "").upper()
-                    name = coin.get("name", "")
-                    price = float(coin.get("current_price", 0))
-                    change_24h = float(coin.get("price_change_percentage_24h", 0))
-                    volume_24h = float(coin.get("total_volume", 0))
-                    market_cap = float(coin.get("market_cap", 0))
-                    
-                    # FILTER PROFESIONAL
-                    if volume_24h < 500000:  # Min $500k volume
-                        continue
-                    if market_cap < 50000000:  # Min $50M market cap
-                        continue
-                    if change_24h < 3.0 or change_24h > 15.0:  # 3-15% range
-                        continue
-                    
-                    gainers.append({
-                        "symbol": symbol,
-                        "name": name,
-                        "price": price,
-                        "change_percent": f"{change_24h:.2f}%",
-                        "volume": volume_24h,
-                        "market_cap": market_cap / 1_000_000
-                    })
-                except Exception as e:
-                    continue
-            
-            if gainers:
-                print(f"✅ CoinGecko: Ditemukan {len(gainers)} crypto gainers (filtered)")
-                return gainers[:10]
+        if gainers:
+            print(f"✅ CoinGecko: Ditemukan {len(gainers)} crypto gainers (filtered, {evaluated} coin / {pages} halaman)")
+            return gainers
         
         print("⚠️ CoinGecko: Tidak ada gainers yang memenuhi kriteria")
         return []
@@ -448,50 +1799,34 @@ def get_crypto_top_gainers_coingecko():
         print(f"❌ Error CoinGecko API: {e}")
         return []
 
+# Major crypto pairs untuk fallback YFinance
+CRYPTO_YF_PAIRS = [
+    'BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD', 'ADA-USD',
+    'SOL-USD', 'DOT-USD', 'DOGE-USD', 'AVAX-USD', 'MATIC-USD',
+    'LINK-USD', 'UNI-USD', 'ATOM-USD', 'LTC-USD', 'ETC-USD',
+    'XLM-USD', 'ALGO-USD', 'VET-USD', 'ICP-USD', 'FIL-USD'
+]
+
 def get_crypto_top_gainers_yfinance():
-    """Mendapatkan top gainers crypto dari YFinance (FALLBACK)"""
+    """Mendapatkan top gainers crypto dari YFinance (FALLBACK) - satu bulk download + index metadata"""
     try:
         print("🔍 Scanning crypto top gainers via YFinance...")
         
-        # Major crypto pairs
-        crypto_pairs = [
-            'BTC-USD', 'ETH-USD', 'BNB-USD', 'XRP-USD', 'ADA-USD',
-            'SOL-USD', 'DOT-USD', 'DOGE-USD', 'AVAX-USD', 'MATIC-USD',
-            'LINK-USD', 'UNI-USD', 'ATOM-USD', 'LTC-USD', 'ETC-USD',
-            'XLM-USD', 'ALGO-USD', 'VET-USD', 'ICP-USD', 'FIL-USD'
-        ]
+        bars = yf_bulk_download(CRYPTO_YF_PAIRS, period='2d')
+        ranked = screen_top_gainers_vectorized(bars, min_change=0.0).head(10)
         
+        symbol_metadata.refresh_async()
         gainers = []
+        for pair, price, change_24h, volume in ranked.itertuples():
+            symbol = pair.replace('-USD', '')
+            meta = symbol_metadata.get(pair) or {}
+            market_cap = symbol_metadata.market_cap(pair, float(price)) or 0
+            gainers.append(ScreenedAsset(symbol, float(price), float(change_24h), float(volume),
+                                         market_cap / 1_000_000, meta.get('short_name') or symbol))
         
-        for pair in crypto_pairs:
-            try:
-                ticker = yf.Ticker(pair)
-                info = ticker.info
-                
-                symbol = pair.replace('-USD', '')
-                price = info.get('regularMarketPrice', 0)
-                change_24h = info.get('regularMarketChangePercent', 0)
-                volume = info.get('regularMarketVolume', 0)
-                market_cap = info.get('marketCap', 0)
-                
-                if price > 0 and change_24h > 0 and volume > 100000:
-                    gainers.append({
-                        "symbol": symbol,
-                        "name": info.get('shortName', symbol),
-                        "price": price,
-                        "change_percent": f"{change_24h:.2f}%",
-                        "volume": volume,
-                        "market_cap": market_cap / 1_000_000 if market_cap else 0
-                    })
-            except:
-                continue
-        
-        # Sort by change_percent
-        gainers_sorted = sorted(gainers, key=lambda x: float(x["change_percent"].replace("%", "")), reverse=True)
-        
-        if gainers_sorted:
-            print(f"✅ YFinance: Ditemukan {len(gainers_sorted)} crypto gainers")
-            return gainers_sorted[:10]
+        if gainers:
+            print(f"✅ YFinance: Ditemukan {len(gainers)} crypto gainers")
+            return gainers
         
         print("⚠️ YFinance Crypto: Tidak ada gainers ditemukan")
         return []
@@ -500,33 +1835,43 @@ def get_crypto_top_gainers_yfinance():
         print(f"❌ Error YFinance Crypto: {e}")
         return []
 
-def analyze_crypto_signal(crypto_data):
+# TP1 / TP2 / SL dalam % dari entry (divalidasi dengan backtest.py)
+CRYPTO_TP_SL_PCT = (5.0, 10.0, 5.0)
+STOCK_TP_SL_PCT = (3.0, 6.0, 2.0)
+
+@timed(CRYPTO_ENRICHMENT_SECONDS)
+def analyze_crypto_signal(asset):
     """
     Analisis sinyal trading untuk cryptocurrency dengan indikator teknikal lengkap
     
     Parameter: Volume ≥$500k, MCap >$50M, Change 3-15%
-    Indicators: EMA 20/50, RSI, MACD, Bollinger Bands, Fear & Greed, Funding Rate, OI
+    Indicators: EMA 20/50, RSI, MACD, Bollinger Bands, Fear & Greed, Funding Rate, OI,
+                confluence multi-timeframe (CRYPTO_TIMEFRAMES, satu download + resample lokal)
     """
-    if not crypto_data or crypto_data["price"] == 0:
+    if not asset or asset.price == 0:
         return None
     
-    symbol = crypto_data["symbol"]
-    name = crypto_data.get("name", symbol)
-    price = crypto_data["price"]
-    change_24h = float(crypto_data["change_percent"].replace("%", ""))
-    volume = crypto_data.get("volume", 0)
-    market_cap = crypto_data.get("market_cap", 0)
-    
-    # Crypto TP/SL disesuaikan volatilitas
-    entry = round(price, 8)
-    tp1 = round(price * 1.05, 8)  # 5% TP1
-    tp2 = round(price * 1.10, 8)  # 10% TP2
-    sl = round(price * 0.95, 8)   # 5% SL
-    
     # Get technical indicators & signals
     indicators, tech_signals = analyze_crypto_with_indicators(
-        symbol, name, price, change_24h, volume, market_cap
+        asset.symbol, asset.name or asset.symbol, asset.price, asset.change_pct, asset.volume, asset.market_cap
     )
+    return build_crypto_signal(asset, indicators, tech_signals)
+
+def build_crypto_signal(asset, indicators, tech_signals):
+    """Bangun CryptoSignal (TP/SL + sinyal utama) dari indikator yang sudah dihitung (batch atau stream)"""
+    symbol = asset.symbol
+    name = asset.name or symbol
+    price = asset.price
+    change_24h = asset.change_pct
+    volume = asset.volume
+    market_cap = asset.market_cap
+    
+    # Crypto TP/SL disesuaikan volatilitas (default 5% / 10% / 5%)
+    tp1_pct, tp2_pct, sl_pct = CRYPTO_TP_SL_PCT
+    entry = round(price, 8)
+    tp1 = round(price * (1 + tp1_pct / 100), 8)
+    tp2 = round(price * (1 + tp2_pct / 100), 8)
+    sl = round(price * (1 - sl_pct / 100), 8)
     
     # Build main signal based on indicators
     main_signal = ""
@@ -552,90 +1897,308 @@ def analyze_crypto_signal(crypto_data):
         else:
             main_signal = "✅ Potensi entry"
     
-    # Compile complete signal data
-    signal_data = {
-        "symbol": symbol,
-        "name": name,
-        "sinyal": main_signal,
-        "entry": entry,
-        "tp1": tp1,
-        "tp2": tp2,
-        "sl": sl,
-        "volume": volume,
-        "market_cap": market_cap,
-        "change_24h": change_24h
-    }
+    confluence = indicators.get('confluence') if indicators else None
+    if confluence is not None:
+        main_signal += f" | MTF {confluence:+.2f}"
     
-    # Add technical indicators if available
-    if indicators:
-        signal_data["indicators"] = indicators
-        signal_data["tech_signals"] = tech_signals
+    # Indikator hanya disertakan jika tersedia
+    return CryptoSignal(symbol, name, main_signal, entry, tp1, tp2, sl, volume, market_cap, change_24h,
+                        indicators=indicators or {}, tech_signals=tech_signals if indicators else [],
+                        confluence=confluence)
+
+# ================== SOURCE HEALTH ==================
+
+HEALTH_WINDOW = 20                  # Jumlah hasil terakhir untuk rolling success rate
+HEALTH_EWMA_ALPHA = 0.3             # Bobot sampel latency terbaru
+HEALTH_FAILURE_THRESHOLD = 3        # Gagal berturut-turut -> circuit open
+HEALTH_MIN_SUCCESS_RATE = 0.2       # Success rate rolling di bawah ini -> circuit open
+HEALTH_MIN_SAMPLES = 10             # ...jika sampel sudah sebanyak ini
+HEALTH_COOLDOWN_BASE = 60           # Detik circuit open sebelum half-open (dobel tiap trial gagal)
+HEALTH_COOLDOWN_MAX = 1800
+
+class SourceHealth:
+    """
+    Kesehatan satu sumber screening: rolling success rate, latency EWMA, dan circuit breaker.
+    
+    closed    -> semua request jalan; open jika gagal berturut-turut / success rate rendah
+    open      -> sumber dilewati sampai cooldown habis
+    half_open -> satu request percobaan; sukses = closed, gagal = open dengan cooldown 2x
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    
+    def __init__(self, name):
+        self.name = name
+        self.results = deque(maxlen=HEALTH_WINDOW)
+        self.latency_ewma = None
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.cooldown = HEALTH_COOLDOWN_BASE
+        self.trial_inflight = False
+        self.last_failure = None
+        self.lock = threading.Lock()
+    
+    @property
+    def success_rate(self):
+        return sum(self.results) / len(self.results) if self.results else None
+    
+    def allow(self):
+        """True jika sumber boleh dipanggil sekarang (half-open: hanya satu percobaan sekaligus)"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self.trial_inflight:
+                self.trial_inflight = True
+                return True
+            return False
+    
+    def release(self):
+        """Percobaan half-open batal dijalankan (mis. tier hedge dibatalkan)"""
+        with self.lock:
+            self.trial_inflight = False
+    
+    def record(self, success, latency, outcome="ok"):
+        with self.lock:
+            self.results.append(success)
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                HEALTH_EWMA_ALPHA * latency + (1 - HEALTH_EWMA_ALPHA) * self.latency_ewma)
+            self.trial_inflight = False
+            
+            if success:
+                if self.state != self.CLOSED:
+                    print(f"💚 Circuit {self.name} pulih (closed)")
+                self.state = self.CLOSED
+                self.consecutive_failures = 0
+                self.cooldown = HEALTH_COOLDOWN_BASE
+                return
+            
+            self.consecutive_failures += 1
+            self.last_failure = outcome
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(HEALTH_COOLDOWN_MAX, self.cooldown * 2)
+                self._open()
+            elif self.state == self.CLOSED and (
+                    self.consecutive_failures >= HEALTH_FAILURE_THRESHOLD
+                    or (len(self.results) >= HEALTH_MIN_SAMPLES and self.success_rate < HEALTH_MIN_SUCCESS_RATE)):
+                self._open()
+    
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        print(f"🔌 Circuit {self.name} open selama {self.cooldown:.0f}s ({self.consecutive_failures}x gagal, "
+              f"terakhir: {self.last_failure})")
+    
+    def expected_cost(self):
+        """Perkiraan detik sampai dapat hasil sukses (latency EWMA / success rate); None jika belum ada riwayat"""
+        with self.lock:
+            if self.latency_ewma is None:
+                return None
+            return self.latency_ewma / max(self.success_rate, 0.05)
+    
+    def snapshot(self):
+        with self.lock:
+            retry_in = self.cooldown - (time.monotonic() - self.opened_at) if self.state == self.OPEN else 0
+            return {
+                "state": self.state,
+                "success_rate": round(self.success_rate, 3) if self.results else None,
+                "samples": len(self.results),
+                "latency_ewma_seconds": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "consecutive_failures": self.consecutive_failures,
+                "last_failure": self.last_failure,
+                "cooldown_seconds": self.cooldown,
+                "retry_in_seconds": round(max(0.0, retry_in), 1)
+            }
+
+class SourceHealthRegistry:
+    """SourceHealth per (market, nama fetch_fn)"""
+    
+    def __init__(self):
+        self.sources = {}
+        self.lock = threading.Lock()
+    
+    def get(self, market, source):
+        key = f"{market}:{source}"
+        with self.lock:
+            health = self.sources.get(key)
+            if health is None:
+                health = self.sources[key] = SourceHealth(key)
+            return health
+    
+    def plan(self, tiers, market):
+        """
+        Urutkan ulang tier: sumber tanpa riwayat tetap di depan (urutan asli), sisanya berdasarkan
+        expected_cost terkecil. Tier dengan circuit open dilewati; jika semua open, semua tetap dicoba.
+        Return list (name, fetch_fn, hedge_delay, health) dan list nama tier yang dilewati.
+        """
+        planned, skipped = [], []
+        for position, (name, fetch_fn, hedge_delay) in enumerate(tiers):
+            health = self.get(market, fetch_fn.__name__)
+            if health.allow():
+                planned.append((health.expected_cost(), position, (name, fetch_fn, hedge_delay, health)))
+            else:
+                skipped.append((name, fetch_fn, hedge_delay, health))
+        
+        if not planned:
+            print("⚠️ Semua circuit sumber open, tetap mencoba semua tier")
+            return skipped, []
+        
+        planned.sort(key=lambda item: (item[0] is not None, item[0] or 0, item[1]))
+        return [tier for _, _, tier in planned], [tier[0] for tier in skipped]
+    
+    def status(self):
+        with self.lock:
+            sources = dict(self.sources)
+        return {key: health.snapshot() for key, health in sorted(sources.items())}
+
+source_health = SourceHealthRegistry()
+
+# ================== TIER ORCHESTRATOR ==================
+
+# Deadline (detik) untuk orkestrasi tier screening IDX per sesi
+IDX_SCREENING_DEADLINES = {
+    "PRE-MARKET": 40,
+    "SESI 1": 60,
+    "CLOSING": 60
+}
+DEFAULT_SCREENING_DEADLINE = float(os.getenv("SCREENING_DEADLINE", "60"))
+CRYPTO_SCREENING_DEADLINE = float(os.getenv("CRYPTO_SCREENING_DEADLINE", "30"))
+
+def get_screening_deadline(session):
+    """Deadline screening IDX untuk sesi tertentu (match prefix nama sesi)"""
+    for prefix, deadline in IDX_SCREENING_DEADLINES.items():
+        if session.startswith(prefix):
+            return deadline
+    return DEFAULT_SCREENING_DEADLINE
+
+def run_fallback_tiers(tiers, deadline, market="idx"):
+    """
+    Jalankan tier screening secara konkuren; generator kandidat tier berhasil urut prioritas
+    
+    tiers: list (name, fetch_fn, hedge_delay) urut prioritas. Tier dengan hedge_delay > 0
+    baru dijalankan setelah delay tersebut, dan dibatalkan jika kandidat pertama sudah ada.
+    Tier yang masih jalan dibiarkan selesai di background.
+    
+    Urutan efektif ditentukan source_health: tier dengan circuit open dilewati, sisanya diurutkan
+    dari yang historis paling cepat & sehat. Tier pertama hasil urutan selalu jalan tanpa hedge.
+    
+    Yield (name, source, result) untuk tier prioritas tertinggi yang berhasil. Jika caller lanjut
+    iterasi (hasil tier tidak menghasilkan sinyal), tier berhasil berikutnya di-yield dalam deadline
+    yang sama. Durasi tiap tier dicatat ke metrics dengan label source = nama fetch_fn; pemenang
+    dicatat caller lewat SCREENING_TIER_WINS.
+    """
+    tiers, skipped = source_health.plan(tiers, market)
+    if skipped:
+        print(f"🔌 Circuit open, dilewati: {', '.join(skipped)}")
+    name, fetch_fn, _, health = tiers[0]
+    tiers[0] = (name, fetch_fn, 0, health)
+    
+    results = [None] * len(tiers)  # None = belum selesai, list = selesai
+    cond = threading.Condition()
+    cancelled = threading.Event()
+    start = time.monotonic()
+    
+    def run_tier(i, name, fetch_fn, hedge_delay, health):
+        # Event.wait return True jika dibatalkan sebelum delay habis
+        if hedge_delay and cancelled.wait(hedge_delay):
+            health.release()
+            result = []
+        else:
+            started = time.perf_counter()
+            outcome = "ok"
+            try:
+                result = fetch_fn() or []
+            except Exception as e:
+                print(f"❌ Tier {name} error: {e}")
+                result = []
+                outcome = "error"
+            if outcome == "ok" and not result:
+                outcome = "empty"
+            duration = time.perf_counter() - started
+            # Hasil kosong = sumber sehat tapi tidak ada data (mis. market sepi); hanya error yang membuka circuit
+            health.record(outcome != "error", duration, outcome)
+            SCREENING_SOURCE_SECONDS.observe(duration, market=market, source=fetch_fn.__name__, outcome=outcome)
+        with cond:
+            results[i] = result
+            cond.notify_all()
+    
+    for i, tier in enumerate(tiers):
+        threading.Thread(target=run_tier, args=(i, *tier), daemon=True).start()
+    
+    def pick_winner(after, at_deadline):
+        for i in range(after + 1, len(results)):
+            result = results[i]
+            if result is None:
+                if at_deadline:
+                    continue
+                return None, False  # Tunggu tier prioritas lebih tinggi
+            if result:
+                return i, True
+        return None, True
     
-    return signal_data
+    tried = -1
+    while True:
+        with cond:
+            while True:
+                winner, decided = pick_winner(tried, at_deadline=False)
+                if decided:
+                    break
+                remaining = start + deadline - time.monotonic()
+                if remaining <= 0:
+                    winner, _ = pick_winner(tried, at_deadline=True)
+                    print(f"⏱️ Deadline {deadline:.0f}s tercapai, tier yang belum selesai diabaikan")
+                    break
+                cond.wait(remaining)
+        
+        cancelled.set()
+        elapsed = time.monotonic() - start
+        
+        if winner is None:
+            if tried < 0:
+                print(f"⚠️ Tidak ada tier yang berhasil ({elapsed:.1f}s)")
+            return
+        
+        name = tiers[winner][0]
+        print(f"🏁 {'Tier pemenang' if tried < 0 else 'Fallback ke tier'}: {name} ({elapsed:.1f}s)")
+        tried = winner
+        yield name, tiers[winner][1].__name__, results[winner]
 
 def get_crypto_trading_signals():
-    """Mendapatkan sinyal trading crypto dengan multi-tier fallback system"""
+    """Mendapatkan sinyal trading crypto dengan multi-tier fallback system (konkuren + deadline)"""
     signals = []
     screening_method = "❓ Unknown"
     
     print("🔍 Memulai crypto screening...")
     
-    # TIER 1: Coinlore API (100% GRATIS, NO API KEY)
-    top_gainers = get_crypto_top_gainers_coinlore()
-    
-    if top_gainers:
-        screening_method = "🪙 Coinlore API (Top Gainers Crypto)"
-        print(f"✅ Menggunakan Coinlore, ditemukan {len(top_gainers)} crypto")
-        
-        for crypto in top_gainers[:5]:
-            signal = analyze_crypto_signal(crypto)
-            if signal:
-                signals.append(signal)
-    
-    # TIER 2: CoinGecko Free Tier
-    if not signals:
-        print("⚠️ Coinlore tidak ada hasil, fallback ke CoinGecko...")
-        top_gainers = get_crypto_top_gainers_coingecko()
-        
-        if top_gainers:
-            screening_method = "🦎 CoinGecko API (Top Gainers Crypto)"
-            print(f"✅ Menggunakan CoinGecko, ditemukan {len(top_gainers)} crypto")
-            
-            for crypto in top_gainers[:5]:
-                signal = analyze_crypto_signal(crypto)
-                if signal:
-                    signals.append(signal)
+    # Urutan prioritas: Coinlore → CoinGecko → YFinance (YFinance di-hedge karena paling berat)
+    tiers = [
+        ("🪙 Coinlore API (Top Gainers Crypto)", get_crypto_top_gainers_coinlore, 0),
+        ("🦎 CoinGecko API (Top Gainers Crypto)", get_crypto_top_gainers_coingecko, 0),
+        ("📊 YFinance (Major Crypto Pairs)", get_crypto_top_gainers_yfinance, 3)
+    ]
     
-    # TIER 3: YFinance Crypto (FALLBACK)
-    if not signals:
-        print("⚠️ CoinGecko tidak ada hasil, fallback ke YFinance...")
-        top_gainers = get_crypto_top_gainers_yfinance()
+    winner = "demo"
+    for method, source, top_gainers in run_fallback_tiers(tiers, CRYPTO_SCREENING_DEADLINE, market="crypto"):
+        print(f"✅ Menggunakan {method}, ditemukan {len(top_gainers)} crypto")
         
-        if top_gainers:
-            screening_method = "📊 YFinance (Major Crypto Pairs)"
-            print(f"✅ Menggunakan YFinance, ditemukan {len(top_gainers)} crypto")
-            
-            for crypto in top_gainers[:5]:
-                signal = analyze_crypto_signal(crypto)
-                if signal:
-                    signals.append(signal)
+        # Enrichment semua coin paralel; map menjaga urutan ranking
+        signals = [signal for signal in coin_executor.map(analyze_crypto_signal, top_gainers[:5]) if signal]
+        if signals:
+            screening_method = method
+            winner = source
+            break
+        print(f"⚠️ {method} tidak menghasilkan sinyal, coba tier berikutnya...")
+    SCREENING_TIER_WINS.inc(market="crypto", source=winner)
     
     # DEMO DATA (last resort)
     if not signals:
         print("⚠️ Semua crypto screening gagal, gunakan demo data")
         screening_method = "🔬 Demo Data (Crypto)"
         signals = [
-            {
-                "symbol": "BTC",
-                "name": "Bitcoin",
-                "sinyal": "🔬 Demo - Momentum kuat",
-                "entry": 45000.0,
-                "tp1": 47250.0,
-                "tp2": 49500.0,
-                "sl": 42750.0,
-                "volume": 25000000000,
-                "market_cap": 850000
-            }
+            CryptoSignal("BTC", "Bitcoin", "🔬 Demo - Momentum kuat", 45000.0, 47250.0, 49500.0, 42750.0,
+                         volume=25000000000, market_cap=850000)
         ]
     
     return signals, screening_method
@@ -702,13 +2265,407 @@ def calculate_bollinger_bands(prices, period=20, std_dev=2):
             sma.iloc[-1] if len(sma) > 0 else None,
             lower_band.iloc[-1] if len(lower_band) > 0 else None)
 
+# ================== VECTORIZED INDICATOR ENGINE ==================
+
+def stack_closes(series_list):
+    """
+    Susun beberapa seri close menjadi array 2-D (symbols x bars), rata kanan
+    
+    Seri yang lebih pendek di-pad NaN di kiri. Return (closes, lengths).
+    """
+    lengths = np.array([len(series) for series in series_list], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    closes = np.full((len(series_list), width), np.nan)
+    for i, series in enumerate(series_list):
+        if lengths[i]:
+            closes[i, width - lengths[i]:] = np.asarray(series, dtype=np.float64)
+    return closes, lengths
+
+@timed(INDICATOR_COMPUTE_SECONDS)
+def compute_indicator_set(closes, lengths=None, ema_periods=(20, 50), rsi_period=14,
+                          macd_params=(12, 26, 9), bb_params=(20, 2)):
+    """
+    Hitung EMA/RSI/MACD/BB untuk semua symbol sekaligus
+    
+    closes: array 2-D (symbols x bars) rata kanan (lihat stack_closes).
+    Semua kolom diproses dalam satu panggilan pandas per indikator, dan EMA yang sama
+    (mis. EMA MACD) hanya dihitung sekali. Return dict nama -> array nilai bar terakhir
+    per symbol; NaN jika data symbol kurang (setara None di calculate_*).
+    Hasil identik secara numerik dengan calculate_ema/rsi/macd/bollinger_bands.
+    """
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    if lengths is None:
+        lengths = np.count_nonzero(~np.isnan(closes), axis=1)
+    
+    # DataFrame bars x symbols: rolling/ewm pandas berjalan per kolom dalam satu call
+    prices = pd.DataFrame(closes.T)
+    fast, slow, signal = macd_params
+    bb_period, bb_std = bb_params
+    
+    ema_cache = {}
+    def ema(span):
+        if span not in ema_cache:
+            ema_cache[span] = prices.ewm(span=span, adjust=False).mean()
+        return ema_cache[span]
+    
+    def last(frame, min_length):
+        values = frame.iloc[-1].to_numpy(dtype=np.float64) if len(frame) else np.full(len(lengths), np.nan)
+        return np.where(lengths >= min_length, values, np.nan)
+    
+    result = {"close": last(prices, 1)}
+    
+    for period in ema_periods:
+        result[f"ema_{period}"] = last(ema(period), period)
+    
+    # RSI (rolling mean gain/loss)
+    delta = prices.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    result["rsi"] = last(100 - (100 / (1 + gain / loss)), rsi_period + 1)
+    
+    # MACD (share EMA fast/slow)
+    macd_line = ema(fast) - ema(slow)
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    result["macd"] = last(macd_line, slow)
+    result["macd_signal"] = last(signal_line, slow)
+    result["macd_hist"] = last(macd_line - signal_line, slow)
+    
+    # Bollinger Bands
+    sma = prices.rolling(window=bb_period).mean()
+    std = prices.rolling(window=bb_period).std()
+    result["bb_upper"] = last(sma + std * bb_std, bb_period)
+    result["bb_middle"] = last(sma, bb_period)
+    result["bb_lower"] = last(sma - std * bb_std, bb_period)
+    
+    return result
+
+def indicator_row(indicator_set, i):
+    """Ambil nilai indikator symbol ke-i sebagai dict float (NaN -> None)"""
+    row = {}
+    for name, values in indicator_set.items():
+        value = float(values[i])
+        row[name] = None if np.isnan(value) else value
+    return row
+
+def build_technical_signals(row):
+    """Bangun indicators dict & daftar sinyal teknikal dari satu baris indicator_row"""
+    indicators = {}
+    signals = []
+    
+    ema_20, ema_50 = row.get('ema_20'), row.get('ema_50')
+    if ema_20 and ema_50:
+        indicators['ema_20'] = round(ema_20, 8)
+        indicators['ema_50'] = round(ema_50, 8)
+        
+        # EMA Crossover Signal
+        if ema_20 > ema_50:
+            signals.append("EMA20 &gt; EMA50 (Bullish)")
+        else:
+            signals.append("EMA20 &lt; EMA50 (Bearish)")
+    
+    rsi = row.get('rsi')
+    if rsi:
+        indicators['rsi'] = round(rsi, 2)
+        
+        if rsi < 30:
+            signals.append(f"RSI {rsi:.1f} (Oversold)")
+        elif rsi > 70:
+            signals.append(f"RSI {rsi:.1f} (Overbought)")
+        else:
+            signals.append(f"RSI {rsi:.1f} (Neutral)")
+    
+    macd, signal_line = row.get('macd'), row.get('macd_signal')
+    if macd and signal_line:
+        indicators['macd'] = round(macd, 8)
+        indicators['macd_signal'] = round(signal_line, 8)
+        
+        if macd > signal_line:
+            signals.append("MACD Bullish")
+        else:
+            signals.append("MACD Bearish")
+    
+    bb_upper, bb_lower = row.get('bb_upper'), row.get('bb_lower')
+    if bb_upper and bb_lower:
+        indicators['bb_upper'] = round(bb_upper, 8)
+        indicators['bb_lower'] = round(bb_lower, 8)
+        
+        current_price = row['close']
+        if current_price > bb_upper:
+            signals.append("Price &gt; Upper BB (Overbought)")
+        elif current_price < bb_lower:
+            signals.append("Price &lt; Lower BB (Oversold)")
+    
+    return indicators, signals
+
+# ================== STREAMING INDICATORS ==================
+
+class IncrementalEMA:
+    """EMA O(1) per bar (rekurensi adjust=False, sama dengan calculate_ema)"""
+    
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value = None
+        self.count = 0
+    
+    def update(self, price):
+        self.value = price if self.value is None else self.alpha * price + (1 - self.alpha) * self.value
+        self.count += 1
+        return self.current()
+    
+    def current(self):
+        return self.value if self.count >= self.period else None
+    
+    def to_dict(self):
+        return {"period": self.period, "value": self.value, "count": self.count}
+    
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data["period"])
+        obj.value = data["value"]
+        obj.count = data["count"]
+        return obj
+
+class IncrementalRSI:
+    """
+    RSI O(1) per bar
+    
+    smoothing="sma": rata-rata rolling gain/loss (sama dengan calculate_rsi), window disimpan di deque;
+    jumlah berjalan di-resync dari window tiap period bar (amortized O(1)).
+    smoothing="wilder": Wilder smoothing, avg = (avg * (n - 1) + x) / n setelah seed SMA.
+    """
+    
+    def __init__(self, period=14, smoothing="sma"):
+        self.period = period
+        self.smoothing = smoothing
+        self.prev_price = None
+        self.gains = deque(maxlen=period)
+        self.losses = deque(maxlen=period)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+        self.deltas = 0
+    
+    def update(self, price):
+        if self.prev_price is not None:
+            delta = price - self.prev_price
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            self.deltas += 1
+            
+            if self.smoothing == "wilder" and self.avg_gain is not None:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+            else:
+                if len(self.gains) == self.period:
+                    self.gain_sum -= self.gains[0]
+                    self.loss_sum -= self.losses[0]
+                self.gains.append(gain)
+                self.losses.append(loss)
+                self.gain_sum += gain
+                self.loss_sum += loss
+                if self.deltas % self.period == 0:
+                    # Jumlah berjalan dihitung ulang dari window tiap period bar agar error float tidak menumpuk
+                    self.gain_sum = sum(self.gains)
+                    self.loss_sum = sum(self.losses)
+                if len(self.gains) == self.period:
+                    self.avg_gain = self.gain_sum / self.period
+                    self.avg_loss = self.loss_sum / self.period
+        self.prev_price = price
+        return self.current()
+    
+    def current(self):
+        if self.deltas < self.period or self.avg_gain is None:
+            return None
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else None
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+    
+    def to_dict(self):
+        return {"period": self.period, "smoothing": self.smoothing, "prev_price": self.prev_price,
+                "gains": list(self.gains), "losses": list(self.losses),
+                "avg_gain": self.avg_gain, "avg_loss": self.avg_loss, "deltas": self.deltas}
+    
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data["period"], data["smoothing"])
+        obj.prev_price = data["prev_price"]
+        obj.gains.extend(data["gains"])
+        obj.losses.extend(data["losses"])
+        obj.gain_sum = sum(obj.gains)
+        obj.loss_sum = sum(obj.losses)
+        obj.avg_gain = data["avg_gain"]
+        obj.avg_loss = data["avg_loss"]
+        obj.deltas = data["deltas"]
+        return obj
+
+class IncrementalMACD:
+    """MACD O(1) per bar (EMA fast/slow + EMA signal dari MACD line)"""
+    
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = IncrementalEMA(fast)
+        self.slow = IncrementalEMA(slow)
+        self.signal = IncrementalEMA(signal)
+    
+    def update(self, price):
+        self.fast.update(price)
+        self.slow.update(price)
+        self.signal.update(self.fast.value - self.slow.value)
+        return self.current()
+    
+    def current(self):
+        if self.slow.current() is None:
+            return None, None, None
+        macd_line = self.fast.value - self.slow.value
+        return macd_line, self.signal.value, macd_line - self.signal.value
+    
+    def to_dict(self):
+        return {"fast": self.fast.to_dict(), "slow": self.slow.to_dict(), "signal": self.signal.to_dict()}
+    
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls.__new__(cls)
+        obj.fast = IncrementalEMA.from_dict(data["fast"])
+        obj.slow = IncrementalEMA.from_dict(data["slow"])
+        obj.signal = IncrementalEMA.from_dict(data["signal"])
+        return obj
+
+class IncrementalBollinger:
+    """Bollinger Bands O(1) per bar: rolling mean & variance (sample, ddof=1) via sliding Welford"""
+    
+    def __init__(self, period=20, std_dev=2):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque(maxlen=period)
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def update(self, price):
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.window.append(price)
+            old_mean = self.mean
+            self.mean += (price - old) / self.period
+            self.m2 += (price - old) * (price - self.mean + old - old_mean)
+        else:
+            self.window.append(price)
+            delta = price - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (price - self.mean)
+        return self.current()
+    
+    def current(self):
+        if len(self.window) < self.period:
+            return None, None, None
+        std = (max(self.m2, 0.0) / (self.period - 1)) ** 0.5
+        return self.mean + std * self.std_dev, self.mean, self.mean - std * self.std_dev
+    
+    def to_dict(self):
+        return {"period": self.period, "std_dev": self.std_dev, "window": list(self.window)}
+    
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data["period"], data["std_dev"])
+        for price in data["window"]:
+            obj.update(price)
+        return obj
+
+class IndicatorState:
+    """
+    State indikator lengkap satu symbol (EMA20/50, RSI, MACD, BB), update O(1) per bar baru
+    
+    update() mengembalikan dict berformat sama dengan indicator_row, sehingga bisa langsung
+    dipakai build_technical_signals.
+    """
+    
+    def __init__(self, rsi_smoothing="sma"):
+        self.ema_20 = IncrementalEMA(20)
+        self.ema_50 = IncrementalEMA(50)
+        self.rsi = IncrementalRSI(14, rsi_smoothing)
+        self.macd = IncrementalMACD(12, 26, 9)
+        self.bb = IncrementalBollinger(20, 2)
+        self.close = None
+        self.last_time = None
+    
+    def update(self, price, bar_time=None):
+        self.close = price
+        self.last_time = bar_time
+        self.ema_20.update(price)
+        self.ema_50.update(price)
+        self.rsi.update(price)
+        self.macd.update(price)
+        self.bb.update(price)
+        return self.row()
+    
+    def row(self):
+        macd, macd_signal, macd_hist = self.macd.current()
+        bb_upper, bb_middle, bb_lower = self.bb.current()
+        return {
+            "close": self.close,
+            "ema_20": self.ema_20.current(),
+            "ema_50": self.ema_50.current(),
+            "rsi": self.rsi.current(),
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "bb_upper": bb_upper,
+            "bb_middle": bb_middle,
+            "bb_lower": bb_lower
+        }
+    
+    def snapshot(self):
+        """State JSON-serializable untuk disimpan & di-restore setelah restart"""
+        return {
+            "ema_20": self.ema_20.to_dict(),
+            "ema_50": self.ema_50.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "macd": self.macd.to_dict(),
+            "bb": self.bb.to_dict(),
+            "close": self.close,
+            "last_time": self.last_time
+        }
+    
+    @classmethod
+    def restore(cls, data):
+        obj = cls.__new__(cls)
+        obj.ema_20 = IncrementalEMA.from_dict(data["ema_20"])
+        obj.ema_50 = IncrementalEMA.from_dict(data["ema_50"])
+        obj.rsi = IncrementalRSI.from_dict(data["rsi"])
+        obj.macd = IncrementalMACD.from_dict(data["macd"])
+        obj.bb = IncrementalBollinger.from_dict(data["bb"])
+        obj.close = data["close"]
+        obj.last_time = data["last_time"]
+        return obj
+
+def save_indicator_states(states, path=None):
+    """Simpan dict symbol -> IndicatorState ke file JSON (atomic)"""
+    path = path or os.path.join(DATA_DIR, "indicator_states.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({symbol: state.snapshot() for symbol, state in states.items()}, f)
+    os.replace(tmp_path, path)
+
+def load_indicator_states(path=None):
+    """Load dict symbol -> IndicatorState dari file JSON (kosong jika belum ada / rusak)"""
+    path = path or os.path.join(DATA_DIR, "indicator_states.json")
+    try:
+        with open(path) as f:
+            return {symbol: IndicatorState.restore(data) for symbol, data in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except (ValueError, KeyError) as e:
+        print(f"⚠️ Indicator state rusak, mulai dari nol: {e}")
+        return {}
+
 # ================== EXTERNAL DATA APIs ==================
 
+@cached(fear_greed_cache, cache_if=lambda result: result[0] is not None)
 def get_fear_greed_index():
     """Get Crypto Fear & Greed Index from Alternative.me"""
     try:
         url = "https://api.alternative.me/fng/"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -722,34 +2679,102 @@ def get_fear_greed_index():
         print(f"❌ Error Fear & Greed Index: {e}")
         return None, None
 
-def get_binance_funding_rate(symbol):
-    """Get funding rate from Binance Futures"""
+@cached(binance_symbols_cache, cache_if=bool)
+def get_binance_perpetual_symbols():
+    """Index symbol perpetual USDT-M yang listing & trading di Binance Futures (frozenset)"""
+    try:
+        url = "https://fapi.binance.com/fapi/v1/exchangeInfo"
+        response = http_client.get(url, timeout=10)
+        
+        if response.status_code == 200:
+            symbols = frozenset(
+                item["symbol"] for item in response.json().get("symbols", [])
+                if item.get("contractType") == "PERPETUAL" and item.get("status") == "TRADING"
+            )
+            print(f"✅ Binance: {len(symbols)} perpetual symbols ter-index")
+            return symbols
+        
+        return frozenset()
+    except Exception as e:
+        print(f"⚠️ Binance exchangeInfo error: {e}")
+        return frozenset()
+
+@cached(premium_index_cache, cache_if=bool)
+def get_binance_premium_index():
+    """Snapshot funding rate semua symbol dari premiumIndex (satu request), dict symbol -> funding %"""
     try:
-        # Convert symbol format (BTC -> BTCUSDT)
-        binance_symbol = f"{symbol}USDT"
         url = "https://fapi.binance.com/fapi/v1/premiumIndex"
-        params = {"symbol": binance_symbol}
+        response = http_client.get(url, timeout=10)
         
-        response = requests.get(url, params=params, timeout=10)
+        if response.status_code == 200:
+            return {
+                item["symbol"]: float(item.get("lastFundingRate") or 0) * 100  # Convert to percentage
+                for item in response.json()
+            }
+        
+        return {}
+    except Exception as e:
+        print(f"⚠️ Binance premiumIndex error: {e}")
+        return {}
+
+def get_binance_quote_volumes():
+    """Quote volume 24h (USDT) semua symbol futures dari ticker/24hr (satu request), dict symbol -> volume"""
+    try:
+        url = "https://fapi.binance.com/fapi/v1/ticker/24hr"
+        response = http_client.get(url, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            funding_rate = float(data.get('lastFundingRate', 0)) * 100  # Convert to percentage
-            return funding_rate
+            return {item["symbol"]: float(item.get("quoteVolume") or 0) for item in response.json()}
         
-        return None
+        return {}
     except Exception as e:
-        print(f"⚠️ Funding rate error for {symbol}: {e}")
+        print(f"⚠️ Binance ticker/24hr error: {e}")
+        return {}
+
+def is_binance_perpetual_listed(symbol):
+    """
+    Cek apakah {symbol}USDT listing sebagai perpetual
+    
+    Return None jika index tidak tersedia (caller sebaiknya tetap mencoba request).
+    """
+    symbols = get_binance_perpetual_symbols()
+    if not symbols:
         return None
+    return f"{symbol}USDT" in symbols
+
+def get_binance_funding_rate(symbol):
+    """Get funding rate from Binance Futures (lookup O(1) dari snapshot premiumIndex)"""
+    return get_binance_premium_index().get(f"{symbol}USDT")
+
+def get_binance_klines(symbol, interval="1h", limit=150):
+    """Kline yang sudah close dari Binance Futures: list (open time detik, close); kosong jika gagal"""
+    try:
+        url = "https://fapi.binance.com/fapi/v1/klines"
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        response = http_client.get(url, params=params, timeout=10)
+        
+        if response.status_code == 200:
+            now_ms = time.time() * 1000
+            # Kline terakhir biasanya masih berjalan (close time di masa depan)
+            return [(row[0] / 1000, float(row[4])) for row in response.json() if row[6] < now_ms]
+        
+        return []
+    except Exception as e:
+        print(f"⚠️ Binance klines {symbol} error: {e}")
+        return []
 
+@cached(open_interest_cache, cache_if=lambda result: result is not None)
 def get_binance_open_interest(symbol):
-    """Get open interest from Binance Futures"""
+    """Get open interest from Binance Futures (skip tanpa network call jika symbol tidak listing)"""
+    if is_binance_perpetual_listed(symbol) is False:
+        return None
+    
     try:
         binance_symbol = f"{symbol}USDT"
         url = "https://fapi.binance.com/fapi/v1/openInterest"
         params = {"symbol": binance_symbol}
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -761,102 +2786,494 @@ def get_binance_open_interest(symbol):
         print(f"⚠️ Open interest error for {symbol}: {e}")
         return None
 
+# ================== CANDLE STORE ==================
+
+# Direktori data lokal (candle store, dll)
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+PERIOD_SECONDS = {"1d": 86400, "5d": 5 * 86400, "1mo": 30 * 86400, "3mo": 90 * 86400,
+                  "6mo": 180 * 86400, "1y": 365 * 86400, "2y": 730 * 86400}
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "4h": 4 * 3600, "1d": 86400}
+
+class CandleStore:
+    """
+    Penyimpanan OHLCV lokal per symbol & interval
+    
+    Tiap seri disimpan sebagai file .npy float64 kolom-major (6 x N: time, open, high, low,
+    close, volume) dan dibaca via memmap, sehingga tiap kolom adalah view NumPy contiguous
+    tanpa copy. Sync hanya men-download bar sejak bar terakhir yang tersimpan.
+    """
+    
+    FIELDS = ("time", "open", "high", "low", "close", "volume")
+    
+    def __init__(self, root, max_bars=5000, min_refresh=60):
+        self.root = root
+        self.max_bars = max_bars
+        self.min_refresh = min_refresh
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.last_sync = {}
+        self.backfilled = set()
+        self.counters = {"syncs": 0, "cold_fetches": 0, "delta_fetches": 0, "skipped": 0, "bars_downloaded": 0}
+    
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+    
+    def path(self, symbol, interval):
+        return os.path.join(self.root, "candles", f"{symbol}_{interval}.npy")
+    
+    def load(self, symbol, interval):
+        """Return memmap (6 x N) read-only, atau None jika belum ada"""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Candle store rusak untuk {symbol} {interval}, akan di-fetch ulang: {e}")
+            return None
+    
+    def append(self, symbol, interval, new_bars):
+        """Gabungkan bar baru (6 x M) ke seri tersimpan; bar tersimpan dengan time >= bar baru pertama diganti"""
+        existing = self.load(symbol, interval)
+        if existing is not None and existing.shape[1] > 0 and new_bars.shape[1] > 0:
+            keep = int(np.searchsorted(existing[0], new_bars[0, 0], side="left"))
+            merged = np.concatenate([existing[:, :keep], new_bars], axis=1)
+        elif new_bars.shape[1] > 0:
+            merged = new_bars
+        else:
+            return existing
+        
+        merged = np.ascontiguousarray(merged[:, -self.max_bars:])
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, merged)
+        os.replace(tmp_path, path)  # Atomic, memmap lama tetap valid
+        return self.load(symbol, interval)
+    
+    def window(self, series, since_ts):
+        """Dict kolom -> view NumPy untuk bar dengan time >= since_ts"""
+        start = int(np.searchsorted(series[0], since_ts, side="left"))
+        return {field: series[i, start:] for i, field in enumerate(self.FIELDS)}
+    
+    def sync(self, symbol, interval, period, fetch_fn):
+        """
+        Pastikan seri up to date lalu return window sesuai period
+        
+        fetch_fn(start_ts, period) -> array 6 x M; start_ts None berarti cold fetch seluruh period.
+        """
+        key = (symbol, interval)
+        with self._key_lock(key):
+            series = self.load(symbol, interval)
+            now = time.time()
+            period_start = now - PERIOD_SECONDS.get(period, 30 * 86400)
+            
+            # Seri tersimpan lebih pendek dari period yang diminta (mis. period multi-timeframe
+            # naik dari 1mo ke 3mo): backfill sekali per proses, symbol baru listing tidak di-fetch terus
+            short_history = (series is not None and series.shape[1] > 0
+                             and series[0, 0] > period_start + 86400 and (key, period) not in self.backfilled)
+            
+            if (series is not None and series.shape[1] > 0 and series[0, -1] >= period_start
+                    and not short_history):
+                if now - self.last_sync.get(key, 0) < self.min_refresh:
+                    self.counters["skipped"] += 1
+                    return self.window(series, period_start)
+                new_bars = fetch_fn(float(series[0, -1]), period)
+                self.counters["delta_fetches"] += 1
+            else:
+                new_bars = fetch_fn(None, period)
+                self.counters["cold_fetches"] += 1
+                self.backfilled.add((key, period))
+            
+            self.counters["syncs"] += 1
+            if new_bars is not None and new_bars.shape[1] > 0:
+                self.counters["bars_downloaded"] += new_bars.shape[1]
+                series = self.append(symbol, interval, new_bars)
+            self.last_sync[key] = now
+            
+            if series is None or series.shape[1] == 0:
+                return None
+            return self.window(series, period_start)
+    
+    def stats(self):
+        return dict(self.counters)
+
+candle_store = CandleStore(DATA_DIR)
+
+def _history_to_candles(hist):
+    """Konversi DataFrame history yfinance ke array float64 6 x N (time epoch detik di baris 0)"""
+    if hist is None or hist.empty:
+        return np.empty((6, 0))
+    timestamps = hist.index.as_unit("ns").asi8 // 10**9
+    return np.vstack([
+        timestamps.astype(np.float64),
+        hist["Open"].to_numpy(dtype=np.float64),
+        hist["High"].to_numpy(dtype=np.float64),
+        hist["Low"].to_numpy(dtype=np.float64),
+        hist["Close"].to_numpy(dtype=np.float64),
+        hist["Volume"].to_numpy(dtype=np.float64)
+    ])
+
+def _fetch_yf_candles(ticker_symbol, interval):
+    """Buat fetch_fn CandleStore untuk ticker yfinance (cold: period penuh, warm: sejak start_ts)"""
+    def fetch(start_ts, period):
+        ticker = yf.Ticker(ticker_symbol)
+        if start_ts is None:
+            hist = ticker.history(period=period, interval=interval)
+        else:
+            hist = ticker.history(start=datetime.fromtimestamp(start_ts, pytz.UTC), interval=interval)
+        return _history_to_candles(hist)
+    return fetch
+
 def get_crypto_historical_data(symbol, period="1mo", interval="1h"):
-    """Get historical OHLCV data for technical analysis"""
+    """Get historical OHLCV data for technical analysis (dari candle store lokal, hanya fetch delta)"""
     try:
         # Convert to YFinance format
         ticker_symbol = f"{symbol}-USD"
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # Get historical data
-        hist = ticker.history(period=period, interval=interval)
-        
-        if not hist.empty:
-            return {
-                'close': hist['Close'].tolist(),
-                'high': hist['High'].tolist(),
-                'low': hist['Low'].tolist(),
-                'volume': hist['Volume'].tolist(),
-                'open': hist['Open'].tolist()
-            }
-        
-        return None
+        return candle_store.sync(ticker_symbol, interval, period, _fetch_yf_candles(ticker_symbol, interval))
     except Exception as e:
         print(f"⚠️ Historical data error for {symbol}: {e}")
         return None
 
+# ================== MULTI-TIMEFRAME ==================
+
+# Timeframe konfirmasi crypto (mis. "15m,1h,4h,1d"). Hanya interval terkecil yang di-download;
+# timeframe lain di-resample lokal dari candle yang sama, jadi tambah timeframe = tambah CPU saja.
+CRYPTO_TIMEFRAMES = [tf.strip() for tf in os.getenv("CRYPTO_TIMEFRAMES", "1h,4h,1d").split(",")
+                     if tf.strip() in INTERVAL_SECONDS]
+# Timeframe utama untuk indicators & tech_signals di alert (perilaku lama: 1h)
+CRYPTO_SIGNAL_TIMEFRAME = os.getenv("CRYPTO_SIGNAL_TIMEFRAME", "1h")
+# Bar minimal di timeframe terbesar agar EMA50/MACD/BB terisi
+MTF_MIN_BARS = 60
+
+# Period maksimum yang dilayani yfinance per interval (intraday < 1h dibatasi 60 hari)
+YF_INTERVAL_MAX_PERIOD = {"1m": "5d", "5m": "1mo", "15m": "1mo", "30m": "1mo", "1h": "2y", "1d": "2y"}
+
+def crypto_history_plan(timeframes=None, signal_timeframe=None):
+    """
+    Tentukan (base interval, period, daftar timeframe) untuk satu download historis
+    
+    Base = timeframe terkecil yang bisa di-download yfinance; period = period terkecil yang
+    memberi MTF_MIN_BARS bar di timeframe terbesar (minimal 1mo, dibatasi limit yfinance).
+    """
+    timeframes = list(dict.fromkeys(timeframes or CRYPTO_TIMEFRAMES))
+    signal_timeframe = signal_timeframe or CRYPTO_SIGNAL_TIMEFRAME
+    if signal_timeframe in INTERVAL_SECONDS and signal_timeframe not in timeframes:
+        timeframes.append(signal_timeframe)
+    timeframes.sort(key=INTERVAL_SECONDS.get)
+    base = timeframes[0] if timeframes[0] in YF_INTERVAL_MAX_PERIOD else "1h"
+    base_seconds = INTERVAL_SECONDS[base]
+    # Timeframe yang bukan kelipatan base tidak bisa di-resample
+    timeframes = [tf for tf in timeframes if INTERVAL_SECONDS[tf] >= base_seconds and INTERVAL_SECONDS[tf] % base_seconds == 0]
+    
+    needed = max(MTF_MIN_BARS * INTERVAL_SECONDS[timeframes[-1]], PERIOD_SECONDS["1mo"])
+    max_seconds = PERIOD_SECONDS[YF_INTERVAL_MAX_PERIOD[base]]
+    candidates = sorted(PERIOD_SECONDS, key=PERIOD_SECONDS.get)
+    period = next((p for p in candidates if PERIOD_SECONDS[p] >= min(needed, max_seconds)), "1mo")
+    return base, period, timeframes
+
+def resample_candles(window, timeframe_seconds):
+    """
+    Resample window candle (dict kolom -> array, lihat CandleStore.window) ke timeframe lebih besar
+    
+    Bucket di-align ke epoch UTC (crypto 24/7: 4h = 00/04/08..., 1d = 00:00 UTC, sama dengan
+    candle harian yfinance). Bucket terakhir boleh belum lengkap (candle berjalan).
+    """
+    times = np.asarray(window["time"], dtype=np.float64)
+    if len(times) == 0:
+        return {field: np.empty(0) for field in CandleStore.FIELDS}
+    buckets = np.floor_divide(times, timeframe_seconds) * timeframe_seconds
+    # times sudah urut -> awal tiap bucket dari perubahan nilai bucket
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    return {
+        "time": buckets[starts],
+        "open": np.asarray(window["open"])[starts],
+        "high": np.maximum.reduceat(np.asarray(window["high"]), starts),
+        "low": np.minimum.reduceat(np.asarray(window["low"]), starts),
+        "close": np.asarray(window["close"])[ends],
+        "volume": np.add.reduceat(np.asarray(window["volume"]), starts)
+    }
+
+def timeframe_bias(row):
+    """Arah satu timeframe dari indicator_row: +1 bullish, -1 bearish, 0 netral / data kurang"""
+    votes = 0
+    if row.get("ema_20") is not None and row.get("ema_50") is not None:
+        votes += 1 if row["ema_20"] > row["ema_50"] else -1
+    if row.get("macd") is not None and row.get("macd_signal") is not None:
+        votes += 1 if row["macd"] > row["macd_signal"] else -1
+    rsi = row.get("rsi")
+    if rsi is not None:
+        votes += 1 if rsi < 30 else -1 if rsi > 70 else 0
+    return int(np.sign(votes))
+
+def analyze_timeframes(base_window, base_interval, timeframes):
+    """
+    Hitung indikator di semua timeframe dari satu window candle base interval
+    
+    Semua seri close di-stack lalu dihitung dalam satu panggilan compute_indicator_set.
+    Return (rows: timeframe -> indicator_row, biases: timeframe -> -1/0/+1, confluence).
+    Confluence = rata-rata bias timeframe yang datanya cukup (-1 semua bearish .. +1 semua bullish);
+    None jika kurang dari dua timeframe terisi.
+    """
+    series = {}
+    base_seconds = INTERVAL_SECONDS[base_interval]
+    for tf in timeframes:
+        seconds = INTERVAL_SECONDS[tf]
+        series[tf] = base_window["close"] if seconds == base_seconds else resample_candles(base_window, seconds)["close"]
+    
+    closes, lengths = stack_closes(list(series.values()))
+    indicator_set = compute_indicator_set(closes, lengths)
+    rows = {tf: indicator_row(indicator_set, i) for i, tf in enumerate(series)}
+    
+    biases = {tf: timeframe_bias(row) for tf, row in rows.items() if row.get("ema_20") is not None}
+    confluence = round(sum(biases.values()) / len(biases), 2) if len(biases) >= 2 else None
+    return rows, biases, confluence
+
+# Worker pool enrichment crypto: level coin & level fetch dipisah agar tidak deadlock
+ENRICHMENT_TIMEOUT = float(os.getenv("ENRICHMENT_TIMEOUT", "15"))
+coin_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="coin")
+fetch_executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix="fetch")
+
+def _future_result(future, deadline, default, label):
+    """Ambil hasil future dengan batas deadline (monotonic); default jika timeout/error"""
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FuturesTimeoutError:
+        print(f"⏱️ {label}: timeout, dilewati")
+    except Exception as e:
+        print(f"⚠️ {label}: {e}")
+    return default
+
+# ================== SYMBOL METADATA INDEX ==================
+
+# Metadata (market cap, shares, nama, sektor) jarang berubah: refresh bulk harian cukup
+SYMBOL_METADATA_MAX_AGE = 24 * 3600
+# Batas panggilan yf .info per refresh (fallback jika sumber bulk tidak tersedia)
+SYMBOL_METADATA_INFO_LIMIT = 200
+# Jeda sebelum mencoba lagi jika refresh bulk gagal (index tetap basi)
+SYMBOL_METADATA_RETRY = int(os.getenv("SYMBOL_METADATA_RETRY", "1800"))
+# Pool kecil khusus fallback .info agar tidak memakan slot fetch_executor milik enrichment crypto
+metadata_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="metadata")
+
+class SymbolMetadataIndex:
+    """
+    Index metadata symbol lokal: symbol -> {market_cap, shares, short_name, sector, price}.
+    
+    Lookup O(1) dari dict in-memory, disimpan ke JSON agar restart tidak perlu fetch ulang.
+    Jika snapshot sudah basi (> max_age), market cap dihitung ulang dari shares x harga live.
+    Symbol yang dicari tapi belum ada dicatat di 'wanted' untuk refresh berikutnya.
+    """
+    
+    FIELDS = ("market_cap", "shares", "short_name", "sector", "price")
+    
+    def __init__(self, path, max_age=SYMBOL_METADATA_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.entries = {}
+        self.updated_at = 0.0
+        self.wanted = set()
+        self.loaded = False
+        self.refreshing = False
+        self.attempted_at = 0.0
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "derived": 0, "misses": 0, "refreshes": 0}
+    
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                self.entries = data.get("symbols", {})
+                self.updated_at = data.get("updated_at", 0.0)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Symbol metadata rusak, diabaikan: {e}")
+            self.loaded = True
+    
+    def is_stale(self):
+        self._ensure_loaded()
+        return time.time() - self.updated_at > self.max_age
+    
+    def get(self, symbol):
+        self._ensure_loaded()
+        return self.entries.get(symbol)
+    
+    def market_cap(self, symbol, price=None):
+        """Market cap (satuan penuh mata uang asli) atau None; stale -> shares x price live"""
+        self._ensure_loaded()
+        entry = self.entries.get(symbol)
+        with self.lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                self.wanted.add(symbol)
+                return None
+            fresh = time.time() - self.updated_at <= self.max_age
+            if (fresh or not price) and entry.get("market_cap"):
+                self.counters["hits"] += 1
+                return entry["market_cap"]
+            if price and entry.get("shares"):
+                self.counters["derived"] += 1
+                return entry["shares"] * price
+            self.counters["misses"] += 1
+            return entry.get("market_cap")
+    
+    def update(self, records, fresh=True):
+        """Merge records {symbol: {field: value}} lalu simpan atomik; fresh=False tidak memajukan updated_at"""
+        self._ensure_loaded()
+        with self.lock:
+            for symbol, record in records.items():
+                entry = self.entries.setdefault(symbol, {})
+                entry.update({key: value for key, value in record.items() if key in self.FIELDS and value})
+                self.wanted.discard(symbol)
+            if fresh:
+                self.updated_at = time.time()
+                self.counters["refreshes"] += 1
+            data = {"updated_at": self.updated_at, "symbols": self.entries}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"⚠️ Gagal simpan symbol metadata: {e}")
+    
+    def refresh_async(self):
+        """Jalankan refresh_symbol_metadata di background jika index basi (tidak memblokir screener)"""
+        if not self.is_stale():
+            return False
+        with self.lock:
+            if self.refreshing or time.time() - self.attempted_at < SYMBOL_METADATA_RETRY:
+                return False
+            self.refreshing = True
+            self.attempted_at = time.time()
+        
+        def run():
+            try:
+                refresh_symbol_metadata()
+            except Exception as e:
+                print(f"⚠️ Refresh symbol metadata gagal: {e}")
+            finally:
+                with self.lock:
+                    self.refreshing = False
+        
+        threading.Thread(target=run, name="symbol-metadata", daemon=True).start()
+        return True
+    
+    def stats(self):
+        self._ensure_loaded()
+        with self.lock:
+            return {"symbols": len(self.entries), "wanted": len(self.wanted),
+                    "age_seconds": round(time.time() - self.updated_at, 1) if self.updated_at else None,
+                    "refreshing": self.refreshing, **self.counters}
+
+symbol_metadata = SymbolMetadataIndex(os.path.join(DATA_DIR, "symbol_metadata.json"))
+
+def _fetch_idx_metadata_tradingview():
+    """Metadata seluruh saham IDX dalam satu query TradingView screener"""
+    _, df = (Query()
+        .select('name', 'close', 'market_cap_basic', 'total_shares_outstanding', 'description', 'sector')
+        .where(Column('exchange') == 'IDX')
+        .limit(2000)
+        .get_scanner_data())
+    records = {}
+    for row in df.itertuples(index=False):
+        records[f"{row.name}.JK"] = {
+            "market_cap": float(row.market_cap_basic or 0), "shares": float(row.total_shares_outstanding or 0),
+            "short_name": row.description, "sector": row.sector, "price": float(row.close or 0)
+        }
+    return records
+
+def _fetch_info_metadata(symbol):
+    """Metadata satu symbol via yf .info (fallback, hanya dipanggil dari refresh harian)"""
+    try:
+        info = yf.Ticker(symbol).info
+    except Exception:
+        return symbol, None
+    return symbol, {
+        "market_cap": info.get("marketCap"),
+        "shares": info.get("sharesOutstanding") or info.get("circulatingSupply"),
+        "short_name": info.get("shortName"),
+        "sector": info.get("sector"),
+        "price": info.get("regularMarketPrice")
+    }
+
+def refresh_symbol_metadata():
+    """
+    Refresh bulk metadata (dijadwalkan harian): IDX dari TradingView dalam satu query;
+    symbol yang masih kosong (watchlist, crypto pairs, symbol 'wanted') via yf .info secara paralel.
+    Index hanya dianggap segar jika query bulk berhasil; hasil .info saja tetap di-merge.
+    """
+    started = time.monotonic()
+    records = {}
+    bulk_ok = False
+    try:
+        records.update(_fetch_idx_metadata_tradingview())
+        bulk_ok = True
+    except Exception as e:
+        print(f"⚠️ Metadata IDX dari TradingView gagal: {e}")
+    
+    with symbol_metadata.lock:
+        wanted = set(symbol_metadata.wanted)
+    candidates = [symbol for symbol in dict.fromkeys([*IDX_TICKERS, *CRYPTO_YF_PAIRS, *sorted(wanted)])
+                  if symbol not in records][:SYMBOL_METADATA_INFO_LIMIT]
+    for symbol, record in metadata_executor.map(_fetch_info_metadata, candidates):
+        if record:
+            records[symbol] = record
+    
+    symbol_metadata.update(records, fresh=bulk_ok)
+    print(f"✅ Symbol metadata diperbarui: {len(records)} symbol ({len(candidates)} via .info) "
+          f"dalam {time.monotonic() - started:.1f}s")
+    return len(records)
+
 def analyze_crypto_with_indicators(symbol, name, price, change_24h, volume, market_cap):
     """
     Analisis crypto dengan indikator teknikal lengkap
     Mengembalikan dict dengan signals dan indicators
+    
+    Historical data, Fear & Greed, funding rate & open interest di-fetch paralel
+    dengan batas waktu bersama ENRICHMENT_TIMEOUT. Historical data hanya di-download di
+    interval terkecil CRYPTO_TIMEFRAMES; confluence multi-timeframe dihitung dari resample lokal.
     """
+    deadline = time.monotonic() + ENRICHMENT_TIMEOUT
+    base_interval, period, timeframes = crypto_history_plan()
+    hist_future = fetch_executor.submit(get_crypto_historical_data, symbol, period, base_interval)
+    fg_future = fetch_executor.submit(get_fear_greed_index)
+    funding_future = fetch_executor.submit(get_binance_funding_rate, symbol)
+    oi_future = fetch_executor.submit(get_binance_open_interest, symbol)
+    
     # Get historical data for technical analysis
-    hist_data = get_crypto_historical_data(symbol)
+    hist_data = _future_result(hist_future, deadline, None, f"Historical data {symbol}")
     
     indicators = {}
     signals = []
     
     if hist_data and len(hist_data['close']) > 50:
-        close_prices = hist_data['close']
-        
-        # Calculate EMA 20 & 50
-        ema_20 = calculate_ema(close_prices, 20)
-        ema_50 = calculate_ema(close_prices, 50)
-        
-        if ema_20 and ema_50:
-            indicators['ema_20'] = round(ema_20, 8)
-            indicators['ema_50'] = round(ema_50, 8)
-            
-            # EMA Crossover Signal
-            if ema_20 > ema_50:
-                signals.append("EMA20 &gt; EMA50 (Bullish)")
-            else:
-                signals.append("EMA20 &lt; EMA50 (Bearish)")
-        
-        # Calculate RSI
-        rsi = calculate_rsi(close_prices, 14)
-        if rsi:
-            indicators['rsi'] = round(rsi, 2)
-            
-            if rsi < 30:
-                signals.append(f"RSI {rsi:.1f} (Oversold)")
-            elif rsi > 70:
-                signals.append(f"RSI {rsi:.1f} (Overbought)")
-            else:
-                signals.append(f"RSI {rsi:.1f} (Neutral)")
-        
-        # Calculate MACD
-        macd, signal_line, histogram = calculate_macd(close_prices)
-        if macd and signal_line:
-            indicators['macd'] = round(macd, 8)
-            indicators['macd_signal'] = round(signal_line, 8)
-            
-            if macd > signal_line:
-                signals.append("MACD Bullish")
-            else:
-                signals.append("MACD Bearish")
-        
-        # Calculate Bollinger Bands
-        bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(close_prices)
-        if bb_upper and bb_lower:
-            indicators['bb_upper'] = round(bb_upper, 8)
-            indicators['bb_lower'] = round(bb_lower, 8)
-            
-            current_price = close_prices[-1]
-            if current_price > bb_upper:
-                signals.append("Price &gt; Upper BB (Overbought)")
-            elif current_price < bb_lower:
-                signals.append("Price &lt; Lower BB (Oversold)")
+        # Satu download base interval; timeframe lain hasil resample lokal
+        rows, biases, confluence = analyze_timeframes(hist_data, base_interval, timeframes)
+        indicators, signals = build_technical_signals(rows.get(CRYPTO_SIGNAL_TIMEFRAME, rows[base_interval]))
+        if confluence is not None:
+            indicators['confluence'] = confluence
+            indicators['timeframes'] = biases
     
     # Get Fear & Greed Index
-    fg_value, fg_class = get_fear_greed_index()
+    fg_value, fg_class = _future_result(fg_future, deadline, (None, None), "Fear & Greed")
     if fg_value:
         indicators['fear_greed'] = fg_value
         indicators['fear_greed_class'] = fg_class
         signals.append(f"F&G: {fg_value} ({fg_class})")
     
     # Get Funding Rate (only for major coins on Binance)
-    funding_rate = get_binance_funding_rate(symbol)
+    funding_rate = _future_result(funding_future, deadline, None, f"Funding rate {symbol}")
     if funding_rate is not None:
         indicators['funding_rate'] = round(funding_rate, 4)
         if funding_rate > 0.01:
@@ -865,7 +3282,7 @@ def analyze_crypto_with_indicators(symbol, name, price, change_24h, volume, mark
             signals.append(f"Funding: {funding_rate:.3f}% (Bearish sentiment)")
     
     # Get Open Interest
-    open_interest = get_binance_open_interest(symbol)
+    open_interest = _future_result(oi_future, deadline, None, f"Open interest {symbol}")
     if open_interest:
         indicators['open_interest'] = open_interest
     
@@ -885,150 +3302,126 @@ def get_stock_data(symbol):
             "apikey": ALPHA_VANTAGE_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_client.get(url, params=params, timeout=10)
         data = response.json()
         
         if "Global Quote" in data and data["Global Quote"]:
             quote = data["Global Quote"]
-            return {
-                "symbol": symbol,
-                "price": float(quote.get("05. price", 0)),
-                "change_percent": quote.get("10. change percent", "0%"),
-                "volume": int(float(quote.get("06. volume", 0)))
-            }
+            # Alpha Vantage mengirim persen sebagai string "1.23%": parse sekali di sini
+            return ScreenedAsset(symbol, float(quote.get("05. price", 0)),
+                                 float(quote.get("10. change percent", "0%").rstrip("%") or 0),
+                                 float(quote.get("06. volume", 0)))
         return None
     except Exception as e:
         print(f"❌ Error mengambil data {symbol}: {e}")
         return None
 
-def analyze_stock_signal(stock_data):
-    """Analisis sinyal trading berdasarkan data saham"""
-    if not stock_data or stock_data["price"] == 0:
+def analyze_stock_signal(asset):
+    """Analisis sinyal trading berdasarkan data saham (ScreenedAsset)"""
+    if not asset or asset.price == 0:
         return None
     
-    price = stock_data["price"]
+    price = asset.price
     
+    tp1_pct, tp2_pct, sl_pct = STOCK_TP_SL_PCT
     entry = price
-    tp1 = round(price * 1.03, 2)
-    tp2 = round(price * 1.06, 2)
-    sl = round(price * 0.98, 2)
+    tp1 = round(price * (1 + tp1_pct / 100), 2)
+    tp2 = round(price * (1 + tp2_pct / 100), 2)
+    sl = round(price * (1 - sl_pct / 100), 2)
     
-    change = float(stock_data["change_percent"].replace("%", ""))
+    change = asset.change_pct
     
     if change > 2:
         signal = "Momentum kuat naik 🚀"
     elif change > 0.5:
         signal = "Breakout positif"
-    elif stock_data["volume"] > 1000000:
+    elif asset.volume > 1000000:
         signal = "Volume tinggi, akumulasi bandar"
     else:
         signal = "Potensi entry"
     
-    return {
-        "kode": stock_data["symbol"],
-        "sinyal": signal,
-        "entry": entry,
-        "tp1": tp1,
-        "tp2": tp2,
-        "sl": sl,
-        "volume": stock_data["volume"]
-    }
+    return StockSignal(asset.symbol, signal, entry, tp1, tp2, sl, asset.volume,
+                       market_cap=asset.market_cap, change_pct=change)
+
+def get_watchlist_alpha_vantage():
+    """Mendapatkan data watchlist manual dari Alpha Vantage (rate limit 5 calls/min)"""
+    watchlist = ["BBCA", "BMRI", "TLKM", "ASII", "BBNI"]
+    stocks = []
+    
+    for symbol in watchlist:
+        stock_data = get_stock_data(symbol)
+        if stock_data:
+            stocks.append(stock_data)
+            time.sleep(12)
+    
+    return stocks
 
-def get_trading_signals(session):
-    """Mendapatkan sinyal trading dengan dual screening system (YFinance + IDX Scraper)"""
+def get_trading_signals(session, deadline=None):
+    """Mendapatkan sinyal trading dengan multi-tier screening konkuren (deadline per sesi)"""
+    global idx_screening_coverage
     signals = []
     screening_method = "❓ Unknown"
+    deadline = deadline or get_screening_deadline(session)
     
-    print(f"🔍 Memulai screening untuk {session}...")
+    print(f"🔍 Memulai screening untuk {session} (deadline {deadline:.0f}s)...")
     
-    # TIER 1: YFinance Dynamic Screener (100% GRATIS, PRIMARY)
-    top_gainers = get_idx_top_gainers_yfinance()
-    
-    if top_gainers:
-        screening_method = "🚀 YFinance Screener (Top Gainers IDX)"
-        print(f"✅ Menggunakan YFinance screener, ditemukan {len(top_gainers)} saham")
-        
-        for stock in top_gainers[:5]:
-            signal = analyze_stock_signal(stock)
-            if signal:
-                signal["market_cap"] = stock.get("market_cap", 0)
-                signals.append(signal)
+    # Full-universe scan harus selesai sebelum deadline tier, sisakan waktu untuk analisis sinyal
+    yfinance_screener = functools.update_wrapper(
+        functools.partial(get_idx_top_gainers_yfinance, budget=max(5.0, min(IDX_SCREENING_BUDGET, deadline - 5))),
+        get_idx_top_gainers_yfinance)
     
-    # TIER 2: IDX Official Scraper (100% GRATIS, BACKUP)
-    if not signals:
-        print("⚠️ YFinance tidak ada hasil, fallback ke IDX Scraper...")
-        top_gainers = get_idx_top_gainers_scraper()
-        
-        if top_gainers:
-            screening_method = "📊 IDX Official Scraper (Top Gainers)"
-            print(f"✅ Menggunakan IDX scraper, ditemukan {len(top_gainers)} saham")
-            
-            for stock in top_gainers[:5]:
-                signal = analyze_stock_signal(stock)
-                if signal:
-                    signal["market_cap"] = stock.get("market_cap", 0)
-                    signals.append(signal)
+    # Urutan prioritas tier; tier lambat/jarang berhasil di-hedge dengan delay
+    tiers = [
+        ("🚀 YFinance Screener (Top Gainers IDX)", yfinance_screener, 0),              # TIER 1: GRATIS, PRIMARY
+        ("📊 IDX Official Scraper (Top Gainers)", get_idx_top_gainers_scraper, 0),     # TIER 2: GRATIS, BACKUP
+        ("🎯 Sectors.app (Top Gainers)", get_dynamic_top_movers, 0),                   # TIER 3: PAID, optional
+        ("📺 TradingView Screener (Top Gainers IDX)", get_idx_top_gainers_tradingview, 2)  # TIER 4: GRATIS
+    ]
     
-    # TIER 3: Sectors.app API (PAID, optional)
-    if not signals:
-        print("⚠️ Free screening tidak ada hasil, coba Sectors.app...")
-        top_movers = get_dynamic_top_movers()
-        
-        if top_movers:
-            screening_method = "🎯 Sectors.app (Top Gainers)"
-            print(f"✅ Menggunakan Sectors.app, ditemukan {len(top_movers)} saham")
-            
-            for stock in top_movers[:5]:
-                signal = analyze_stock_signal(stock)
-                if signal:
-                    signal["market_cap"] = stock.get("market_cap", 0)
-                    signals.append(signal)
+    # TIER 5: Alpha Vantage Watchlist (GRATIS dengan API key)
+    if ALPHA_VANTAGE_API_KEY:
+        tiers.append(("📋 Watchlist Manual (Alpha Vantage)", get_watchlist_alpha_vantage, 5))
     
-    # TIER 4: TradingView Screener (100% GRATIS)
-    if not signals:
-        print("⚠️ Sectors.app tidak ada hasil, coba TradingView screener...")
-        top_gainers = get_idx_top_gainers_tradingview()
+    winner = "demo"
+    for method, source, top_gainers in run_fallback_tiers(tiers, deadline, market="idx"):
+        print(f"✅ Menggunakan {method}, ditemukan {len(top_gainers)} saham")
         
-        if top_gainers:
-            screening_method = "📺 TradingView Screener (Top Gainers IDX)"
-            print(f"✅ Menggunakan TradingView screener, ditemukan {len(top_gainers)} saham")
-            
-            for stock in top_gainers[:5]:
-                signal = analyze_stock_signal(stock)
-                if signal:
-                    signal["market_cap"] = stock.get("market_cap", 0)
-                    signals.append(signal)
-    
-    # TIER 5: Alpha Vantage Watchlist (GRATIS dengan API key)
-    if not signals and ALPHA_VANTAGE_API_KEY:
-        print("⚠️ Dynamic screening tidak ada hasil, fallback ke watchlist manual...")
-        screening_method = "📋 Watchlist Manual (Alpha Vantage)"
-        watchlist = ["BBCA", "BMRI", "TLKM", "ASII", "BBNI"]
-        
-        for symbol in watchlist:
-            stock_data = get_stock_data(symbol)
-            if stock_data:
-                signal = analyze_stock_signal(stock_data)
-                if signal:
-                    signals.append(signal)
-                time.sleep(12)
+        for asset in top_gainers[:5]:
+            signal = analyze_stock_signal(asset)
+            if signal:
+                signals.append(signal)
+        if signals:
+            screening_method = method
+            coverage = getattr(top_gainers, "coverage", None)
+            if coverage:
+                idx_screening_coverage = coverage
+                screening_method += f"\n📡 Coverage: {coverage['evaluated']}/{coverage['total']} saham ({coverage['ratio']:.0%})"
+            winner = source
+            break
+        print(f"⚠️ {method} tidak menghasilkan sinyal, coba tier berikutnya...")
+    SCREENING_TIER_WINS.inc(market="idx", source=winner)
     
     # TIER 6: Demo Data (Final Fallback)
     if not signals:
         screening_method = "🔬 Demo Data"
         print("⚠️ Semua screening gagal, menggunakan demo data")
         demo_signals = [
-            {"kode": "BBCA", "sinyal": "Breakout level resistance", "entry": 9710, "tp1": 9900, "tp2": 10100, "sl": 9550, "volume": 5000000, "market_cap": 584000},
-            {"kode": "BMRI", "sinyal": "Volume spike, momentum kuat", "entry": 7650, "tp1": 7900, "tp2": 8200, "sl": 7500, "volume": 8500000, "market_cap": 452000},
-            {"kode": "TLKM", "sinyal": "Support kuat di 3500", "entry": 3550, "tp1": 3650, "tp2": 3800, "sl": 3480, "volume": 12000000, "market_cap": 356000}
+            StockSignal("BBCA", "Breakout level resistance", 9710, 9900, 10100, 9550, 5000000, market_cap=584000),
+            StockSignal("BMRI", "Volume spike, momentum kuat", 7650, 7900, 8200, 7500, 8500000, market_cap=452000),
+            StockSignal("TLKM", "Support kuat di 3500", 3550, 3650, 3800, 3480, 12000000, market_cap=356000)
         ]
         return demo_signals, screening_method
     
     return signals, screening_method
 
-def format_alert(session):
-    """Format pesan alert untuk Telegram"""
-    signals, screening_method = get_trading_signals(session)
+def format_alert(session, signals=None, screening_method=None):
+    """
+    Format pesan alert untuk Telegram
+    
+    Jika signals sudah dihitung (mis. di job_alert untuk dicatat ke journal), dipakai ulang tanpa screening ulang.
+    """
+    if signals is None:
+        signals, screening_method = get_trading_signals(session)
     now = datetime.now(WIB).strftime("%d-%b-%Y %H:%M WIB")
     
     if not signals:
@@ -1039,13 +3432,13 @@ def format_alert(session):
     message += f"{screening_method}\n\n"
     
     for s in signals:
-        message += f"💡 <b>{s['kode']}</b>\n"
-        message += f"📈 {s['sinyal']}\n"
-        message += f"🎯 Entry: {s['entry']} | TP1: {s['tp1']} | TP2: {s['tp2']} | SL: {s['sl']}\n"
-        message += f"📊 Volume: {s['volume']:,}"
+        message += f"💡 <b>{s.kode}</b>\n"
+        message += f"📈 {s.sinyal}\n"
+        message += f"🎯 Entry: {s.entry:.10g} | TP1: {s.tp1:.10g} | TP2: {s.tp2:.10g} | SL: {s.sl:.10g}\n"
+        message += f"📊 Volume: {s.volume:,.0f}"
         
-        if s.get('market_cap'):
-            mcap_text = f"{s['market_cap']:,.0f}B" if s['market_cap'] < 1000 else f"{s['market_cap']/1000:.1f}T"
+        if s.market_cap:
+            mcap_text = f"{s.market_cap:,.0f}B" if s.market_cap < 1000 else f"{s.market_cap/1000:.1f}T"
             message += f" | MCap: {mcap_text}"
         
         message += "\n\n"
@@ -1053,9 +3446,14 @@ def format_alert(session):
     message += "#FollowTheWhale 🐋 #HybridScalper"
     return message
 
-def format_crypto_alert(session="CRYPTO"):
-    """Format pesan crypto alert untuk Telegram dengan indikator teknikal (harga dalam IDR)"""
-    signals, screening_method = get_crypto_trading_signals()
+def format_crypto_alert(session="CRYPTO", signals=None, screening_method=None):
+    """
+    Format pesan crypto alert untuk Telegram dengan indikator teknikal (harga dalam IDR)
+    
+    Jika signals sudah dihitung (mis. di /test-crypto), dipakai ulang tanpa screening ulang.
+    """
+    if signals is None:
+        signals, screening_method = get_crypto_trading_signals()
     now = datetime.now(WIB).strftime("%d-%b-%Y %H:%M WIB")
     
     if not signals:
@@ -1068,29 +3466,29 @@ def format_crypto_alert(session="CRYPTO"):
     
     for s in signals:
         # Konversi harga ke IDR
-        entry_idr = s['entry'] * USD_TO_IDR
-        tp1_idr = s['tp1'] * USD_TO_IDR
-        tp2_idr = s['tp2'] * USD_TO_IDR
-        sl_idr = s['sl'] * USD_TO_IDR
+        entry_idr = s.entry * USD_TO_IDR
+        tp1_idr = s.tp1 * USD_TO_IDR
+        tp2_idr = s.tp2 * USD_TO_IDR
+        sl_idr = s.sl * USD_TO_IDR
         
         # Basic Info
-        message += f"💎 <b>{s['symbol']}</b> - {s.get('name', s['symbol'])}\n"
-        message += f"📈 {s['sinyal']}\n"
+        message += f"💎 <b>{s.symbol}</b> - {s.name or s.symbol}\n"
+        message += f"📈 {s.sinyal}\n"
         message += f"🎯 Entry: Rp {entry_idr:,.0f} | TP1: Rp {tp1_idr:,.0f} | TP2: Rp {tp2_idr:,.0f} | SL: Rp {sl_idr:,.0f}\n"
         
         # Volume & Market Cap (tetap USD untuk mudah dibaca)
-        vol_text = f"${s['volume']/1e6:.1f}M" if s['volume'] < 1e9 else f"${s['volume']/1e9:.2f}B"
-        mcap_text = f"${s['market_cap']:.0f}M"
+        vol_text = f"${s.volume/1e6:.1f}M" if s.volume < 1e9 else f"${s.volume/1e9:.2f}B"
+        mcap_text = f"${s.market_cap:.0f}M"
         message += f"📊 Vol: {vol_text} | MCap: {mcap_text}"
         
-        if s.get('change_24h'):
-            message += f" | 24h: +{s['change_24h']:.1f}%"
+        if s.change_24h:
+            message += f" | 24h: {s.change_24h:+.1f}%"
         
         message += "\n"
         
         # Technical Indicators (if available)
-        if s.get('indicators'):
-            ind = s['indicators']
+        if s.indicators:
+            ind = s.indicators
             message += "🔍 Indicators: "
             
             # RSI
@@ -1114,9 +3512,15 @@ def format_crypto_alert(session="CRYPTO"):
             
             message += "\n"
         
+        # Multi-timeframe confluence (if available)
+        if s.confluence is not None:
+            arrows = " ".join(f"{tf} {'▲' if bias > 0 else '▼' if bias < 0 else '•'}"
+                              for tf, bias in s.indicators.get('timeframes', {}).items())
+            message += f"🧭 MTF: {arrows} (confluence {s.confluence:+.2f})\n"
+        
         # Technical Signals summary (if available)
-        if s.get('tech_signals'):
-            message += f"📉 {', '.join(s['tech_signals'][:3])}\n"
+        if s.tech_signals:
+            message += f"📉 {', '.join(s.tech_signals[:3])}\n"
         
         message += "\n"
     
@@ -1124,6 +3528,7 @@ def format_crypto_alert(session="CRYPTO"):
     message += "#CryptoScalper 🪙 #HybridBot"
     return message
 
+@timed(JOB_DURATION_SECONDS, failures=JOB_FAILURES, job="idx")
 def job_alert(session):
     """Job scheduler untuk mengirim alert saham IDX"""
     now = datetime.now(WIB).strftime("%d-%b-%Y %H:%M:%S WIB")
@@ -1131,11 +3536,14 @@ def job_alert(session):
     print(f"🔔 SCHEDULER TRIGGERED: {session}")
     print(f"⏰ Waktu: {now}")
     print(f"{'='*60}")
-    text = format_alert(session)
+    signals, screening_method = get_trading_signals(session)
+    text = format_alert(session, signals, screening_method)
     send_telegram_message(text)
-    print(f"✅ Alert {session} berhasil dikirim ke Telegram")
+    signal_journal.record("idx", session, screening_method, signals)
+    print(f"✅ Alert {session} masuk antrian Telegram")
     print(f"{'='*60}\n")
 
+@timed(JOB_DURATION_SECONDS, failures=JOB_FAILURES, job="crypto")
 def job_crypto_alert(session):
     """Job scheduler untuk mengirim alert crypto"""
     now = datetime.now(WIB).strftime("%d-%b-%Y %H:%M:%S WIB")
@@ -1143,14 +3551,275 @@ def job_crypto_alert(session):
     print(f"🪙 SCHEDULER TRIGGERED: {session}")
     print(f"⏰ Waktu: {now}")
     print(f"{'='*60}")
-    text = format_crypto_alert(session)
+    signals, screening_method = get_crypto_trading_signals()
+    text = format_crypto_alert(session, signals, screening_method)
     send_telegram_message(text)
-    print(f"✅ Crypto alert {session} berhasil dikirim ke Telegram")
+    signal_journal.record("crypto", session, screening_method, signals)
+    print(f"✅ Crypto alert {session} masuk antrian Telegram")
     print(f"{'='*60}\n")
 
+# ================== JOB SCHEDULER ==================
+
+# Job yang terlewat (mis. restart setelah jadwal) tetap dijalankan jika masih dalam grace window
+SCHEDULER_GRACE_SECONDS = float(os.getenv("SCHEDULER_GRACE_MINUTES", "30")) * 60
+
+class ScheduledJob:
+    """Job harian pada jam HH:MM UTC"""
+    
+    def __init__(self, name, func, hour, minute, kwargs):
+        self.name = name
+        self.func = func
+        self.hour = hour
+        self.minute = minute
+        self.kwargs = kwargs
+        self.next_run = None
+        self.last_run = None  # Jadwal terakhir yang selesai dijalankan (dasar catch-up)
+        self.running_since = None  # Jadwal yang sedang berjalan
+        self.running = False
+    
+    def occurrence_on(self, day):
+        return datetime(day.year, day.month, day.day, self.hour, self.minute, tzinfo=pytz.UTC)
+    
+    def next_after(self, moment):
+        candidate = self.occurrence_on(moment)
+        return candidate if candidate > moment else candidate + timedelta(days=1)
+    
+    def previous_before(self, moment):
+        candidate = self.occurrence_on(moment)
+        return candidate if candidate <= moment else candidate - timedelta(days=1)
+
+class JobScheduler:
+    """
+    Scheduler berbasis heap: tidur tepat sampai job berikutnya due, lalu dispatch ke worker pool
+    sehingga job lambat (mis. screening IDX) tidak menunda job lain.
+    
+    Jadwal terakhir yang selesai dijalankan tiap job disimpan ke file state setelah job selesai;
+    saat start, job yang terlewat dalam grace window dijalankan sekali (catch-up), termasuk job
+    yang sempat mulai tapi prosesnya mati sebelum selesai. Job yang masih berjalan tidak di-dispatch ulang.
+    """
+    
+    def __init__(self, max_workers=3, state_path=None, grace_seconds=SCHEDULER_GRACE_SECONDS):
+        self.jobs = {}
+        self.heap = []
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.state_path = state_path or os.path.join(DATA_DIR, "scheduler_state.json")
+        self.grace_seconds = grace_seconds
+        self.started = False
+    
+    def daily(self, at, func, **kwargs):
+        """Daftarkan job harian pada jam 'HH:MM' UTC"""
+        hour, minute = (int(part) for part in at.split(":"))
+        name = f"{func.__name__}:{kwargs.get('session', at)}"
+        self.jobs[name] = ScheduledJob(name, func, hour, minute, kwargs)
+        return self.jobs[name]
+    
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return {name: datetime.fromisoformat(value) for name, value in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Scheduler state rusak, diabaikan: {e}")
+            return {}
+    
+    def _save_state(self):
+        state = {name: job.last_run.isoformat() for name, job in self.jobs.items() if job.last_run}
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"⚠️ Gagal simpan scheduler state: {e}")
+    
+    def _push(self, job, run_at):
+        job.next_run = run_at
+        heapq.heappush(self.heap, (run_at.timestamp(), next(self.seq), job.name))
+    
+    def _dispatch(self, job, scheduled_for):
+        """Dipanggil dengan self.cond dipegang"""
+        if job.running:
+            print(f"⚠️ Job {job.name} masih berjalan, jadwal {scheduled_for:%H:%M} UTC dilewati")
+            return
+        job.running = True
+        job.running_since = scheduled_for
+        self.executor.submit(self._run, job, scheduled_for)
+    
+    def _run(self, job, scheduled_for):
+        lag = (datetime.now(pytz.UTC) - scheduled_for).total_seconds()
+        print(f"▶️ Job {job.name} (jadwal {scheduled_for:%H:%M} UTC, lag {lag:.1f}s)")
+        try:
+            job.func(**job.kwargs)
+        except Exception as e:
+            print(f"❌ Job {job.name} error: {e}")
+        finally:
+            # Baru dicatat selesai di sini: crash di tengah job membuat jadwal ini di-catch-up saat restart
+            with self.cond:
+                job.running = False
+                job.running_since = None
+                if job.last_run is None or scheduled_for > job.last_run:
+                    job.last_run = scheduled_for
+                    self._save_state()
+    
+    def start(self):
+        with self.cond:
+            if self.started:
+                return
+            self.started = True
+            now = datetime.now(pytz.UTC)
+            state = self._load_state()
+            
+            for job in self.jobs.values():
+                job.last_run = state.get(job.name)
+                missed = job.previous_before(now)
+                if (now - missed).total_seconds() <= self.grace_seconds and (job.last_run is None or job.last_run < missed):
+                    print(f"⏪ Catch-up job terlewat: {job.name} (jadwal {missed:%H:%M} UTC)")
+                    self._dispatch(job, missed)
+                self._push(job, job.next_after(now))
+        
+        threading.Thread(target=self._loop, daemon=True).start()
+    
+    def _loop(self):
+        with self.cond:
+            while True:
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                run_ts, _, name = self.heap[0]
+                delay = run_ts - time.time()
+                if delay > 0:
+                    # Dibatasi 60s agar tetap akurat jika jam sistem berubah
+                    self.cond.wait(min(delay, 60))
+                    continue
+                heapq.heappop(self.heap)
+                job = self.jobs[name]
+                scheduled_for = job.next_run
+                self._push(job, job.next_after(scheduled_for))
+                self._dispatch(job, scheduled_for)
+    
+    def jobs_info(self):
+        with self.cond:
+            return [{
+                "name": job.name,
+                "job_func": job.func.__name__,
+                "at_time": f"{job.hour:02d}:{job.minute:02d} UTC",
+                "next_run": str(job.next_run) if job.next_run else None,
+                "last_run": str(job.last_run) if job.last_run else None,
+                "running": job.running,
+                "running_since": str(job.running_since) if job.running_since else None
+            } for job in sorted(self.jobs.values(), key=lambda job: job.next_run or datetime.max.replace(tzinfo=pytz.UTC))]
+
+job_scheduler = JobScheduler()
+
+# ================== LEADER ELECTION ==================
+
+# File lock leader (default DATA_DIR/scheduler.lock) & interval follower mencoba ambil alih (detik)
+LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH")
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "15"))
+
+class LeaderElection:
+    """
+    Leader election antar worker Gunicorn via flock non-blocking pada file lock
+    
+    Worker yang memegang lock menjalankan scheduler, stream crypto & refresher snapshot; worker
+    lain (follower) hanya melayani HTTP dan mencoba ambil alih tiap retry_seconds. Kernel melepas
+    lock saat proses leader mati, jadi failover tidak butuh heartbeat.
+    """
+    
+    def __init__(self, path=None, retry_seconds=LEADER_RETRY_SECONDS):
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.role = "standalone"  # standalone (tanpa election) | leader | follower
+        self.fd = None
+        self.elected_at = None
+        self.attempts = 0
+    
+    @property
+    def is_follower(self):
+        return self.role == "follower"
+    
+    def _try_acquire(self):
+        try:
+            import fcntl
+        except ImportError:
+            print("⚠️ fcntl tidak tersedia, leader election dilewati (proses ini selalu leader)")
+            return True
+        self.path = self.path or os.path.join(DATA_DIR, "scheduler.lock")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # fd sengaja dibiarkan terbuka: lock bertahan selama proses hidup
+        self.fd = fd
+        info = json.dumps({"pid": os.getpid(), "host": os.uname().nodename, "since": time.time()})
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, info.encode(), 0)
+        return True
+    
+    def _become_leader(self, on_elected):
+        self.role = "leader"
+        self.elected_at = datetime.now(WIB)
+        print(f"👑 Worker PID {os.getpid()} menjadi leader (scheduler, stream & snapshot jalan di sini)")
+        on_elected()
+    
+    def _retry_loop(self, on_elected):
+        while True:
+            time.sleep(self.retry_seconds)
+            self.attempts += 1
+            try:
+                acquired = self._try_acquire()
+            except OSError as e:
+                print(f"⚠️ Leader election gagal: {e}")
+                continue
+            if acquired:
+                self._become_leader(on_elected)
+                return
+    
+    def start(self, on_elected):
+        """Coba jadi leader; jika lock dipegang worker lain, jadi follower & retry di background"""
+        self.attempts += 1
+        try:
+            acquired = self._try_acquire()
+        except OSError as e:
+            # Lebih baik alert dobel daripada tidak ada scheduler sama sekali
+            print(f"⚠️ File lock leader tidak bisa dibuka ({e}), proses ini jalan sebagai leader")
+            acquired = True
+        if acquired:
+            self._become_leader(on_elected)
+            return
+        self.role = "follower"
+        print(f"👥 Worker PID {os.getpid()} follower, scheduler dipegang PID {self.leader_info().get('pid')}")
+        threading.Thread(target=self._retry_loop, args=(on_elected,), name="leader-election", daemon=True).start()
+    
+    def leader_info(self):
+        """Isi file lock: pid, host & waktu leader terakhir memegang lock"""
+        if not self.path:
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.loads(f.read() or "{}")
+        except (OSError, ValueError):
+            return {}
+    
+    def status(self):
+        leader = self.leader_info()
+        if leader.get("since"):
+            leader["since"] = datetime.fromtimestamp(leader["since"], WIB).strftime("%Y-%m-%d %H:%M:%S WIB")
+        return {"role": self.role, "pid": os.getpid(), "lock_path": self.path, "leader": leader,
+                "elected_at": self.elected_at.strftime("%Y-%m-%d %H:%M:%S WIB") if self.elected_at else None,
+                "attempts": self.attempts, "retry_seconds": self.retry_seconds}
+
+leader_election = LeaderElection(LEADER_LOCK_PATH)
+
 def scheduler_thread():
     """Thread untuk menjalankan scheduler"""
-    import pytz
     now_wib = datetime.now(WIB)
     now_utc = datetime.now(pytz.UTC)
     
@@ -1158,13 +3827,16 @@ def scheduler_thread():
     print(f"🕐 Waktu sekarang: {now_wib.strftime('%d-%b-%Y %H:%M WIB')} ({now_utc.strftime('%H:%M UTC')})")
     
     # Jadwal Saham IDX
-    schedule.every().day.at("01:55").do(job_alert, session="PRE-MARKET (08:55 WIB)")
-    schedule.every().day.at("03:30").do(job_alert, session="SESI 1 (10:30 WIB)")
-    schedule.every().day.at("08:30").do(job_alert, session="CLOSING (15:30 WIB)")
+    job_scheduler.daily("01:55", job_alert, session="PRE-MARKET (08:55 WIB)")
+    job_scheduler.daily("03:30", job_alert, session="SESI 1 (10:30 WIB)")
+    job_scheduler.daily("08:30", job_alert, session="CLOSING (15:30 WIB)")
     
     # Jadwal Cryptocurrency
-    schedule.every().day.at("05:00").do(job_crypto_alert, session="SIANG (12:00 WIB)")
-    schedule.every().day.at("09:30").do(job_crypto_alert, session="SORE (16:30 WIB)")
+    job_scheduler.daily("05:00", job_crypto_alert, session="SIANG (12:00 WIB)")
+    job_scheduler.daily("09:30", job_crypto_alert, session="SORE (16:30 WIB)")
+    
+    # Metadata symbol (market cap, shares, sektor): refresh bulk harian sebelum pre-market
+    job_scheduler.daily("23:00", refresh_symbol_metadata)
     
     print("\n📅 Jadwal notifikasi IDX:")
     print("   - PRE-MARKET: 08:55 WIB (01:55 UTC)")
@@ -1173,48 +3845,1070 @@ def scheduler_thread():
     print("\n🪙 Jadwal notifikasi CRYPTO:")
     print("   - SIANG: 12:00 WIB (05:00 UTC)")
     print("   - SORE: 16:30 WIB (09:30 UTC)")
+    print("\n🗂️ Refresh metadata symbol: 06:00 WIB (23:00 UTC)")
+    
+    job_scheduler.start()
     
     # Display next run times
-    jobs = schedule.get_jobs()
     print("\n⏭️  Next scheduled runs:")
-    for job in jobs:
-        func_name = job.job_func.__name__.replace("job_", "").replace("_alert", "").upper()
-        next_run = job.next_run.strftime("%d-%b %H:%M UTC")
-        print(f"   - {func_name}: {next_run}")
+    for job in job_scheduler.jobs_info():
+        func_name = job["job_func"].replace("job_", "").replace("_alert", "").upper()
+        print(f"   - {func_name}: {job['next_run']}")
     
-    print("\n📌 NOTE: Jika bot di-restart setelah jadwal hari ini, alert akan jalan besok.")
+    print(f"\n📌 NOTE: Jika bot di-restart maks {SCHEDULER_GRACE_SECONDS / 60:.0f} menit setelah jadwal, alert yang terlewat tetap dikirim.")
     print("📌 Di production (Railway), bot running 24/7, alert otomatis sesuai jadwal!\n")
+
+# ================== SIGNAL SNAPSHOT ==================
+
+# Interval refresh background snapshot sinyal (detik)
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "900"))
+# Interval leader memeriksa permintaan refresh dari worker follower (detik)
+SNAPSHOT_REQUEST_POLL = 2.0
+
+class SnapshotStore:
+    """
+    Snapshot in-memory berversi untuk hasil screening (IDX, crypto, TradingView)
     
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+    Refresher background menghitung ulang tiap key sesuai interval; endpoint HTTP hanya
+    membaca snapshot terakhir. request_refresh() menjadwalkan recompute async (single-flight).
+    
+    Multi-worker: hanya leader yang menghitung dan mem-publish ke shared_state. Follower membaca
+    snapshot dari sana, dan request_refresh() di follower menitip permintaan untuk leader.
+    Refresher tetap lazy: leader baru mulai menghitung saat snapshot dibaca / diminta pertama kali
+    (dari worker mana pun), bukan sejak startup.
+    """
+    
+    def __init__(self, max_workers=2, shared=None):
+        self.sources = {}  # key -> (compute_fn, interval)
+        self.entries = {}  # key -> snapshot dict
+        self.remote = {}  # key -> snapshot dict terakhir dari shared state (follower)
+        self.refreshing = set()
+        self.next_due = {}
+        self.demanded = {}  # key -> monotonic permintaan terakhir follower untuk snapshot basi
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot")
+        self.shared = shared
+        self.started = False
+    
+    def register(self, key, compute_fn, interval=SNAPSHOT_REFRESH_INTERVAL):
+        self.sources[key] = (compute_fn, interval)
+    
+    def _is_remote(self):
+        """True jika snapshot dihitung worker leader lain"""
+        return self.shared is not None and self.shared.enabled and leader_election.is_follower
+    
+    def _get_remote(self, key):
+        known = self.remote.get(key)
+        found = self.shared.get("snapshot", key, known_at=known["updated_at"] if known else None)
+        if found is None:
+            return None
+        if found[1] is not SharedStateStore.UNCHANGED:
+            self.remote[key] = found[1]
+        snapshot = dict(self.remote[key])
+        snapshot["refreshing"] = self.shared.get("snapshot_refresh", key) is not None
+        return snapshot
+    
+    def get(self, key):
+        """Snapshot terakhir (copy dict metadata) atau None; refresher otomatis start saat dibaca pertama kali"""
+        if self._is_remote():
+            snapshot = self._get_remote(key)
+            if snapshot and not snapshot["refreshing"]:
+                self._demand_if_stale(key, snapshot)
+        else:
+            self.ensure_started()
+            with self.lock:
+                entry = self.entries.get(key)
+                snapshot = dict(entry) if entry else None
+                refreshing = key in self.refreshing
+            if snapshot:
+                snapshot["refreshing"] = refreshing
+        if snapshot:
+            snapshot["age_seconds"] = round(time.time() - snapshot["updated_at"], 1)
+        return snapshot
+    
+    def _demand_if_stale(self, key, snapshot):
+        """
+        Follower: snapshot jauh melewati interval (refresher leader belum jalan, mis. setelah failover)
+        -> titip permintaan refresh, maksimal sekali per interval per key
+        """
+        interval = self.sources[key][1] if key in self.sources else SNAPSHOT_REFRESH_INTERVAL
+        if time.time() - snapshot["updated_at"] <= 2 * interval:
+            return
+        now = time.monotonic()
+        if now - self.demanded.get(key, -interval) < interval:
+            return
+        self.demanded[key] = now
+        self.request_refresh(key)
+    
+    def publish(self, key, data, duration=None):
+        with self.lock:
+            previous = self.entries.get(key)
+            entry = self.entries[key] = {
+                "version": (previous["version"] + 1) if previous else 1,
+                "data": data,
+                "updated_at": time.time(),
+                "updated_at_wib": datetime.now(WIB).strftime("%Y-%m-%d %H:%M:%S WIB"),
+                "compute_seconds": round(duration, 3) if duration is not None else None,
+                "last_error": None
+            }
+        if self.shared is not None:
+            self.shared.put("snapshot", key, entry, updated_at=entry["updated_at"])
+    
+    def _refresh(self, key):
+        compute_fn, interval = self.sources[key]
+        started = time.monotonic()
+        try:
+            data = compute_fn()
+            self.publish(key, data, time.monotonic() - started)
+            print(f"📸 Snapshot {key} diperbarui ({time.monotonic() - started:.1f}s)")
+        except Exception as e:
+            print(f"❌ Snapshot {key} gagal: {e}")
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry:
+                    entry["last_error"] = str(e)
+            if entry and self.shared is not None:
+                self.shared.put("snapshot", key, entry, updated_at=entry["updated_at"])
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+                self.next_due[key] = time.monotonic() + interval
+            if self.shared is not None:
+                self.shared.delete("snapshot_refresh", key)
+            self.wakeup.set()
+    
+    def request_refresh(self, key):
+        """Jadwalkan recompute async; return False jika refresh key ini sudah berjalan"""
+        if self._is_remote():
+            return self.shared.put("snapshot_refresh", key, "requested", replace=False)
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+        if self.shared is not None:
+            self.shared.put("snapshot_refresh", key, "running")
+        self.executor.submit(self._refresh, key)
+        return True
+    
+    def _requested_keys(self):
+        """Key yang diminta refresh oleh follower"""
+        if self.shared is None or not self.shared.enabled:
+            return []
+        return [key for key, state in self.shared.items("snapshot_refresh").items()
+                if state == "requested" and key in self.sources]
+    
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            with self.lock:
+                due = [key for key in self.sources if self.next_due.get(key, 0) <= now and key not in self.refreshing]
+            for key in due + self._requested_keys():
+                self.request_refresh(key)
+            with self.lock:
+                pending = [self.next_due[key] for key in self.sources
+                           if key not in self.refreshing and key in self.next_due]
+            timeout = max(1.0, min(pending) - time.monotonic()) if pending else None
+            if self.shared is not None and self.shared.enabled:
+                # Poll permintaan refresh dari follower
+                timeout = min(timeout or SNAPSHOT_REQUEST_POLL, SNAPSHOT_REQUEST_POLL)
+            self.wakeup.wait(timeout)
+            self.wakeup.clear()
+    
+    def _restore_shared(self):
+        """Leader baru (restart / failover) melanjutkan snapshot terakhir di shared state"""
+        restored = self.shared.items("snapshot")
+        # Status "running" milik leader lama yang sudah mati; permintaan follower ("requested") tetap dilayani
+        for key, state in self.shared.items("snapshot_refresh").items():
+            if state != "requested":
+                self.shared.delete("snapshot_refresh", key)
+        now = time.monotonic()
+        with self.lock:
+            for key, entry in restored.items():
+                if key not in self.sources or key in self.entries:
+                    continue
+                self.entries[key] = entry
+                age = max(0.0, time.time() - entry["updated_at"])
+                self.next_due[key] = now + max(0.0, self.sources[key][1] - age)
+        if restored:
+            print(f"📸 Snapshot dipulihkan dari shared state: {', '.join(sorted(restored))}")
+    
+    def ensure_started(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        if self.shared is not None and self.shared.enabled:
+            self._restore_shared()
+        threading.Thread(target=self._loop, daemon=True).start()
+    
+    def start_on_demand(self):
+        """Leader: tunggu permintaan refresh pertama dari follower, baru jalankan refresher"""
+        def watch():
+            while not self.started:
+                if self._requested_keys():
+                    print("📸 Permintaan snapshot dari worker lain, refresher dimulai")
+                    self.ensure_started()
+                    return
+                time.sleep(SNAPSHOT_REQUEST_POLL)
+        
+        threading.Thread(target=watch, name="snapshot-watch", daemon=True).start()
+    
+    def status(self):
+        if self._is_remote():
+            return {key: {"version": snapshot["version"], "updated_at_wib": snapshot["updated_at_wib"],
+                          "age_seconds": snapshot["age_seconds"], "refreshing": snapshot["refreshing"]}
+                    for key in self.sources if (snapshot := self.get(key))}
+        with self.lock:
+            return {key: {"version": entry["version"], "updated_at_wib": entry["updated_at_wib"],
+                          "age_seconds": round(time.time() - entry["updated_at"], 1),
+                          "refreshing": key in self.refreshing}
+                    for key, entry in self.entries.items()}
 
-@app.route("/webhook/tradingview", methods=["POST"])
-def webhook():
-    """Webhook untuk menerima alert dari TradingView"""
-    try:
-        data = request.get_json(force=True)
-        symbol = data.get("symbol", "Unknown")
-        signal = data.get("signal", "No signal info")
+signal_snapshots = SnapshotStore(shared=shared_state)
+
+def _compute_idx_snapshot():
+    signals, method = get_trading_signals("SNAPSHOT")
+    return {"signals": signals, "screening_method": method}
+
+def _compute_crypto_snapshot():
+    signals, method = get_crypto_trading_signals()
+    return {"signals": signals, "screening_method": method}
+
+def _compute_tradingview_snapshot():
+    return {"gainers": get_idx_top_gainers_tradingview()}
+
+signal_snapshots.register("idx", _compute_idx_snapshot)
+signal_snapshots.register("crypto", _compute_crypto_snapshot)
+signal_snapshots.register("tradingview", _compute_tradingview_snapshot, interval=2 * SNAPSHOT_REFRESH_INTERVAL)
+
+def read_snapshot(key):
+    """
+    Baca snapshot untuk endpoint; ?refresh=1 memicu recompute async tanpa menunggu
+    
+    Return (snapshot atau None, refresh_triggered)
+    """
+    snapshot = signal_snapshots.get(key)
+    refresh_triggered = False
+    if request.args.get("refresh") == "1" or snapshot is None:
+        refresh_triggered = signal_snapshots.request_refresh(key)
+    return snapshot, refresh_triggered
+
+def snapshot_meta(snapshot, refresh_triggered):
+    return {
+        "version": snapshot["version"],
+        "updated_at": snapshot["updated_at_wib"],
+        "age_seconds": snapshot["age_seconds"],
+        "compute_seconds": snapshot["compute_seconds"],
+        "refreshing": snapshot["refreshing"] or refresh_triggered,
+        "last_error": snapshot["last_error"]
+    }
+
+def snapshot_pending_response(key):
+    return jsonify({
+        "status": "pending",
+        "message": f"Snapshot {key} belum tersedia, perhitungan sedang berjalan di background. Coba lagi sebentar."
+    }), 202
+
+# ================== SIGNAL JOURNAL ==================
+
+SIGNAL_JOURNAL_PATH = os.getenv("SIGNAL_JOURNAL_PATH") or os.path.join(DATA_DIR, "signals.db")
+SIGNAL_JOURNAL_MAX_LIMIT = 1000
+
+SIGNAL_JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    market TEXT NOT NULL,
+    session TEXT NOT NULL,
+    method TEXT,
+    symbol TEXT NOT NULL,
+    signal TEXT,
+    entry REAL,
+    tp1 REAL,
+    tp2 REAL,
+    sl REAL,
+    volume REAL,
+    market_cap REAL,
+    change_pct REAL,
+    confluence REAL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_signals_time ON signals (created_at);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_time ON signals (symbol, created_at);
+CREATE INDEX IF NOT EXISTS idx_signals_session_time ON signals (session, created_at);
+CREATE INDEX IF NOT EXISTS idx_signals_market_time ON signals (market, created_at);
+CREATE TRIGGER IF NOT EXISTS signals_no_update BEFORE UPDATE ON signals
+BEGIN SELECT RAISE(ABORT, 'signal journal append-only'); END;
+CREATE TRIGGER IF NOT EXISTS signals_no_delete BEFORE DELETE ON signals
+BEGIN SELECT RAISE(ABORT, 'signal journal append-only'); END;
+"""
+
+class SignalJournal:
+    """
+    Journal sinyal append-only di SQLite (WAL)
+    
+    record() hanya menaruh baris di antrian (tanpa I/O di jalur alert); writer thread menulis tiap
+    batch (satu cycle screening) dalam satu transaksi. Query memakai koneksi read per thread,
+    WAL membuat pembaca tidak memblokir writer. Index created_at & (symbol|session|market, created_at)
+    menjaga query riwayat tetap cepat walau data berbulan-bulan.
+    """
+    
+    COLUMNS = ("created_at", "market", "session", "method", "symbol", "signal", "entry", "tp1", "tp2", "sl",
+               "volume", "market_cap", "change_pct", "confluence", "details")
+    
+    def __init__(self, path):
+        self.path = path
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.local = threading.local()
+        self.started = False
+        self.ready = False
+        self.busy = False
+        self.counters = {"recorded": 0, "written": 0, "batches": 0, "errors": 0}
+    
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _reader(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self._connect()
+        return conn
+    
+    @staticmethod
+    def _row(created_at, market, session, method, signal):
+        """Baris tabel dari StockSignal / CryptoSignal"""
+        if isinstance(signal, CryptoSignal):
+            details = json.dumps({"name": signal.name, "indicators": signal.indicators,
+                                  "tech_signals": signal.tech_signals}, default=str)
+            return (created_at, market, session, method, signal.symbol, signal.sinyal, signal.entry, signal.tp1,
+                    signal.tp2, signal.sl, signal.volume, signal.market_cap, signal.change_24h, signal.confluence, details)
+        return (created_at, market, session, method, signal.kode, signal.sinyal, signal.entry, signal.tp1,
+                signal.tp2, signal.sl, signal.volume, signal.market_cap, signal.change_pct, None, None)
+    
+    def record(self, market, session, method, signals):
+        """Antrekan satu batch sinyal (satu cycle) untuk ditulis; demo data tidak dicatat"""
+        if not signals or (method or "").startswith("🔬 Demo"):
+            return 0
+        created_at = time.time()
+        rows = [self._row(created_at, market, session, method, signal) for signal in signals]
+        with self.condition:
+            self.pending.append(rows)
+            self.counters["recorded"] += len(rows)
+            if not self.started:
+                self.started = True
+                threading.Thread(target=self._writer, name="signal-journal", daemon=True).start()
+            self.condition.notify()
+        return len(rows)
+    
+    def _writer(self):
+        try:
+            conn = self._connect()
+            conn.executescript(SIGNAL_JOURNAL_SCHEMA)
+        except sqlite3.Error as e:
+            print(f"❌ Signal journal tidak bisa dibuka ({self.path}): {e}")
+            with self.condition:
+                self.counters["errors"] += 1
+                self.pending.clear()
+                self.started = False
+                self.condition.notify_all()
+            return
+        self.ready = True
+        insert = f"INSERT INTO signals ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})"
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                batches = list(self.pending)
+                self.pending.clear()
+                self.busy = True
+            rows = [row for batch in batches for row in batch]
+            try:
+                with conn:
+                    conn.executemany(insert, rows)
+                self.counters["written"] += len(rows)
+                self.counters["batches"] += len(batches)
+            except sqlite3.Error as e:
+                self.counters["errors"] += 1
+                print(f"⚠️ Signal journal gagal menulis {len(rows)} sinyal: {e}")
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+    
+    def flush(self, timeout=10):
+        """Tunggu antrian tertulis (untuk shutdown / uji)"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while (self.pending or self.busy) and self.started:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+    
+    def _query(self, where, params, limit):
+        if not os.path.exists(self.path):
+            return []
+        limit = max(1, min(int(limit), SIGNAL_JOURNAL_MAX_LIMIT))
+        sql = f"SELECT * FROM signals{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY created_at DESC LIMIT ?"
+        try:
+            rows = self._reader().execute(sql, (*params, limit)).fetchall()
+        except sqlite3.OperationalError as e:
+            # Tabel belum dibuat (writer belum pernah jalan)
+            if "no such table" in str(e):
+                return []
+            raise
+        result = []
+        for row in rows:
+            item = dict(row)
+            item["details"] = json.loads(item["details"]) if item["details"] else None
+            item["created_at_wib"] = datetime.fromtimestamp(item["created_at"], WIB).strftime("%d-%b-%Y %H:%M:%S WIB")
+            result.append(item)
+        return result
+    
+    def recent(self, limit=50, market=None, session=None, since=None):
+        """Sinyal terbaru (opsional filter market / session / sejak epoch)"""
+        where, params = [], []
+        for column, value in (("market", market), ("session", session)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        return self._query(where, params, limit)
+    
+    def history(self, symbol, limit=100, since=None):
+        """Riwayat sinyal satu symbol, terbaru dulu"""
+        where, params = ["symbol = ?"], [symbol.upper()]
+        if since:
+            where.append("created_at >= ?")
+            params.append(since)
+        return self._query(where, params, limit)
+    
+    def stats(self):
+        with self.condition:
+            stats = {"path": self.path, "ready": self.ready, "pending": sum(len(batch) for batch in self.pending),
+                     **self.counters}
+        if os.path.exists(self.path):
+            stats["size_bytes"] = os.path.getsize(self.path)
+        return stats
+
+signal_journal = SignalJournal(SIGNAL_JOURNAL_PATH)
+
+# ================== CRYPTO STREAMING ==================
+
+# Mode real-time: konsumsi stream kline + miniTicker Binance Futures, alert begitu coin lolos filter
+CRYPTO_STREAM_ENABLED = os.getenv("CRYPTO_STREAM_ENABLED", "0") == "1"
+CRYPTO_STREAM_URL = os.getenv("CRYPTO_STREAM_URL", "wss://fstream.binance.com/stream")
+# File JSONL pesan stream (format combined stream Binance) untuk replay lokal pengganti websocket
+CRYPTO_STREAM_REPLAY = os.getenv("CRYPTO_STREAM_REPLAY")
+CRYPTO_STREAM_INTERVAL = os.getenv("CRYPTO_STREAM_INTERVAL", "1h")   # Kline indikator (sama dengan analisis batch)
+CRYPTO_STREAM_MAX_SYMBOLS = int(os.getenv("CRYPTO_STREAM_MAX_SYMBOLS", "400"))
+CRYPTO_STREAM_ALERT_COOLDOWN = float(os.getenv("CRYPTO_STREAM_ALERT_COOLDOWN", str(4 * 3600)))
+CRYPTO_STREAM_SAVE_INTERVAL = 300   # Detik antar simpan IndicatorState ke disk
+STREAM_SUBSCRIBE_BATCH = 200        # Stream per pesan SUBSCRIBE (Binance: maks 1024 stream per koneksi)
+
+def parse_stream_message(raw):
+    """
+    Parse pesan combined stream Binance menjadi list event:
+    ("ticker", symbol, price, change_pct, quote_volume) dari !miniTicker@arr (rolling 24h)
+    ("kline", symbol, open_time, close, closed) dari <symbol>@kline_<interval>
+    """
+    message = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    data = message.get("data", message)
+    if isinstance(data, list):
+        events = []
+        for item in data:
+            if item.get("e") == "24hrMiniTicker":
+                close, open_ = float(item["c"]), float(item["o"])
+                change = (close / open_ - 1) * 100 if open_ else 0.0
+                events.append(("ticker", item["s"], close, change, float(item["q"])))
+        return events
+    if data.get("e") == "kline":
+        kline = data["k"]
+        return [("kline", data["s"], kline["t"] / 1000, float(kline["c"]), bool(kline["x"]))]
+    return []
+
+class BinanceStreamSource:
+    """Websocket combined stream Binance Futures (miniTicker semua symbol + kline per symbol), auto-reconnect"""
+    
+    def __init__(self, symbols, interval=CRYPTO_STREAM_INTERVAL, url=CRYPTO_STREAM_URL):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.url = url
+        self.stopped = threading.Event()
+        self.connects = 0
+    
+    def streams(self):
+        return ["!miniTicker@arr"] + [f"{symbol.lower()}@kline_{self.interval}" for symbol in self.symbols]
+    
+    def __iter__(self):
+        # websockets (dependency di pyproject.toml) hanya dibutuhkan di mode stream, jadi di-import di sini
+        from websockets.sync.client import connect
+        backoff = 1
+        while not self.stopped.is_set():
+            try:
+                with connect(self.url, open_timeout=10, max_size=2 ** 22) as ws:
+                    streams = self.streams()
+                    for i in range(0, len(streams), STREAM_SUBSCRIBE_BATCH):
+                        ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams[i:i + STREAM_SUBSCRIBE_BATCH],
+                                            "id": i // STREAM_SUBSCRIBE_BATCH + 1}))
+                        time.sleep(0.25)  # Binance: maks 10 pesan masuk per detik
+                    self.connects += 1
+                    backoff = 1
+                    print(f"📡 Stream Binance terhubung: {len(streams)} stream")
+                    while not self.stopped.is_set():
+                        try:
+                            yield ws.recv(timeout=30)
+                        except TimeoutError:
+                            continue
+            except Exception as e:
+                if self.stopped.is_set():
+                    break
+                # Binance memutus koneksi tiap 24 jam; reconnect dengan backoff
+                print(f"⚠️ Stream Binance terputus ({e}), reconnect dalam {backoff}s")
+                self.stopped.wait(backoff)
+                backoff = min(backoff * 2, 60)
+    
+    def stop(self):
+        self.stopped.set()
+
+class ReplayStreamSource:
+    """Replay file JSONL (satu pesan stream per baris) sebagai pengganti websocket untuk uji lokal"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.stopped = threading.Event()
+    
+    def __iter__(self):
+        with open(self.path) as f:
+            for line in f:
+                if self.stopped.is_set():
+                    break
+                if line.strip():
+                    yield line
+    
+    def stop(self):
+        self.stopped.set()
+
+@dataclass(slots=True)
+class StreamSymbolState:
+    """State rolling satu symbol (ukuran tetap: IndicatorState O(1) + ticker 24h terakhir)"""
+    indicators: IndicatorState
+    price: float = 0.0
+    change_pct: float = 0.0
+    quote_volume: float = 0.0
+    qualified: bool = False
+    last_alert: float = 0.0
+
+class CryptoStreamProcessor:
+    """
+    Proses event stream crypto di satu thread
+    
+    Kline close -> update IndicatorState; tiap update ticker / kline close filter crypto
+    (passes_crypto_filters) dievaluasi ulang. Alert edge-triggered (saat coin baru lolos) dengan
+    cooldown per symbol, dibangun & dikirim di thread terpisah agar loop tidak pernah menunggu network.
+    Jumlah symbol dibatasi max_symbols sehingga memory tetap terbatas.
+    """
+    
+    def __init__(self, interval=CRYPTO_STREAM_INTERVAL, max_symbols=CRYPTO_STREAM_MAX_SYMBOLS,
+                 cooldown=CRYPTO_STREAM_ALERT_COOLDOWN, states=None, alert_fn=None):
+        self.interval = interval
+        self.max_symbols = max_symbols
+        self.cooldown = cooldown
+        self.alert_fn = alert_fn or send_stream_alert
+        self.states = {symbol: StreamSymbolState(state)
+                       for symbol, state in itertools.islice((states or {}).items(), max_symbols)}
+        self.alert_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-alert")
+        self.latencies = deque(maxlen=500)
+        self.stopped = threading.Event()
+        self.source = None
+        self.started_at = None
+        self.last_message_at = None
+        self.counters = {"messages": 0, "tickers": 0, "klines": 0, "stale_klines": 0,
+                         "alerts": 0, "alert_errors": 0, "dropped_symbols": 0}
+    
+    def state(self, symbol):
+        state = self.states.get(symbol)
+        if state is None:
+            if not symbol.endswith("USDT"):
+                return None
+            if len(self.states) >= self.max_symbols:
+                self.counters["dropped_symbols"] += 1
+                return None
+            state = self.states[symbol] = StreamSymbolState(IndicatorState())
+        return state
+    
+    def seed(self, symbols, fetch_fn=None):
+        """
+        Isi IndicatorState symbol yang belum ada / tertinggal > 2 bar (mis. setelah downtime) dari REST klines
         
-        msg = f"⚡ <b>TradingView Alert</b>\n\n"
-        msg += f"📊 {symbol}\n"
-        msg += f"📈 {signal}\n\n"
-        msg += f"🕐 {datetime.now(WIB).strftime('%d-%b-%Y %H:%M WIB')}"
+        State tersimpan untuk symbol di luar daftar (mis. sudah tidak masuk top likuiditas) dibuang
+        agar slot max_symbols dipakai symbol yang di-subscribe.
+        """
+        fetch_fn = fetch_fn or (lambda symbol: get_binance_klines(symbol, self.interval))
+        wanted = set(symbols[:self.max_symbols])
+        for symbol in [symbol for symbol in self.states if symbol not in wanted]:
+            del self.states[symbol]
+        step = INTERVAL_SECONDS.get(self.interval, 3600)
+        now = time.time()
+        stale = [symbol for symbol in symbols[:self.max_symbols]
+                 if symbol not in self.states or self.states[symbol].indicators.last_time is None
+                 or now - self.states[symbol].indicators.last_time > 2 * step + 60]
+        for symbol, klines in zip(stale, fetch_executor.map(fetch_fn, stale)):
+            if not klines:
+                continue
+            indicators = IndicatorState()
+            for open_time, close in klines:
+                indicators.update(close, open_time)
+            state = self.state(symbol)
+            if state is not None:
+                state.indicators = indicators
+        print(f"🌱 Stream: {len(stale)} symbol di-seed dari klines, {len(self.states)} symbol aktif")
+    
+    def handle(self, raw, received=None):
+        """Proses satu pesan stream (dipanggil dari satu thread)"""
+        received = received or time.monotonic()
+        self.counters["messages"] += 1
+        self.last_message_at = time.time()
+        for event in parse_stream_message(raw):
+            if event[0] == "ticker":
+                _, symbol, price, change_pct, quote_volume = event
+                state = self.state(symbol)
+                if state is None:
+                    continue
+                state.price, state.change_pct, state.quote_volume = price, change_pct, quote_volume
+                self.counters["tickers"] += 1
+            else:
+                _, symbol, open_time, close, closed = event
+                if not closed:
+                    continue
+                state = self.state(symbol)
+                if state is None:
+                    continue
+                last_time = state.indicators.last_time
+                if last_time is not None and open_time <= last_time:
+                    # Duplikat setelah reconnect / seed
+                    self.counters["stale_klines"] += 1
+                    continue
+                state.indicators.update(close, open_time)
+                self.counters["klines"] += 1
+            self.evaluate(symbol, state, received)
+    
+    def evaluate(self, symbol, state, received):
+        """Evaluasi ulang filter crypto untuk satu symbol; kirim alert saat baru lolos"""
+        low, high = CRYPTO_CHANGE_RANGE
+        # Pre-check murah dulu: lookup market cap hanya untuk kandidat momentum & likuiditas
+        if not (low <= state.change_pct <= high and state.quote_volume >= CRYPTO_MIN_VOLUME and state.price > 0):
+            state.qualified = False
+            return
+        base = symbol[:-4]
+        market_cap = symbol_metadata.market_cap(f"{base}-USD", state.price) or 0
+        asset = ScreenedAsset(base, state.price, state.change_pct, state.quote_volume, market_cap / 1_000_000)
+        qualified = passes_crypto_filters(asset)
+        if qualified and not state.qualified and time.time() - state.last_alert >= self.cooldown:
+            state.last_alert = time.time()
+            self.counters["alerts"] += 1
+            self.alert_executor.submit(self._alert, asset, state.indicators.row(), received)
+        state.qualified = qualified
+    
+    def _alert(self, asset, row, received):
+        try:
+            indicators, tech_signals = build_technical_signals(row)
+            self.alert_fn(build_crypto_signal(asset, indicators, tech_signals))
+            latency = time.monotonic() - received
+            self.latencies.append(latency)
+            STREAM_ALERT_LATENCY_SECONDS.observe(latency)
+        except Exception as e:
+            self.counters["alert_errors"] += 1
+            print(f"❌ Stream alert {asset.symbol} gagal: {e}")
+    
+    def save(self, path=None):
+        save_indicator_states({symbol: state.indicators for symbol, state in self.states.items()},
+                              path or stream_state_path(self.interval))
+    
+    def run(self, source):
+        """Loop utama: proses pesan dari source sampai source berhenti; state disimpan berkala"""
+        self.source = source
+        self.started_at = time.time()
+        last_save = time.monotonic()
+        for raw in source:
+            try:
+                self.handle(raw)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Pesan stream tidak valid, dilewati: {e}")
+            if time.monotonic() - last_save >= CRYPTO_STREAM_SAVE_INTERVAL:
+                self.save()
+                last_save = time.monotonic()
+        self.save()
+    
+    def stop(self):
+        self.stopped.set()
+        if self.source is not None:
+            self.source.stop()
+    
+    def stats(self):
+        latencies = sorted(self.latencies)
+        percentile = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 4) if latencies else None
+        return {
+            "interval": self.interval,
+            "source": type(self.source).__name__ if self.source else None,
+            "symbols": len(self.states),
+            "warm_symbols": sum(1 for state in self.states.values() if state.indicators.ema_50.current() is not None),
+            "qualified": sorted(symbol for symbol, state in self.states.items() if state.qualified),
+            "alert_latency_p50": percentile(0.5),
+            "alert_latency_p99": percentile(0.99),
+            "last_message_age": round(time.time() - self.last_message_at, 1) if self.last_message_at else None,
+            "connects": getattr(self.source, "connects", None),
+            **self.counters
+        }
+
+def stream_state_path(interval=CRYPTO_STREAM_INTERVAL):
+    return os.path.join(DATA_DIR, f"stream_indicator_states_{interval}.json")
+
+def send_stream_alert(signal):
+    """Kirim alert real-time satu coin (masuk outbox Telegram, tidak memblokir)"""
+    method = "⚡ Binance Futures stream (real-time)"
+    text = format_crypto_alert("REAL-TIME", [signal], method)
+    send_telegram_message(text)
+    signal_journal.record("crypto", "REAL-TIME", method, [signal])
+    print(f"⚡ Stream alert {signal.symbol} ({signal.change_24h:+.1f}%) masuk antrian Telegram")
+
+# Processor stream aktif (None jika mode stream tidak jalan)
+crypto_stream = None
+
+def select_stream_symbols(limit=CRYPTO_STREAM_MAX_SYMBOLS):
+    """
+    Perpetual USDT paling likuid (quote volume 24h desc) sebanyak limit
+    
+    Tanpa snapshot volume, urutan jatuh ke abjad. Raise jika index perpetual tidak tersedia.
+    """
+    symbols = [symbol for symbol in get_binance_perpetual_symbols() if symbol.endswith("USDT")]
+    if not symbols:
+        raise RuntimeError("index symbol perpetual Binance kosong")
+    volumes = get_binance_quote_volumes()
+    symbols.sort(key=lambda symbol: (-volumes.get(symbol, 0.0), symbol))
+    return symbols[:limit]
+
+def crypto_stream_thread():
+    """
+    Thread mode stream: replay lokal jika CRYPTO_STREAM_REPLAY diset, selain itu websocket Binance
+    
+    Setup websocket (pilih symbol, seed klines) diulang dengan backoff jika gagal, seperti reconnect
+    BinanceStreamSource, sehingga error REST sesaat saat startup tidak mematikan thread.
+    """
+    global crypto_stream
+    processor = CryptoStreamProcessor(states=load_indicator_states(stream_state_path()))
+    crypto_stream = processor
+    if CRYPTO_STREAM_REPLAY:
+        print(f"📼 Stream crypto: replay {CRYPTO_STREAM_REPLAY}")
+        try:
+            processor.run(ReplayStreamSource(CRYPTO_STREAM_REPLAY))
+            print(f"📴 Stream crypto selesai: {processor.counters}")
+        except Exception as e:
+            print(f"❌ Stream crypto berhenti: {e}")
+        return
+    
+    backoff = 1
+    while not processor.stopped.is_set():
+        try:
+            symbols = select_stream_symbols(processor.max_symbols)
+            processor.seed(symbols)
+            processor.run(BinanceStreamSource(symbols))
+            print(f"📴 Stream crypto selesai: {processor.counters}")
+            return
+        except Exception as e:
+            print(f"❌ Stream crypto gagal ({e}), setup ulang dalam {backoff}s")
+            processor.stopped.wait(backoff)
+            backoff = min(backoff * 2, 300)
+
+# ================== WEBHOOK INGESTION ==================
+
+# Alert symbol yang sama dalam window ini digabung jadi satu pesan Telegram (detik)
+WEBHOOK_COALESCE_WINDOW = float(os.getenv("WEBHOOK_COALESCE_WINDOW", "5"))
+WEBHOOK_MAX_PENDING = int(os.getenv("WEBHOOK_MAX_PENDING", "500"))
+WEBHOOK_MAX_BODY = 16 * 1024
+WEBHOOK_MAX_SYMBOL_LENGTH = 40
+WEBHOOK_MAX_SIGNAL_LENGTH = 1000
+# Maksimal signal berbeda yang ditampilkan per pesan gabungan
+WEBHOOK_MAX_SIGNAL_LINES = 10
+
+class WebhookRejected(Exception):
+    """Alert webhook ditolak; status = HTTP status yang dikembalikan ke pengirim"""
+    
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+def parse_tradingview_alert(data):
+    """Validasi payload TradingView -> (symbol, signal) yang sudah di-escape untuk HTML Telegram"""
+    if not isinstance(data, dict):
+        raise WebhookRejected(400, "Payload harus JSON object")
+    symbol = data.get("symbol", "Unknown")
+    signal = data.get("signal", "No signal info")
+    if not isinstance(symbol, str) or not symbol.strip():
+        raise WebhookRejected(400, "Field 'symbol' harus string tidak kosong")
+    if not isinstance(signal, (str, int, float)):
+        raise WebhookRejected(400, "Field 'signal' harus string")
+    symbol, signal = symbol.strip(), str(signal).strip()
+    if len(symbol) > WEBHOOK_MAX_SYMBOL_LENGTH:
+        raise WebhookRejected(400, f"Field 'symbol' maksimal {WEBHOOK_MAX_SYMBOL_LENGTH} karakter")
+    if len(signal) > WEBHOOK_MAX_SIGNAL_LENGTH:
+        raise WebhookRejected(400, f"Field 'signal' maksimal {WEBHOOK_MAX_SIGNAL_LENGTH} karakter")
+    return html.escape(symbol, quote=False), html.escape(signal, quote=False)
+
+class WebhookIngestor:
+    """
+    Buffer alert webhook ber-kapasitas tetap dengan coalescing per symbol.
+    
+    Alert pertama untuk symbol membuka window; alert berikutnya dalam window digabung ke entry yang
+    sama. Dispatcher thread mem-flush entry yang window-nya habis ke outbox Telegram. Karena window
+    konstan, urutan insert OrderedDict = urutan jatuh tempo, jadi flush cukup cek entry terdepan.
+    """
+    
+    def __init__(self, window=WEBHOOK_COALESCE_WINDOW, max_pending=WEBHOOK_MAX_PENDING):
+        self.window = window
+        self.max_pending = max_pending
+        self.pending = OrderedDict()  # symbol (upper) -> entry
+        self.cond = threading.Condition()
+        self.started = False
+        self.counters = {"accepted": 0, "coalesced": 0, "rejected_full": 0, "rejected_downstream": 0,
+                         "flushed": 0, "dropped": 0}
+    
+    def ensure_started(self):
+        with self.cond:
+            if self.started:
+                return
+            self.started = True
+        threading.Thread(target=self._loop, name="webhook-dispatcher", daemon=True).start()
+    
+    def submit(self, symbol, signal):
+        """Masukkan alert ke buffer (O(1)). Return True jika digabung ke alert yang sudah pending."""
+        if telegram_outbox.depth >= telegram_outbox.max_queue:
+            with self.cond:
+                self.counters["rejected_downstream"] += 1
+            raise WebhookRejected(503, "Antrian Telegram penuh, coba lagi nanti", retry_after=30)
         
-        success, message = send_telegram_message(msg)
+        self.ensure_started()
+        key = symbol.upper()
+        with self.cond:
+            entry = self.pending.get(key)
+            if entry is not None:
+                entry["count"] += 1
+                if signal not in entry["signals"]:
+                    entry["signals"].append(signal)
+                self.counters["coalesced"] += 1
+                return True
+            if len(self.pending) >= self.max_pending:
+                self.counters["rejected_full"] += 1
+                raise WebhookRejected(429, f"Buffer webhook penuh ({self.max_pending} symbol pending)",
+                                      retry_after=max(1, int(self.window + 0.999)))
+            self.pending[key] = {"symbol": symbol, "signals": [signal], "count": 1,
+                                 "due": time.monotonic() + self.window, "received_at": datetime.now(WIB)}
+            self.counters["accepted"] += 1
+            self.cond.notify()
+        return False
+    
+    def _loop(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.pending:
+                        entry = next(iter(self.pending.values()))
+                        wait = entry["due"] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self.cond.wait(wait)
+                    else:
+                        self.cond.wait()
+                _, entry = self.pending.popitem(last=False)
+            
+            success, message = send_telegram_message(self.format_message(entry))
+            with self.cond:
+                self.counters["flushed" if success else "dropped"] += 1
+            if not success:
+                print(f"❌ Alert webhook {entry['symbol']} gagal masuk antrian Telegram: {message}")
+    
+    def format_message(self, entry):
+        msg = f"⚡ <b>TradingView Alert</b>\n\n"
+        msg += f"📊 {entry['symbol']}\n"
+        for signal in entry["signals"][:WEBHOOK_MAX_SIGNAL_LINES]:
+            msg += f"📈 {signal}\n"
+        hidden = len(entry["signals"]) - WEBHOOK_MAX_SIGNAL_LINES
+        if hidden > 0:
+            msg += f"… +{hidden} signal lain\n"
+        if entry["count"] > 1:
+            msg += f"🔁 {entry['count']} alert digabung (window {self.window:g}s)\n"
+        msg += f"\n🕐 {entry['received_at'].strftime('%d-%b-%Y %H:%M WIB')}"
+        return msg
+    
+    def stats(self):
+        with self.cond:
+            return {"pending": len(self.pending), "max_pending": self.max_pending,
+                    "window_seconds": self.window, **self.counters}
+
+webhook_ingestor = WebhookIngestor()
+
+# ================== LEADER RELAY ==================
+
+# Interval leader memeriksa antrian relay dari follower (detik)
+LEADER_RELAY_POLL = float(os.getenv("LEADER_RELAY_POLL", "0.25"))
+# Status outbox leader yang lebih tua dari ini diabaikan follower (leader dianggap sedang pindah)
+LEADER_RELAY_STATUS_TTL = 30
+
+class LeaderRelay:
+    """
+    Antrian follower -> leader di shared_state untuk pengiriman yang harus tunggal per deployment
+    
+    Pacing per chat outbox Telegram dan coalescing per symbol buffer webhook hanya benar jika ada
+    satu instance. Di deployment multi-worker, follower menaruh pesan Telegram & alert webhook di
+    antrian SQLite; thread relay di leader memindahkannya ke telegram_outbox / webhook_ingestor
+    miliknya, hanya sebanyak kapasitas yang masih kosong. Item yang belum terambil saat leader mati
+    diproses leader berikutnya. Leader juga mem-publish kedalaman outbox agar follower bisa
+    menolak webhook (503) dengan aturan yang sama seperti leader.
+    """
+    
+    TELEGRAM = "relay:telegram"
+    WEBHOOK = "relay:webhook"
+    
+    def __init__(self, shared, poll=LEADER_RELAY_POLL, batch=100):
+        self.shared = shared
+        self.poll = poll
+        self.batch = batch
+        self.started = False
+        self.lock = threading.Lock()
+        self.counters = {"forwarded_telegram": 0, "forwarded_webhook": 0, "relayed_telegram": 0,
+                         "relayed_webhook": 0, "dropped": 0}
+    
+    @property
+    def active(self):
+        """True jika worker ini follower di deployment multi-worker: kirim lewat leader"""
+        return self.shared.enabled and leader_election.is_follower
+    
+    def _count(self, key, amount=1):
+        with self.lock:
+            self.counters[key] += amount
+    
+    def forward_telegram(self, text, chat_ids):
+        """Titip pesan ke outbox leader. Return False jika shared state gagal (pemanggil kirim sendiri)."""
+        if not self.shared.push(self.TELEGRAM, (text, list(chat_ids))):
+            return False
+        self._count("forwarded_telegram")
+        return True
+    
+    def forward_webhook(self, symbol, signal):
+        """
+        Titip alert webhook ke buffer leader; raise WebhookRejected dengan aturan backpressure yang
+        sama seperti WebhookIngestor.submit. Return False jika shared state gagal.
+        """
+        found = self.shared.get("relay", "leader")
+        if found and time.time() - found[0] < LEADER_RELAY_STATUS_TTL:
+            status = found[1]
+            if status["telegram_depth"] >= status["telegram_max_queue"]:
+                raise WebhookRejected(503, "Antrian Telegram penuh, coba lagi nanti", retry_after=30)
+        if self.shared.queue_depth(self.WEBHOOK) >= webhook_ingestor.max_pending:
+            raise WebhookRejected(429, f"Antrian webhook leader penuh ({webhook_ingestor.max_pending} alert)",
+                                  retry_after=max(1, int(webhook_ingestor.window + 0.999)))
+        if not self.shared.push(self.WEBHOOK, (symbol, signal)):
+            return False
+        self._count("forwarded_webhook")
+        return True
+    
+    def drain(self):
+        """Leader: pindahkan item antrian ke outbox / buffer lokal sebatas kapasitas kosong. Return jumlah item."""
+        chats = max(1, len(TELEGRAM_CHAT_IDS))
+        free = (telegram_outbox.max_queue - telegram_outbox.depth) // chats
+        messages = self.shared.pop(self.TELEGRAM, min(self.batch, free))
+        for text, chat_ids in messages:
+            delivery = telegram_outbox.enqueue(text, chat_ids)
+            self._count("relayed_telegram" if delivery.accepted else "dropped")
         
-        if success:
-            return jsonify({"status": "ok", "message": "Alert diterima dan dikirim ke Telegram"})
+        alerts = []
+        if telegram_outbox.depth < telegram_outbox.max_queue:
+            free = webhook_ingestor.max_pending - webhook_ingestor.stats()["pending"]
+            alerts = self.shared.pop(self.WEBHOOK, min(self.batch, free))
+        for symbol, signal in alerts:
+            try:
+                webhook_ingestor.submit(symbol, signal)
+                self._count("relayed_webhook")
+            except WebhookRejected as e:
+                self._count("dropped")
+                print(f"⚠️ Alert webhook {symbol} dari follower dibuang: {e}")
+        return len(messages) + len(alerts)
+    
+    def publish_status(self):
+        self.shared.put("relay", "leader", {"pid": os.getpid(), "telegram_depth": telegram_outbox.depth,
+                                            "telegram_max_queue": telegram_outbox.max_queue})
+    
+    def _loop(self):
+        last_status = 0.0
+        while True:
+            try:
+                moved = self.drain()
+                if time.monotonic() - last_status >= LEADER_RELAY_STATUS_TTL / 3:
+                    self.publish_status()
+                    last_status = time.monotonic()
+            except Exception as e:
+                print(f"⚠️ Leader relay error: {e}")
+                moved = 0
+            if moved < self.batch:
+                time.sleep(self.poll)
+    
+    def start(self):
+        """Leader: mulai thread relay (no-op tanpa shared state / sudah jalan)"""
+        with self.lock:
+            if self.started or not self.shared.enabled:
+                return
+            self.started = True
+        self.publish_status()
+        threading.Thread(target=self._loop, name="leader-relay", daemon=True).start()
+    
+    def stats(self):
+        with self.lock:
+            stats = {"active": self.active, "started": self.started, **self.counters}
+        if self.shared.enabled:
+            stats["queued_telegram"] = self.shared.queue_depth(self.TELEGRAM)
+            stats["queued_webhook"] = self.shared.queue_depth(self.WEBHOOK)
+        return stats
+
+leader_relay = LeaderRelay(shared_state)
+
+@app.route("/webhook/tradingview", methods=["POST"])
+def webhook():
+    """Webhook untuk menerima alert dari TradingView (validasi + enqueue, kirim Telegram di background)"""
+    try:
+        if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_IDS:
+            raise WebhookRejected(503, "TELEGRAM_BOT_TOKEN atau TELEGRAM_CHAT_ID belum diset!")
+        if (request.content_length or 0) > WEBHOOK_MAX_BODY:
+            raise WebhookRejected(413, f"Payload maksimal {WEBHOOK_MAX_BODY} byte")
+        symbol, signal = parse_tradingview_alert(request.get_json(force=True, silent=True))
+        # Follower: coalescing dilakukan buffer leader, jadi belum diketahui apakah alert ini digabung
+        if leader_relay.active and leader_relay.forward_webhook(symbol, signal):
+            coalesced = None
         else:
-            return jsonify({
-                "status": "partial", 
-                "message": "Alert diterima tapi gagal kirim ke Telegram",
-                "error": message
-            }), 500
-    except Exception as e:
-        print(f"❌ Error webhook: {e}")
-        return jsonify({"status": "error", "message": str(e)}), 400
+            coalesced = webhook_ingestor.submit(symbol, signal)
+    except WebhookRejected as e:
+        WEBHOOK_ALERTS.inc(outcome=f"http_{e.status}")
+        response = jsonify({"status": "error", "message": str(e)})
+        response.status_code = e.status
+        if e.retry_after:
+            response.headers["Retry-After"] = str(e.retry_after)
+        return response
+    
+    WEBHOOK_ALERTS.inc(outcome="relayed" if coalesced is None else "coalesced" if coalesced else "accepted")
+    return jsonify({
+        "status": "accepted",
+        "message": "Alert diterima, dikirim ke Telegram dalam beberapa detik",
+        "coalesced": coalesced
+    }), 202
 
 @app.route("/")
 def home():
@@ -1284,6 +4978,11 @@ def home():
                 • <a href="/test-crypto">GET /test-crypto</a> - Test crypto screening dengan indikator teknikal<br>
                 • <a href="/test-crypto-alert">GET /test-crypto-alert</a> - 🆕 Test kirim crypto alert ke Telegram<br>
                 • <a href="/get-chat-id">GET /get-chat-id</a> - Dapatkan Chat ID Telegram Anda<br>
+                • <a href="/http-stats">GET /http-stats</a> - Statistik HTTP pool &amp; rate limiter<br>
+                • <a href="/source-health">GET /source-health</a> - Circuit breaker &amp; kesehatan sumber screening<br>
+                • <a href="/stream-status">GET /stream-status</a> - Mode stream crypto real-time<br>
+                • <a href="/signals">GET /signals</a> - Journal sinyal terbaru (/signals/&lt;symbol&gt; untuk riwayat)<br>
+                • <a href="/metrics">GET /metrics</a> - Metrics Prometheus (latency per stage &amp; upstream)<br>
                 • POST /webhook/tradingview - Webhook untuk TradingView alerts
             </div>
             
@@ -1328,7 +5027,7 @@ def get_chat_id():
     
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         data = response.json()
         
         if data.get("ok") and data.get("result"):
@@ -1361,17 +5060,23 @@ def get_chat_id():
 
 @app.route("/test-screening")
 def test_screening():
-    """Test screening dinamis"""
+    """Test screening dinamis (dari snapshot background, ?refresh=1 untuk recompute async)"""
     try:
-        signals, method = get_trading_signals("TEST SCREENING")
+        snapshot, refresh_triggered = read_snapshot("idx")
+        if snapshot is None:
+            return snapshot_pending_response("idx")
+        
+        signals = snapshot["data"]["signals"]
+        method = snapshot["data"]["screening_method"]
         
         return jsonify({
             "status": "ok",
             "screening_method": method,
             "total_signals": len(signals),
             "signals": signals,
+            "snapshot": snapshot_meta(snapshot, refresh_triggered),
             "message": f"Berhasil mendapatkan {len(signals)} sinyal dengan metode: {method}"
-        })
+        }), 202 if refresh_triggered else 200
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1380,10 +5085,14 @@ def test_screening():
 
 @app.route("/test-tradingview")
 def test_tradingview():
-    """Test TradingView screener"""
+    """Test TradingView screener (dari snapshot background, ?refresh=1 untuk recompute async)"""
     try:
-        print("🧪 Testing TradingView screener...")
-        gainers = get_idx_top_gainers_tradingview()
+        snapshot, refresh_triggered = read_snapshot("tradingview")
+        if snapshot is None:
+            return snapshot_pending_response("tradingview")
+        
+        gainers = snapshot["data"]["gainers"]
+        status_code = 202 if refresh_triggered else 200
         
         if gainers:
             return jsonify({
@@ -1391,16 +5100,18 @@ def test_tradingview():
                 "source": "TradingView Screener",
                 "total_gainers": len(gainers),
                 "gainers": gainers,
+                "snapshot": snapshot_meta(snapshot, refresh_triggered),
                 "message": f"✅ TradingView: Ditemukan {len(gainers)} top gainers"
-            })
+            }), status_code
         else:
             return jsonify({
                 "status": "no_results",
                 "source": "TradingView Screener",
                 "total_gainers": 0,
                 "gainers": [],
+                "snapshot": snapshot_meta(snapshot, refresh_triggered),
                 "message": "⚠️ TradingView: Tidak ada gainers ditemukan"
-            })
+            }), status_code
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1411,19 +5122,24 @@ def test_tradingview():
 
 @app.route("/test-crypto")
 def test_crypto():
-    """Test crypto screening system dengan indikator teknikal lengkap"""
+    """Test crypto screening dengan indikator teknikal (dari snapshot background, ?refresh=1 untuk recompute async)"""
     try:
-        print("🧪 Testing crypto screening dengan professional parameters...")
-        signals, method = get_crypto_trading_signals()
+        snapshot, refresh_triggered = read_snapshot("crypto")
+        if snapshot is None:
+            return snapshot_pending_response("crypto")
+        
+        signals = snapshot["data"]["signals"]
+        method = snapshot["data"]["screening_method"]
         
         # Format telegram message untuk preview
-        telegram_preview = format_crypto_alert("TEST")
+        telegram_preview = format_crypto_alert("TEST", signals, method)
         
         return jsonify({
             "status": "ok",
             "screening_method": method,
             "total_signals": len(signals),
             "signals": signals,
+            "snapshot": snapshot_meta(snapshot, refresh_triggered),
             "telegram_preview": telegram_preview,
             "filters_applied": {
                 "volume_min": "$500k",
@@ -1435,7 +5151,7 @@ def test_crypto():
                 "sentiment": ["Fear & Greed Index", "Funding Rate", "Open Interest"]
             },
             "message": f"✅ {len(signals)} crypto signals found with professional filters\n📊 Method: {method}"
-        })
+        }), 202 if refresh_triggered else 200
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1447,7 +5163,7 @@ def test_crypto():
 def test_telegram():
     """Test pengiriman pesan ke Telegram"""
     msg = f"🧪 <b>Test Pesan</b>\n\nBot Hybrid Scalper berjalan dengan baik!\n\n🕐 {datetime.now(WIB).strftime('%d-%b-%Y %H:%M WIB')}"
-    success, message = send_telegram_message(msg)
+    success, message = send_telegram_message(msg, wait=True)
     
     if success:
         return jsonify({"status": "ok", "message": "✅ " + message})
@@ -1500,28 +5216,26 @@ def test_idx_alert():
 @app.route("/scheduler-status")
 def scheduler_status():
     """Debug endpoint untuk cek status scheduler"""
-    import pytz
     utc_now = datetime.now(pytz.UTC)
     wib_now = datetime.now(WIB)
     
-    jobs = schedule.get_jobs()
-    jobs_info = []
-    
-    for job in jobs:
-        jobs_info.append({
-            "next_run": str(job.next_run),
-            "job_func": job.job_func.__name__,
-            "interval": str(job.unit),
-            "at_time": str(job.at_time) if hasattr(job, 'at_time') else None
-        })
+    jobs_info = job_scheduler.jobs_info()
     
     return jsonify({
         "status": "ok",
-        "scheduler_started": _scheduler_started,
-        "total_jobs": len(jobs),
+        "scheduler_started": job_scheduler.started,
+        "leader_election": leader_election.status(),
+        "total_jobs": len(jobs_info),
         "current_time_utc": utc_now.strftime("%Y-%m-%d %H:%M:%S UTC"),
         "current_time_wib": wib_now.strftime("%Y-%m-%d %H:%M:%S WIB"),
         "scheduled_jobs": jobs_info,
+        "signal_snapshots": signal_snapshots.status(),
+        "idx_screening_coverage": idx_screening_coverage,
+        "symbol_metadata": symbol_metadata.stats(),
+        "source_health": source_health.status(),
+        "crypto_stream": crypto_stream.stats() if crypto_stream else {"enabled": CRYPTO_STREAM_ENABLED},
+        "signal_journal": signal_journal.stats(),
+        "shared_state": shared_state.stats(),
         "expected_schedule": {
             "idx": [
                 "01:55 UTC (08:55 WIB) - PRE-MARKET",
@@ -1535,19 +5249,123 @@ def scheduler_status():
         }
     })
 
+@metrics.register_collector
+def _collect_runtime_stats():
+    """Metric dari statistik cache, HTTP pool, rate limiter & candle store (dibaca saat scrape)"""
+    cache_samples = []
+    cache_sizes = []
+    for name, stats in cache_stats().items():
+        cache_sizes.append(({"cache": name}, stats["size"]))
+        for event in ("hits", "stale_hits", "misses", "loads", "evictions", "shared_hits"):
+            cache_samples.append(({"cache": name, "event": event}, stats[event]))
+    yield "cache_events_total", "counter", "Event cache TTL per jenis", cache_samples
+    yield "cache_entries", "gauge", "Jumlah entry cache TTL", cache_sizes
+    
+    client_stats = http_client.stats()
+    yield ("http_pool_connections_opened_total", "counter", "Koneksi baru (TCP/TLS handshake) per pool",
+           [({"pool": pool}, stats["connections_opened"]) for pool, stats in client_stats["pools"].items()])
+    yield ("http_pool_requests_total", "counter", "Request yang dilayani per pool",
+           [({"pool": pool}, stats["requests_served"]) for pool, stats in client_stats["pools"].items()])
+    yield ("http_retries_total", "counter", "Retry HTTP per host",
+           [({"host": host}, stats["retries"]) for host, stats in client_stats["hosts"].items()])
+    yield ("rate_limiter_throttled_total", "counter", "Request yang harus menunggu token rate limit",
+           [({"host": host}, stats["throttled"]) for host, stats in client_stats["rate_limiters"].items()])
+    yield ("candle_store_events_total", "counter", "Event sync candle store",
+           [({"event": event}, value) for event, value in candle_store.stats().items()])
+    outbox_stats = telegram_outbox.stats()
+    yield "telegram_outbox_depth", "gauge", "Bagian pesan Telegram yang menunggu dikirim", [({}, outbox_stats["depth"])]
+    if idx_screening_coverage:
+        yield ("idx_screening_coverage_ratio", "gauge", "Fraksi universe IDX yang dievaluasi pada screening terakhir",
+               [({"universe": idx_screening_coverage["universe"]}, idx_screening_coverage["ratio"])])
+    circuit_states = {SourceHealth.CLOSED: 0, SourceHealth.HALF_OPEN: 1, SourceHealth.OPEN: 2}
+    health_status = source_health.status()
+    yield ("source_circuit_state", "gauge", "State circuit breaker sumber screening (0=closed, 1=half-open, 2=open)",
+           [({"source": key}, circuit_states[state["state"]]) for key, state in health_status.items()])
+    yield ("source_success_rate", "gauge", "Rolling success rate sumber screening",
+           [({"source": key}, state["success_rate"]) for key, state in health_status.items()
+            if state["success_rate"] is not None])
+    yield ("scheduler_leader", "gauge", "1 jika worker ini leader (menjalankan scheduler & stream)",
+           [({"pid": os.getpid()}, 0 if leader_election.is_follower else 1)])
+    yield "webhook_pending_symbols", "gauge", "Symbol alert webhook yang menunggu flush", [({}, webhook_ingestor.stats()["pending"])]
+    if crypto_stream:
+        counters = crypto_stream.counters
+        yield ("stream_events_total", "counter", "Event stream crypto diproses per tipe",
+               [({"type": name}, counters[name]) for name in ("messages", "tickers", "klines", "alerts")])
+        yield "stream_symbols", "gauge", "Symbol yang dilacak mode stream", [({}, len(crypto_stream.states))]
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus text exposition: latency upstream, tier pemenang, indikator, Telegram, job"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/source-health")
+def source_health_status():
+    """State circuit breaker, success rate & latency EWMA per sumber screening"""
+    return jsonify({"status": "ok", "sources": source_health.status()})
+
+@app.route("/signals")
+def signals_recent():
+    """Sinyal terbaru dari journal: ?market=idx|crypto&session=...&hours=24&limit=50"""
+    hours = request.args.get("hours", type=float)
+    signals = signal_journal.recent(
+        limit=request.args.get("limit", 50, type=int),
+        market=request.args.get("market"),
+        session=request.args.get("session"),
+        since=time.time() - hours * 3600 if hours else None
+    )
+    return jsonify({"status": "ok", "count": len(signals), "signals": signals})
+
+@app.route("/signals/<symbol>")
+def signals_history(symbol):
+    """Riwayat sinyal satu symbol dari journal: ?days=90&limit=100"""
+    days = request.args.get("days", type=float)
+    signals = signal_journal.history(symbol, limit=request.args.get("limit", 100, type=int),
+                                     since=time.time() - days * 86400 if days else None)
+    return jsonify({"status": "ok", "symbol": symbol.upper(), "count": len(signals), "signals": signals})
+
+@app.route("/stream-status")
+def stream_status():
+    """Status mode stream crypto real-time: symbol aktif, yang sedang lolos filter, latency alert"""
+    if not crypto_stream and leader_election.is_follower:
+        return jsonify({"status": "follower", "enabled": CRYPTO_STREAM_ENABLED, "leader": leader_election.leader_info(),
+                        "hint": "Stream hanya jalan di worker leader; lihat /scheduler-status di worker tersebut"})
+    if not crypto_stream:
+        return jsonify({"status": "disabled", "enabled": CRYPTO_STREAM_ENABLED,
+                        "hint": "Set CRYPTO_STREAM_ENABLED=1 (atau CRYPTO_STREAM_REPLAY=file.jsonl untuk replay lokal)"})
+    return jsonify({"status": "ok", **crypto_stream.stats()})
+
+@app.route("/http-stats")
+def http_stats():
+    """Statistik HTTP client (connection pool, retry, rate limiter per host), outbox Telegram, buffer webhook, dan relay follower -> leader"""
+    return jsonify({"status": "ok", **http_client.stats(), "telegram_outbox": telegram_outbox.stats(),
+                    "webhook": webhook_ingestor.stats(), "leader_relay": leader_relay.stats()})
+
+def start_background_jobs():
+    """Komponen yang harus tunggal per deployment; hanya dijalankan di worker leader"""
+    print("\n" + "="*50)
+    print("🚀 HYBRID SCALPER BOT STARTING...")
+    print("="*50 + "\n")
+    threading.Thread(target=scheduler_thread, daemon=True).start()
+    if CRYPTO_STREAM_ENABLED:
+        threading.Thread(target=crypto_stream_thread, name="crypto-stream", daemon=True).start()
+    # Snapshot tetap lazy: refresher leader mulai saat ada yang membaca / meminta snapshot
+    signal_snapshots.start_on_demand()
+    # Pesan Telegram & alert webhook yang diterima follower dikirim dari outbox leader
+    leader_relay.start()
+
 # Start scheduler thread saat module di-import (untuk production dengan Gunicorn)
 def init_scheduler():
-    """Initialize scheduler thread (jalan sekali saat app startup)"""
+    """Leader election sekali per proses; scheduler hanya jalan di worker yang memegang lock"""
     global _scheduler_started
     if not _scheduler_started:
         _scheduler_started = True
-        print("\n" + "="*50)
-        print("🚀 HYBRID SCALPER BOT STARTING...")
-        print("="*50 + "\n")
-        threading.Thread(target=scheduler_thread, daemon=True).start()
+        shared_state.enabled = shared_state_configured()
+        leader_election.start(start_background_jobs)
 
 # Auto-start scheduler saat module di-import (production mode)
-init_scheduler()
+# SCHEDULER_ENABLED=0 untuk import tanpa scheduler (mis. benchmark)
+if os.getenv("SCHEDULER_ENABLED", "1") == "1":
+    init_scheduler()
 
 if __name__ == "__main__":
     # Development mode - Flask dev server
@@ -0,0 +1,352 @@
+"""
+Backtest vectorized aturan screening + TP/SL HybridScalper terhadap OHLCV historis.
+
+Sinyal dibangkitkan dengan filter yang sama dengan screener live (IDX: change > IDX_MIN_CHANGE &
+volume > IDX_MIN_VOLUME, crypto: change dalam CRYPTO_CHANGE_RANGE & volume 24h ≥ CRYPTO_MIN_VOLUME),
+top-N per bar. Exit tiap sinyal di-resolve bar-by-bar secara vectorized (semua sinyal sekaligus):
+  - setengah posisi keluar di TP1, setengah di TP2
+  - SL berlaku untuk sisa posisi; gap di bawah SL keluar di harga open
+  - TP & SL tersentuh di bar yang sama dianggap SL (konservatif)
+  - belum kena TP/SL setelah --max-hold bar -> keluar di close terakhir
+Grid parameter dijalankan paralel di process pool; data OHLCV dibagikan ke worker via memmap.
+
+Contoh:
+    python backtest.py --market crypto --period 2y --interval 1h --screen-every 4
+    python backtest.py --market idx --period 5y --tp1 2,3,4 --tp2 6,8 --sl 2,3 --csv idx_grid.csv
+    python backtest.py --market crypto --synthetic 300 --bars 17520 --interval 1h   # uji performa offline
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+
+FIELDS = ("open", "high", "low", "close", "liquidity")
+
+# Bar per 24 jam: lookback % change (screener memakai change harian / 24h)
+BARS_PER_DAY = {"1h": 24, "1d": 1}
+
+# ================== ENGINE ==================
+
+def find_signals(close, liquidity, lookback, change_range, min_liquidity, top_n, screen_every=1, strict=False):
+    """
+    Replay screener di setiap bar screening: return (sym, t) sinyal yang lolos filter
+
+    close, liquidity: array symbols x bars (NaN = tidak ada data). Per bar hanya top_n
+    change tertinggi yang menjadi sinyal, sama seperti screener live.
+    strict=True: batas bawah change & likuiditas eksklusif (screener IDX: change > min & volume > min);
+    default inklusif seperti passes_crypto_filters.
+    """
+    change = np.full_like(close, np.nan)
+    change[:, lookback:] = (close[:, lookback:] / close[:, :-lookback] - 1) * 100
+    low, high = change_range
+    with np.errstate(invalid="ignore"):
+        if strict:
+            passed = (change > low) & (change <= high) & (liquidity > min_liquidity)
+        else:
+            passed = (change >= low) & (change <= high) & (liquidity >= min_liquidity)
+    passed[:, np.arange(close.shape[1]) % screen_every != 0] = False
+
+    score = np.where(passed, change, -np.inf)
+    top = min(top_n, score.shape[0])
+    # Top-N per bar (kolom): argpartition lalu buang yang tidak lolos filter
+    rows = np.argpartition(-score, top - 1, axis=0)[:top]
+    cols = np.broadcast_to(np.arange(score.shape[1]), rows.shape)
+    keep = np.isfinite(score[rows, cols])
+    sym, t = rows[keep], cols[keep]
+    order = np.lexsort((sym, t))
+    return sym[order], t[order]
+
+def forward_windows(data, sym, t, max_hold):
+    """Window bar t+1 .. t+max_hold per sinyal (N x max_hold) untuk open/high/low/close, NaN di luar data"""
+    windows = {}
+    for field in ("open", "high", "low", "close"):
+        padded = np.pad(data[field], ((0, 0), (0, max_hold + 1)), constant_values=np.nan)
+        view = np.lib.stride_tricks.sliding_window_view(padded, max_hold, axis=1)
+        windows[field] = view[sym, t + 1]
+    return windows
+
+def _first_index(hit):
+    """Index True pertama per baris; lebar window jika tidak ada"""
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), hit.shape[1])
+
+def resolve_exits(windows, entry, tp1_pct, tp2_pct, sl_pct, max_hold, fee_pct=0.0):
+    """
+    Resolve exit semua sinyal sekaligus untuk satu set TP/SL
+
+    Return dict array per sinyal: return % (setelah fee), tp1/tp2/sl hit, bar hold.
+    """
+    high = windows["high"][:, :max_hold]
+    low = windows["low"][:, :max_hold]
+    open_ = windows["open"][:, :max_hold]
+    close = windows["close"][:, :max_hold]
+
+    tp1_price = entry * (1 + tp1_pct / 100)
+    tp2_price = entry * (1 + tp2_pct / 100)
+    sl_price = entry * (1 - sl_pct / 100)
+
+    with np.errstate(invalid="ignore"):
+        tp1_idx = _first_index(high >= tp1_price[:, None])
+        tp2_idx = _first_index(high >= tp2_price[:, None])
+        sl_idx = _first_index(low <= sl_price[:, None])
+
+    rows = np.arange(len(entry))
+    # Exit SL di open jika harga gap di bawah SL
+    sl_open = open_[rows, np.minimum(sl_idx, max_hold - 1)]
+    sl_fill = np.where(np.isfinite(sl_open), np.minimum(sl_price, sl_open), sl_price)
+    sl_return = (sl_fill / entry - 1) * 100
+
+    # Timeout: close valid terakhir dalam window
+    valid = np.isfinite(close)
+    last_valid = max_hold - 1 - valid[:, ::-1].argmax(axis=1)
+    timeout_return = (close[rows, last_valid] / entry - 1) * 100
+
+    stopped = sl_idx < max_hold
+    tp1_hit = tp1_idx < sl_idx
+    tp2_hit = tp2_idx < sl_idx
+
+    def leg(hit, target_pct):
+        return np.where(hit, target_pct, np.where(stopped, sl_return, timeout_return))
+
+    returns = (leg(tp1_hit, tp1_pct) + leg(tp2_hit, tp2_pct)) / 2 - fee_pct
+    exit_idx = np.minimum(np.where(tp2_hit, tp2_idx, np.where(stopped, sl_idx, last_valid)), max_hold - 1)
+    return {"returns": returns, "tp1_hit": tp1_hit, "tp2_hit": tp2_hit,
+            "sl_hit": stopped & ~tp2_hit, "hold": exit_idx + 1}
+
+def summarize(exits):
+    """Statistik satu parameter set: hit rate, expectancy, drawdown (1 unit per trade, urut waktu entry)"""
+    returns = exits["returns"]
+    if len(returns) == 0:
+        return {"trades": 0, "hit_rate": 0.0, "tp2_rate": 0.0, "sl_rate": 0.0, "win_rate": 0.0,
+                "expectancy_pct": 0.0, "total_pct": 0.0, "profit_factor": 0.0, "max_drawdown_pct": 0.0,
+                "avg_hold_bars": 0.0}
+    equity = np.cumsum(returns)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0)) - equity
+    gains, losses = returns[returns > 0].sum(), -returns[returns < 0].sum()
+    return {
+        "trades": int(len(returns)),
+        "hit_rate": round(float(exits["tp1_hit"].mean()), 4),
+        "tp2_rate": round(float(exits["tp2_hit"].mean()), 4),
+        "sl_rate": round(float(exits["sl_hit"].mean()), 4),
+        "win_rate": round(float((returns > 0).mean()), 4),
+        "expectancy_pct": round(float(returns.mean()), 4),
+        "total_pct": round(float(equity[-1]), 2),
+        "profit_factor": round(float(gains / losses), 3) if losses else float("inf"),
+        "max_drawdown_pct": round(float(drawdown.max()), 2),
+        "avg_hold_bars": round(float(exits["hold"].mean()), 2)
+    }
+
+# ================== PROCESS POOL ==================
+
+_worker_data = None
+
+def _init_worker(data_dir):
+    """Initializer worker: buka array OHLCV sebagai memmap read-only (tanpa copy antar proses)"""
+    global _worker_data
+    _worker_data = {field: np.load(os.path.join(data_dir, f"{field}.npy"), mmap_mode="r") for field in FIELDS}
+
+def run_group(task):
+    """
+    Jalankan satu grup grid: sinyal (bergantung filter) dihitung sekali, lalu semua kombinasi TP/SL/hold
+    """
+    screen, combos, settings = task
+    data = _worker_data
+    change_range, = screen
+    sym, t = find_signals(data["close"], data["liquidity"], settings["lookback"], change_range,
+                          settings["min_liquidity"], settings["top_n"], settings["screen_every"],
+                          settings.get("strict", False))
+    # Sinyal di bar terakhir tidak punya bar lanjutan
+    has_future = t + 1 < data["close"].shape[1]
+    sym, t = sym[has_future], t[has_future]
+    max_hold = max(combo[3] for combo in combos)
+    windows = forward_windows(data, sym, t, max_hold)
+    entry = np.asarray(data["close"][sym, t])
+
+    results = []
+    for tp1, tp2, sl, hold in combos:
+        exits = resolve_exits(windows, entry, tp1, tp2, sl, hold, settings["fee_pct"])
+        # Symbol tanpa bar valid setelah sinyal (delisting/suspend) tidak dihitung
+        valid = np.isfinite(exits["returns"])
+        exits = {name: values[valid] for name, values in exits.items()}
+        results.append({"change_min": change_range[0], "change_max": change_range[1],
+                        "tp1": tp1, "tp2": tp2, "sl": sl, "max_hold": hold, **summarize(exits)})
+    return results
+
+def run_grid(data, grid, settings, workers=None):
+    """
+    Jalankan seluruh grid parameter di process pool
+
+    data: dict field -> array symbols x bars. grid: dict change_ranges/tp1/tp2/sl/max_hold.
+    Kombinasi dengan filter yang sama dikelompokkan (sinyal dihitung sekali per grup), lalu
+    dipecah per worker agar pool tetap penuh walau hanya ada satu filter.
+    """
+    workers = workers or os.cpu_count() or 1
+    combos = [(tp1, tp2, sl, hold) for tp1, tp2, sl, hold
+              in itertools.product(grid["tp1"], grid["tp2"], grid["sl"], grid["max_hold"]) if tp2 >= tp1]
+    tasks = []
+    chunks = max(1, -(-workers // len(grid["change_ranges"])))
+    for change_range in grid["change_ranges"]:
+        size = -(-len(combos) // chunks)
+        tasks.extend(((change_range,), combos[i:i + size], settings) for i in range(0, len(combos), size))
+
+    with tempfile.TemporaryDirectory(prefix="backtest-") as data_dir:
+        for field in FIELDS:
+            np.save(os.path.join(data_dir, f"{field}.npy"), np.ascontiguousarray(data[field], dtype=np.float64))
+        if workers == 1:
+            _init_worker(data_dir)
+            groups = map(run_group, tasks)
+            return [row for group in groups for row in group]
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            return [row for group in pool.map(run_group, tasks) for row in group]
+
+# ================== DATA ==================
+
+def liquidity_for(market, close, volume, lookback):
+    """IDX: volume lembar bar terakhir; crypto: nilai transaksi USD rolling 24h"""
+    if market == "idx":
+        return volume
+    turnover = np.nan_to_num(close * volume)
+    cumulative = np.cumsum(turnover, axis=1)
+    rolling = cumulative.copy()
+    rolling[:, lookback:] -= cumulative[:, :-lookback]
+    return rolling
+
+def load_history(market, symbols, period, interval):
+    """Download OHLCV historis via yf_bulk_download app (satu request per chunk ticker)"""
+    import app
+    tickers = [f"{s}.JK" if market == "idx" and not s.endswith(".JK") else s for s in symbols]
+    bars = app.yf_bulk_download(tickers, period=period, interval=interval)
+    if bars.empty:
+        return None, []
+    tickers = [ticker for ticker in tickers if ticker in bars["Close"].columns]
+    arrays = {field: bars[field.capitalize()][tickers].to_numpy(dtype=np.float64).T
+              for field in ("open", "high", "low", "close", "volume")}
+    return arrays, tickers
+
+def synthetic_history(symbols, bars, interval, seed=7):
+    """Random walk OHLCV untuk uji performa engine tanpa network"""
+    rng = np.random.default_rng(seed)
+    vol = 0.02 / np.sqrt(BARS_PER_DAY.get(interval, 1)) * rng.uniform(0.5, 3, (symbols, 1))
+    close = 10 ** rng.uniform(-1, 3, (symbols, 1)) * np.exp(np.cumsum(rng.normal(0.0001, vol, (symbols, bars)), axis=1))
+    open_ = np.roll(close, 1, axis=1) * np.exp(rng.normal(0, vol / 3, (symbols, bars)))
+    open_[:, 0] = close[:, 0]
+    spread = np.abs(rng.normal(0, vol, (symbols, bars)))
+    return {
+        "open": open_, "close": close,
+        "high": np.maximum(open_, close) * (1 + spread),
+        "low": np.minimum(open_, close) * (1 - spread),
+        "volume": rng.lognormal(12, 1.5, (symbols, bars))
+    }
+
+def default_grid(market):
+    """Grid default di sekitar parameter live app.py"""
+    import app
+    if market == "idx":
+        tp1, tp2, sl = app.STOCK_TP_SL_PCT
+        change_ranges = [(app.IDX_MIN_CHANGE, np.inf)]
+    else:
+        tp1, tp2, sl = app.CRYPTO_TP_SL_PCT
+        change_ranges = [app.CRYPTO_CHANGE_RANGE]
+    return {"change_ranges": change_ranges, "tp1": [tp1], "tp2": [tp2], "sl": [sl]}
+
+def parse_floats(text):
+    return [float(x) for x in text.split(",") if x.strip()]
+
+def parse_ranges(text):
+    """'3-15,5-20' -> [(3.0, 15.0), (5.0, 20.0)]; batas atas kosong = tanpa batas"""
+    ranges = []
+    for part in text.split(","):
+        low, _, high = part.strip().partition("-")
+        ranges.append((float(low), float(high) if high else np.inf))
+    return ranges
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest vectorized aturan TP/SL HybridScalper")
+    parser.add_argument("--market", choices=["idx", "crypto"], default="crypto")
+    parser.add_argument("--symbols", help="Daftar symbol dipisah koma (default: IDX_TICKERS / CRYPTO_YF_PAIRS)")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--interval", choices=sorted(BARS_PER_DAY), default="1d")
+    parser.add_argument("--synthetic", type=int, help="Pakai N symbol random walk (tanpa network)")
+    parser.add_argument("--bars", type=int, default=730, help="Jumlah bar data sintetis")
+    parser.add_argument("--change", type=parse_ranges, help="Range %% change filter, mis. 3-15,5-20")
+    parser.add_argument("--tp1", type=parse_floats)
+    parser.add_argument("--tp2", type=parse_floats)
+    parser.add_argument("--sl", type=parse_floats)
+    parser.add_argument("--max-hold", type=parse_floats, help="Maks bar hold (default: 5 hari)")
+    parser.add_argument("--top-n", type=int, help="Sinyal per bar screening (default: IDX_TOP_N / CRYPTO_TOP_N)")
+    parser.add_argument("--screen-every", type=int, default=1, help="Screening tiap N bar (jadwal sesi)")
+    parser.add_argument("--fee", type=float, default=0.0, help="Biaya round-trip %% per trade")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=15, help="Jumlah baris terbaik yang dicetak")
+    parser.add_argument("--csv", help="Simpan semua hasil grid ke CSV")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SCHEDULER_ENABLED", "0")
+    import app
+
+    lookback = BARS_PER_DAY[args.interval]
+    started = time.perf_counter()
+    if args.synthetic:
+        raw = synthetic_history(args.synthetic, args.bars, args.interval)
+        names = [f"SYN{i}" for i in range(args.synthetic)]
+    else:
+        default_symbols = app.IDX_TICKERS if args.market == "idx" else app.CRYPTO_YF_PAIRS
+        symbols = args.symbols.split(",") if args.symbols else list(default_symbols)
+        raw, names = load_history(args.market, symbols, args.period, args.interval)
+        if raw is None:
+            print("❌ Tidak ada data historis")
+            return 1
+    data = {field: raw[field] for field in ("open", "high", "low", "close")}
+    data["liquidity"] = liquidity_for(args.market, raw["close"], raw["volume"], lookback)
+    print(f"📥 {len(names)} symbol x {data['close'].shape[1]} bar ({args.interval}) dalam "
+          f"{time.perf_counter() - started:.1f}s")
+
+    grid = default_grid(args.market)
+    grid["change_ranges"] = args.change or grid["change_ranges"]
+    grid["tp1"] = args.tp1 or grid["tp1"]
+    grid["tp2"] = args.tp2 or grid["tp2"]
+    grid["sl"] = args.sl or grid["sl"]
+    grid["max_hold"] = [int(h) for h in (args.max_hold or [5 * lookback])]
+    settings = {
+        "lookback": lookback,
+        "min_liquidity": app.IDX_MIN_VOLUME if args.market == "idx" else app.CRYPTO_MIN_VOLUME,
+        "top_n": args.top_n or (app.IDX_TOP_N if args.market == "idx" else app.CRYPTO_TOP_N),
+        "screen_every": args.screen_every,
+        "strict": args.market == "idx",
+        "fee_pct": args.fee
+    }
+
+    started = time.perf_counter()
+    results = run_grid(data, grid, settings, args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"⚙️ {len(results)} parameter set, {args.workers} worker, {elapsed:.1f}s")
+
+    results.sort(key=lambda row: row["expectancy_pct"], reverse=True)
+    header = (f"{'change':<12}{'tp1':>6}{'tp2':>6}{'sl':>6}{'hold':>6}{'trades':>8}{'hit':>8}"
+              f"{'tp2':>8}{'sl%':>8}{'exp %':>9}{'total %':>10}{'maxDD %':>10}{'PF':>7}")
+    print(header)
+    print("-" * len(header))
+    for row in results[:args.top]:
+        change = f"{row['change_min']:g}-{row['change_max']:g}"
+        print(f"{change:<12}{row['tp1']:>6g}{row['tp2']:>6g}{row['sl']:>6g}{row['max_hold']:>6}"
+              f"{row['trades']:>8}{row['hit_rate']:>8.1%}{row['tp2_rate']:>8.1%}{row['sl_rate']:>8.1%}"
+              f"{row['expectancy_pct']:>9.3f}{row['total_pct']:>10.1f}{row['max_drawdown_pct']:>10.1f}"
+              f"{row['profit_factor']:>7.2f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"💾 {len(results)} baris disimpan ke {args.csv}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
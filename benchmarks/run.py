@@ -0,0 +1,302 @@
+"""
+Benchmark offline pipeline alert (IDX & crypto) tanpa network.
+
+Semua HTTP upstream diarahkan ke stub server lokal (fixture di benchmarks/fixtures),
+yfinance & TradingView diganti fake deterministik dengan latency yang bisa diatur.
+Laporan per stage: p50/p95 latency, jumlah request upstream per iterasi, dan peak memory.
+
+Contoh:
+    python benchmarks/run.py                          # default: 10 iterasi, warm + cold
+    python benchmarks/run.py --latency-ms 80 --throttle-rate 0.05 --json bench.json
+    python benchmarks/run.py --max-cycle-p95-ms 3000  # exit 1 jika cycle.full melewati budget
+    python benchmarks/run.py --record                 # rekam ulang fixture dari upstream asli
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
+
+import numpy as np
+import pandas as pd
+
+import app
+from benchmarks.stub_server import FIXTURES_DIR, RECORD_SOURCES, StubConfig, StubServer
+
+# ================== FAKE YFINANCE & TRADINGVIEW ==================
+
+class FakeYFinance:
+    """Pengganti modul yfinance: data deterministik per symbol, latency per call"""
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def hit(self):
+        with self.lock:
+            self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def download(self, tickers, period="2d", interval="1d", **kwargs):
+        self.hit()
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        days = {"1d": 1, "2d": 2, "5d": 5}.get(period, 2)
+        index = pd.date_range(end=pd.Timestamp.now(tz="Asia/Jakarta").normalize(), periods=days, freq="D")
+        frames = {}
+        for ticker in tickers:
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            base = float(rng.choice([120, 450, 1250, 3550, 4800, 7650, 9710]))
+            changes = rng.normal(0.01, 0.03, days)
+            closes = base * np.cumprod(1 + changes)
+            frames[ticker] = pd.DataFrame({
+                "Open": closes * 0.995, "High": closes * 1.01, "Low": closes * 0.99,
+                "Close": closes, "Volume": rng.integers(50_000, 50_000_000, days).astype(float)
+            }, index=index)
+        df = pd.concat(frames, axis=1)  # kolom (ticker, field)
+        return df.swaplevel(axis=1).sort_index(axis=1)
+
+    def Ticker(self, symbol):
+        return FakeTicker(self, symbol)
+
+class FakeTicker:
+    def __init__(self, yf, symbol):
+        self.yf = yf
+        self.symbol = symbol
+        self.seed = zlib.crc32(symbol.encode())
+
+    def history(self, period=None, interval="1h", start=None, **kwargs):
+        self.yf.hit()
+        step = app.INTERVAL_SECONDS.get(interval, 3600)
+        now = int(time.time()) // step * step
+        if start is not None:
+            first = int(pd.Timestamp(start).timestamp()) // step * step
+        else:
+            first = now - app.PERIOD_SECONDS.get(period or "1mo", 30 * 86400)
+        ts = np.arange(first, now + 1, step, dtype=np.int64)
+        # Harga fungsi deterministik dari timestamp agar cold & delta fetch konsisten
+        phase = (self.seed % 1000) / 100
+        base = 1 + self.seed % 500
+        close = base * (1 + 0.05 * np.sin(ts / 86400 + phase) + 0.01 * np.sin(ts / 7200 + phase))
+        index = pd.to_datetime(ts, unit="s", utc=True)
+        return pd.DataFrame({
+            "Open": close * 0.998, "High": close * 1.004, "Low": close * 0.996,
+            "Close": close, "Volume": 1e6 + (ts % 86400)
+        }, index=index)
+
+    @property
+    def info(self):
+        self.yf.hit()
+        rng = np.random.default_rng(self.seed)
+        price = float(1 + self.seed % 500)
+        shares = float(rng.integers(10**8, 10**10))
+        return {
+            "marketCap": price * shares, "sharesOutstanding": shares, "shortName": self.symbol,
+            "sector": "Benchmark", "regularMarketPrice": price,
+            "regularMarketChangePercent": float(rng.normal(1, 3)),
+            "regularMarketVolume": float(rng.integers(10**5, 10**8))
+        }
+
+class FakeQuery:
+    """Pengganti tradingview_screener Query: chainable, selalu kosong (perilaku umum untuk IDX)"""
+
+    latency_ms = 0
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def get_scanner_data(self, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return 0, pd.DataFrame()
+
+# ================== HARNESS ==================
+
+def install(server, fake_yf, rate_limits):
+    """Arahkan app ke stub server & fake yfinance"""
+    app.http_client = app.HttpClient(
+        rate_limits=app.HTTP_RATE_LIMITS if rate_limits else None,
+        host_overrides=server.host_overrides(),
+        backoff_base=0.05
+    )
+    app.yf = fake_yf
+    app.Query = FakeQuery
+    app.TELEGRAM_BOT_TOKEN = "bench-token"
+    app.TELEGRAM_CHAT_ID = "123456789"
+    app.TELEGRAM_CHAT_IDS = ["123456789"]
+    # Ukur biaya transport, bukan jeda pacing per chat
+    app.telegram_outbox.private_interval = 0
+    app.SECTORS_API_KEY = "bench-key"
+    app.ALPHA_VANTAGE_API_KEY = ""
+    # Index metadata dibangun sekali (di production: job refresh harian)
+    app.symbol_metadata = app.SymbolMetadataIndex(os.path.join(tempfile.mkdtemp(prefix="bench-meta-"), "meta.json"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.refresh_symbol_metadata()
+
+def reset_state():
+    """Kosongkan semua cache, candle store & riwayat kesehatan sumber (simulasi cold start)"""
+    for cache in app._caches:
+        cache.clear()
+    app.source_health = app.SourceHealthRegistry()
+    app.candle_store = app.CandleStore(tempfile.mkdtemp(prefix="bench-candles-"))
+    os.environ["IDX_UNIVERSE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-universe-"), "idx_universe.json")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def request_count(server, fake_yf):
+    counts = server.snapshot_counts()
+    total = sum(value for key, value in counts.items() if ":" not in key)
+    return total + fake_yf.calls
+
+def measure(name, fn, iterations, cold, server, fake_yf):
+    latencies = []
+    requests_made = []
+    for _ in range(iterations):
+        if cold:
+            reset_state()
+        before = request_count(server, fake_yf)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        requests_made.append(request_count(server, fake_yf) - before)
+
+    # Pass terpisah untuk memory peak (tracemalloc memperlambat timing)
+    if cold:
+        reset_state()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "stage": name,
+        "mode": "cold" if cold else "warm",
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "max_ms": round(max(latencies), 2),
+        "requests_per_iter": round(sum(requests_made) / len(requests_made), 2),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+def build_stages():
+    with contextlib.redirect_stdout(io.StringIO()):
+        crypto_gainers = app.get_crypto_top_gainers_coinlore()[:5]
+    rng = np.random.default_rng(7)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (100, 720)), axis=1))
+
+    def cycle_idx():
+        app.send_telegram_message(app.format_alert("PRE-MARKET (08:55 WIB)"))
+
+    def cycle_crypto():
+        app.send_telegram_message(app.format_crypto_alert("SIANG (12:00 WIB)"))
+
+    return [
+        ("idx.yfinance_screener", app.get_idx_top_gainers_yfinance),
+        ("idx.scraper", app.get_idx_top_gainers_scraper),
+        ("idx.sectors", app.get_dynamic_top_movers),
+        ("crypto.coinlore", app.get_crypto_top_gainers_coinlore),
+        ("crypto.coingecko", app.get_crypto_top_gainers_coingecko),
+        ("crypto.enrichment", lambda: list(app.coin_executor.map(app.analyze_crypto_signal, crypto_gainers))),
+        ("indicators.engine_100x720", lambda: app.compute_indicator_set(closes)),
+        ("telegram.send", lambda: app.send_telegram_message("🧪 benchmark", wait=True)),
+        ("cycle.idx", cycle_idx),
+        ("cycle.crypto", cycle_crypto),
+        ("cycle.full", lambda: (cycle_idx(), cycle_crypto()))
+    ]
+
+def print_report(results):
+    header = f"{'stage':<28}{'mode':<6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'req/iter':>10}{'peak KB':>11}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['stage']:<28}{r['mode']:<6}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['max_ms']:>10.1f}{r['requests_per_iter']:>10.1f}{r['peak_kb']:>11.1f}")
+
+def record_fixtures():
+    """Rekam ulang fixture dari upstream asli (butuh network)"""
+    import requests
+    for name, (url, params) in RECORD_SOURCES.items():
+        response = requests.get(url, params=params, timeout=15)
+        response.raise_for_status()
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json"), "w") as f:
+            json.dump(response.json(), f, indent=1)
+        print(f"✅ {name}: {len(response.content):,} bytes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline HybridScalper")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--mode", choices=["warm", "cold", "both"], default="both")
+    parser.add_argument("--stage", action="append", help="Hanya jalankan stage ini (bisa berulang)")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Latency stub HTTP per request")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraksi request yang dijawab 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraksi request yang dijawab 429")
+    parser.add_argument("--yf-latency-ms", type=float, default=150, help="Latency fake yfinance per call")
+    parser.add_argument("--rate-limits", action="store_true", help="Aktifkan token bucket HTTP_RATE_LIMITS")
+    parser.add_argument("--json", help="Simpan hasil ke file JSON")
+    parser.add_argument("--max-cycle-p95-ms", type=float, help="Budget p95 cycle.full (exit 1 jika lewat)")
+    parser.add_argument("--record", action="store_true", help="Rekam ulang fixture dari upstream asli")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+        return 0
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate, retry_after=0.1)
+    server = StubServer(config).start()
+    fake_yf = FakeYFinance(args.yf_latency_ms)
+    FakeQuery.latency_ms = args.latency_ms
+    install(server, fake_yf, args.rate_limits)
+    reset_state()
+
+    modes = {"warm": [False], "cold": [True], "both": [True, False]}[args.mode]
+    results = []
+    for name, fn in build_stages():
+        if args.stage and name not in args.stage:
+            continue
+        for cold in modes:
+            if not cold:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fn()  # Warm-up: isi cache & candle store
+            results.append(measure(name, fn, args.iterations, cold, server, fake_yf))
+
+    print_report(results)
+    print(f"\n📡 Stub requests: {server.snapshot_counts()}")
+    print(f"📊 yfinance calls: {fake_yf.calls}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results, "http": app.http_client.stats()}, f, indent=1)
+
+    server.stop()
+
+    if args.max_cycle_p95_ms is not None:
+        worst = max((r["p95_ms"] for r in results if r["stage"] == "cycle.full"), default=0)
+        if worst > args.max_cycle_p95_ms:
+            print(f"❌ cycle.full p95 {worst:.0f}ms melewati budget {args.max_cycle_p95_ms:.0f}ms")
+            return 1
+        print(f"✅ cycle.full p95 {worst:.0f}ms dalam budget {args.max_cycle_p95_ms:.0f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
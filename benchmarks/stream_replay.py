@@ -0,0 +1,147 @@
+"""
+Replay stream crypto sintetis (format combined stream Binance) melalui CryptoStreamProcessor.
+
+File JSONL dibangkitkan lokal: tiap bar berisi beberapa pesan !miniTicker@arr (semua symbol)
+lalu satu kline close per symbol. Alert dikirim lewat outbox Telegram ke stub server.
+Laporan: event/detik di satu core, CPU per event, beban pada laju live Binance (1 pesan
+miniTicker/detik), alert & latency alert p50/p99, serta memory state per symbol.
+
+Contoh:
+    python benchmarks/stream_replay.py                          # 400 symbol, 72 bar 1h
+    python benchmarks/stream_replay.py --symbols 800 --bars 200 --ticks-per-bar 6
+    python benchmarks/stream_replay.py --keep replay.jsonl      # simpan file untuk CRYPTO_STREAM_REPLAY
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
+
+import numpy as np
+
+import app
+from benchmarks.stub_server import StubConfig, StubServer
+
+def generate_replay(path, symbols, bars, ticks_per_bar, seed=11):
+    """Tulis replay JSONL; return (jumlah pesan, jumlah event)"""
+    rng = np.random.default_rng(seed)
+    step = 3600
+    start = int(time.time()) // step * step - bars * step
+    names = [f"C{i:03d}USDT" for i in range(symbols)]
+    price = 10 ** rng.uniform(-2, 3, symbols)
+    vol = rng.uniform(0.003, 0.02, symbols) / np.sqrt(ticks_per_bar)
+    quote_volume = rng.lognormal(15, 1.5, symbols)
+    closes = [price.copy()]  # close per bar (untuk open rolling 24h)
+    messages = events = 0
+
+    with open(path, "w") as f:
+        for bar in range(bars):
+            open_time = start + bar * step
+            open_24h = closes[max(0, len(closes) - 24)]
+            for tick in range(ticks_per_bar):
+                # Sebagian kecil symbol mendapat dorongan momentum
+                drift = np.where(rng.random(symbols) < 0.01, 0.02, 0.0)
+                price = price * np.exp(rng.normal(drift, vol))
+                event_time = (open_time + (tick + 1) * step // ticks_per_bar) * 1000
+                data = [{"e": "24hrMiniTicker", "E": event_time, "s": name, "c": f"{p:.8g}", "o": f"{o:.8g}",
+                         "h": f"{p:.8g}", "l": f"{o:.8g}", "v": "1000", "q": f"{q:.2f}"}
+                        for name, p, o, q in zip(names, price, open_24h, quote_volume)]
+                f.write(json.dumps({"stream": "!miniTicker@arr", "data": data}) + "\n")
+                messages += 1
+                events += symbols
+            closes.append(price.copy())
+            for name, p in zip(names, price):
+                f.write(json.dumps({"stream": f"{name.lower()}@kline_1h", "data": {
+                    "e": "kline", "E": (open_time + step) * 1000, "s": name,
+                    "k": {"t": open_time * 1000, "T": (open_time + step) * 1000 - 1, "s": name, "i": "1h",
+                          "o": f"{p:.8g}", "c": f"{p:.8g}", "h": f"{p:.8g}", "l": f"{p:.8g}", "x": True}}}) + "\n")
+                messages += 1
+                events += 1
+    return names, messages, events
+
+def install(stub, names, data_dir):
+    """Arahkan Telegram ke stub & isi metadata market cap (sebagian di bawah $50M)"""
+    app.http_client = app.HttpClient(host_overrides=stub.host_overrides())
+    app.TELEGRAM_BOT_TOKEN = "bench-token"
+    app.TELEGRAM_CHAT_ID = "123456789"
+    app.TELEGRAM_CHAT_IDS = ["123456789"]
+    app.telegram_outbox.private_interval = 0
+    app.DATA_DIR = data_dir
+    app.signal_journal = app.SignalJournal(os.path.join(data_dir, "signals.db"))
+    app.symbol_metadata = app.SymbolMetadataIndex(os.path.join(data_dir, "meta.json"))
+    rng = np.random.default_rng(3)
+    app.symbol_metadata.update({f"{name[:-4]}-USD": {"market_cap": float(rng.choice([2e7, 3e8, 5e9]))}
+                                for name in names})
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stream crypto sintetis melalui CryptoStreamProcessor")
+    parser.add_argument("--symbols", type=int, default=400)
+    parser.add_argument("--bars", type=int, default=72, help="Jumlah kline 1h")
+    parser.add_argument("--ticks-per-bar", type=int, default=12, help="Pesan miniTicker@arr per bar")
+    parser.add_argument("--keep", help="Simpan file replay JSONL ke path ini")
+    parser.add_argument("--no-memory", action="store_true", help="Lewati pengukuran memory (tracemalloc)")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bench-stream-")
+    path = args.keep or os.path.join(data_dir, "replay.jsonl")
+    started = time.perf_counter()
+    names, messages, events = generate_replay(path, args.symbols, args.bars, args.ticks_per_bar)
+    print(f"📼 Replay {messages:,} pesan / {events:,} event ({os.path.getsize(path) / 1e6:.0f} MB) "
+          f"dibuat dalam {time.perf_counter() - started:.1f}s")
+
+    stub = StubServer(StubConfig(latency_ms=50)).start()
+    install(stub, names, data_dir)
+
+    processor = app.CryptoStreamProcessor(max_symbols=args.symbols)
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall, cpu = time.perf_counter(), time.process_time()
+        processor.run(app.ReplayStreamSource(path))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        processor.alert_executor.shutdown(wait=True)
+        deadline = time.monotonic() + 30
+        while app.telegram_outbox.stats()["depth"] and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    stats = processor.stats()
+    cpu_per_event = cpu / events
+    print(f"⚙️ {events / wall:,.0f} event/s (wall {wall:.1f}s, CPU {cpu:.1f}s, {cpu_per_event * 1e6:.2f} µs/event)")
+    print(f"📡 Laju live Binance (1 miniTicker@arr/detik, {args.symbols} symbol): "
+          f"CPU {args.symbols * cpu_per_event:.1%} dari satu core")
+    print(f"🚨 Alert: {stats['alerts']} (error {stats['alert_errors']}), latency p50 "
+          f"{percentile(processor.latencies, 0.5):.1f}ms p99 {percentile(processor.latencies, 0.99):.1f}ms")
+    print(f"📊 Symbol: {stats['symbols']} (warm {stats['warm_symbols']}), kline {stats['klines']:,}, "
+          f"ticker {stats['tickers']:,}, dropped {stats['dropped_symbols']}")
+    print(f"📨 Telegram outbox: {app.telegram_outbox.stats()}")
+    app.signal_journal.flush()
+    print(f"🗃️ Signal journal: {app.signal_journal.stats()['written']} sinyal tercatat")
+
+    if not args.no_memory:
+        # Memory state yang tertahan setelah replay penuh (tidak tumbuh dengan jumlah bar)
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        measured = app.CryptoStreamProcessor(max_symbols=args.symbols, alert_fn=lambda signal: None)
+        with contextlib.redirect_stdout(io.StringIO()):
+            measured.run(app.ReplayStreamSource(path))
+        retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"🧠 State tertahan {retained / 1024:,.0f} KB ({retained / max(1, len(measured.states)):,.0f} B/symbol), "
+              f"peak {peak / 1024:,.0f} KB")
+
+    stub.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
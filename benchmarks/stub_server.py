@@ -0,0 +1,271 @@
+"""
+Stub HTTP server lokal yang melayani fixture upstream (Coinlore, CoinGecko, Binance,
+Alternative.me, IDX, Sectors.app, Telegram) untuk benchmark offline.
+
+Path request = /<host upstream>/<path asli>, sehingga cukup set HttpClient.host_overrides
+{host: "http://127.0.0.1:<port>/<host>"}. Mendukung injeksi latency, error 5xx, dan 429.
+
+Jalankan standalone:
+    python benchmarks/stub_server.py --port 8765 --latency-ms 80 --throttle-rate 0.05
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Host upstream yang dilayani stub
+UPSTREAM_HOSTS = [
+    "api.coinlore.net",
+    "api.coingecko.com",
+    "fapi.binance.com",
+    "api.alternative.me",
+    "www.idx.co.id",
+    "api.sectors.app",
+    "api.telegram.org"
+]
+
+# Fixture yang bisa direkam ulang dari upstream asli (python benchmarks/run.py --record)
+RECORD_SOURCES = {
+    "coinlore_tickers": ("https://api.coinlore.net/api/tickers/", {"start": 0, "limit": 100}),
+    "coingecko_markets": ("https://api.coingecko.com/api/v3/coins/markets",
+                          {"vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": 1,
+                           "sparkline": "false", "price_change_percentage": "24h"}),
+    "binance_exchange_info": ("https://fapi.binance.com/fapi/v1/exchangeInfo", {}),
+    "binance_premium_index": ("https://fapi.binance.com/fapi/v1/premiumIndex", {}),
+    "fear_greed": ("https://api.alternative.me/fng/", {})
+}
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """Load semua file fixture JSON: nama file (tanpa .json) -> data"""
+    fixtures = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename)) as f:
+                fixtures[filename[:-5]] = json.load(f)
+    return fixtures
+
+class StubConfig:
+    """Konfigurasi injeksi gangguan (bisa diubah saat server jalan)"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, host_latency_ms=None, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.host_latency_ms = dict(host_latency_ms or {})
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self, host):
+        """Return (delay detik, status paksa atau None) untuk satu request"""
+        with self.lock:
+            base = self.host_latency_ms.get(host, self.latency_ms)
+            delay = max(0.0, base + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 503
+        return delay, None
+
+def _page(items, start, size):
+    return items[start:start + size]
+
+KLINE_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+
+def synthetic_klines(symbol, interval, limit):
+    """Kline deterministik per symbol (format array Binance); kline terakhir masih berjalan"""
+    step = KLINE_SECONDS.get(interval, 3600)
+    seed = zlib.crc32(symbol.encode())
+    now = int(time.time())
+    last_open = now // step * step
+    rows = []
+    for open_time in range(last_open - (limit - 1) * step, last_open + 1, step):
+        close = (1 + seed % 500) * (1 + 0.05 * math.sin(open_time / 86400 + seed % 7))
+        rows.append([open_time * 1000, f"{close:.6f}", f"{close * 1.004:.6f}", f"{close * 0.996:.6f}",
+                     f"{close:.6f}", "1000", (open_time + step) * 1000 - 1, "1000000", 100, "500", "500000", "0"])
+    return rows
+
+def route(fixtures, host, path, params):
+    """Resolve request ke (status, body dict/list). None jika route tidak dikenal."""
+    arg = lambda name, default=None: params.get(name, [default])[0]
+
+    if host == "api.coinlore.net" and path.startswith("/api/tickers"):
+        data = fixtures["coinlore_tickers"]
+        start, limit = int(arg("start", 0)), int(arg("limit", 100))
+        return 200, {"data": _page(data["data"], start, limit), "info": data["info"]}
+
+    if host == "api.coingecko.com" and path.startswith("/api/v3/coins/markets"):
+        page, per_page = int(arg("page", 1)), int(arg("per_page", 100))
+        return 200, _page(fixtures["coingecko_markets"], (page - 1) * per_page, per_page)
+
+    if host == "fapi.binance.com":
+        if path == "/fapi/v1/exchangeInfo":
+            return 200, fixtures["binance_exchange_info"]
+        if path == "/fapi/v1/premiumIndex":
+            symbol = arg("symbol")
+            items = fixtures["binance_premium_index"]
+            if symbol is None:
+                return 200, items
+            match = next((item for item in items if item["symbol"] == symbol), None)
+            return (200, match) if match else (400, {"code": -1121, "msg": "Invalid symbol."})
+        if path == "/fapi/v1/klines":
+            return 200, synthetic_klines(arg("symbol", ""), arg("interval", "1h"), int(arg("limit", 500)))
+        if path == "/fapi/v1/openInterest":
+            symbol = arg("symbol")
+            value = fixtures["binance_open_interest"].get(symbol)
+            if value is None:
+                return 400, {"code": -1121, "msg": "Invalid symbol."}
+            return 200, {"symbol": symbol, "openInterest": value, "time": int(time.time() * 1000)}
+
+    if host == "api.alternative.me" and path.startswith("/fng"):
+        return 200, fixtures["fear_greed"]
+
+    if host == "www.idx.co.id" and "GetStockGainerLoser" in path:
+        return 200, fixtures["idx_gainer_loser"]
+    if host == "www.idx.co.id" and "GetCompanyProfiles" in path:
+        data = fixtures["idx_company_profiles"]
+        start, length = int(arg("start", 0)), int(arg("length", 10))
+        return 200, {**data, "data": _page(data["data"], start, length)}
+
+    if host == "api.sectors.app" and path.startswith("/v1/ranking/top-changes"):
+        return 200, fixtures["sectors_top_changes"]
+
+    if host == "api.telegram.org":
+        if path.endswith("/sendMessage"):
+            return 200, fixtures["telegram_send_message"]
+        if path.endswith("/getUpdates"):
+            return 200, fixtures["telegram_get_updates"]
+
+    return None
+
+class StubServer:
+    """ThreadingHTTPServer keep-alive dengan counter request per host"""
+
+    def __init__(self, config=None, port=0, fixtures=None):
+        self.config = config or StubConfig()
+        self.fixtures = fixtures or load_fixtures()
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def host_overrides(self, hosts=UPSTREAM_HOSTS):
+        return {host: f"{self.base_url}/{host}" for host in hosts}
+
+    def snapshot_counts(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def _count(self, host, status):
+        with self.lock:
+            self.counts[host] = self.counts.get(host, 0) + 1
+            if status != 200:
+                key = f"{host}:{status}"
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Header + body dalam satu write, tanpa Nagle (hindari delay delayed-ACK ~40ms)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                host, _, rest = parts.path.lstrip("/").partition("/")
+                path = "/" + rest
+
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                delay, forced_status = server.config.draw(host)
+                if delay:
+                    time.sleep(delay)
+
+                if forced_status == 429:
+                    server._count(host, 429)
+                    self._send(429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                     "parameters": {"retry_after": server.config.retry_after}},
+                               {"Retry-After": str(server.config.retry_after)})
+                    return
+                if forced_status:
+                    server._count(host, forced_status)
+                    self._send(forced_status, {"error": "injected failure"})
+                    return
+
+                result = route(server.fixtures, host, path, parse_qs(parts.query))
+                if result is None:
+                    server._count(host, 404)
+                    self._send(404, {"error": f"no fixture for {host}{path}"})
+                    return
+                status, body = result
+                server._count(host, status)
+                self._send(status, body)
+
+            do_GET = _handle
+            do_POST = _handle
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub server fixture upstream untuk benchmark offline")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    server = StubServer(config, port=args.port)
+    print(f"🧪 Stub server di {server.base_url}")
+    for host, url in server.host_overrides().items():
+        print(f"   - {host} -> {url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
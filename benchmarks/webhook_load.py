@@ -0,0 +1,165 @@
+"""
+Load test /webhook/tradingview pada Gunicorn 1 worker (konfigurasi production: --workers=1 --threads=2).
+
+Telegram diarahkan ke stub server lokal; client load berjalan di beberapa proses terpisah
+(keep-alive, satu koneksi per proses) supaya GIL client tidak membatasi server.
+Laporan: req/s berkelanjutan, latency p50/p95/p99, status HTTP, alert yang digabung, dan
+jumlah pesan yang benar-benar dikirim ke Telegram.
+
+Contoh:
+    python benchmarks/webhook_load.py                            # 10 detik, 8 client, 200 symbol
+    python benchmarks/webhook_load.py --duration 30 --symbols 50 --window 2
+    python benchmarks/webhook_load.py --max-pending 20           # paksa backpressure 429
+    python benchmarks/webhook_load.py --min-rps 500              # exit 1 jika di bawah target
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_server import StubConfig, StubServer
+
+def serve(port, host_overrides, threads, window, max_pending):
+    """Entry point proses server: Gunicorn arbiter + 1 worker gthread"""
+    os.environ["SCHEDULER_ENABLED"] = "0"
+    os.environ["WEBHOOK_COALESCE_WINDOW"] = str(window)
+    os.environ["WEBHOOK_MAX_PENDING"] = str(max_pending)
+    from gunicorn.app.base import BaseApplication
+
+    class WebhookApp(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"127.0.0.1:{port}")
+            self.cfg.set("workers", 1)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("loglevel", "warning")
+            self.cfg.set("accesslog", None)
+
+        def load(self):
+            import app
+            app.http_client = app.HttpClient(rate_limits=app.HTTP_RATE_LIMITS, host_overrides=host_overrides)
+            app.TELEGRAM_BOT_TOKEN = "bench-token"
+            app.TELEGRAM_CHAT_ID = "123456789"
+            app.TELEGRAM_CHAT_IDS = ["123456789"]
+            app.telegram_outbox.private_interval = 0
+            return app.app
+
+    WebhookApp().run()
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def client(port, duration, symbols, seed):
+    """Satu koneksi keep-alive, kirim alert terus-menerus selama duration detik"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    statuses, latencies = {}, []
+    headers = {"Content-Type": "application/json"}
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        body = json.dumps({"symbol": f"SYM{rng.randrange(symbols)}",
+                           "signal": rng.choice(["Breakout resistance", "Golden cross", "RSI oversold"])})
+        started = time.perf_counter()
+        try:
+            conn.request("POST", "/webhook/tradingview", body, headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            status = "error"
+        latencies.append(time.perf_counter() - started)
+        statuses[status] = statuses.get(status, 0) + 1
+    conn.close()
+    return statuses, latencies
+
+def fetch_stats(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/http-stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test webhook TradingView (Gunicorn 1 worker)")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=8, help="Jumlah proses client (koneksi paralel)")
+    parser.add_argument("--symbols", type=int, default=200, help="Jumlah symbol berbeda dalam burst")
+    parser.add_argument("--threads", type=int, default=2, help="Gunicorn --threads")
+    parser.add_argument("--window", type=float, default=5, help="WEBHOOK_COALESCE_WINDOW (detik)")
+    parser.add_argument("--max-pending", type=int, default=500, help="WEBHOOK_MAX_PENDING")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--telegram-latency-ms", type=float, default=80)
+    parser.add_argument("--min-rps", type=float, help="Target req/s minimum (exit 1 jika lewat)")
+    args = parser.parse_args()
+
+    stub = StubServer(StubConfig(latency_ms=args.telegram_latency_ms)).start()
+    ctx = multiprocessing.get_context("spawn")
+    server = ctx.Process(target=serve, args=(args.port, stub.host_overrides(), args.threads,
+                                             args.window, args.max_pending), daemon=True)
+    server.start()
+    try:
+        if not wait_for_port(args.port):
+            print(f"❌ Gunicorn tidak listen di port {args.port}")
+            return 1
+
+        print(f"🚀 Load {args.duration:g}s, {args.clients} client, {args.symbols} symbol, "
+              f"gunicorn 1 worker x {args.threads} thread, window {args.window:g}s")
+        with ctx.Pool(args.clients) as pool:
+            results = pool.starmap(client, [(args.port, args.duration, args.symbols, seed)
+                                            for seed in range(args.clients)])
+
+        statuses, latencies = {}, []
+        for client_statuses, client_latencies in results:
+            for status, count in client_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+            latencies.extend(client_latencies)
+
+        # Tunggu window terakhir di-flush & outbox kosong
+        time.sleep(args.window + 1)
+        deadline = time.monotonic() + 60
+        stats = fetch_stats(args.port)
+        while stats["telegram_outbox"]["depth"] and time.monotonic() < deadline:
+            time.sleep(0.5)
+            stats = fetch_stats(args.port)
+
+        rps = len(latencies) / args.duration
+        print(f"\n📈 {len(latencies)} request, {rps:.0f} req/s")
+        print(f"⏱️  p50 {percentile(latencies, 0.5):.1f}ms  p95 {percentile(latencies, 0.95):.1f}ms  "
+              f"p99 {percentile(latencies, 0.99):.1f}ms")
+        print(f"📊 Status: {dict(sorted(statuses.items(), key=str))}")
+        print(f"🔁 Webhook: {stats['webhook']}")
+        print(f"📨 Telegram outbox: {stats['telegram_outbox']}")
+        print(f"📡 Stub requests: {stub.snapshot_counts()}")
+
+        if args.min_rps is not None and rps < args.min_rps:
+            print(f"❌ {rps:.0f} req/s di bawah target {args.min_rps:.0f} req/s")
+            return 1
+        return 0
+    finally:
+        server.terminate()
+        server.join(10)
+        stub.stop()
+
+if __name__ == "__main__":
+    sys.exit(main())
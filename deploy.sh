@@ -44,7 +44,7 @@ source venv/bin/activate
 
 echo -e "${YELLOW}📥 Step 6: Install Python packages...${NC}"
 pip install --upgrade pip
-pip install flask gunicorn beautifulsoup4 lxml pandas requests schedule yfinance pytz
+pip install flask gunicorn beautifulsoup4 lxml pandas requests yfinance pytz
 
 echo -e "${YELLOW}🔐 Step 7: Setup environment variables...${NC}"
 if [ ! -f .env ]; then
@@ -76,8 +76,9 @@ Type=simple
 User=$USER
 WorkingDirectory=$PROJECT_DIR
 Environment="PATH=$PROJECT_DIR/venv/bin"
+Environment="WEB_CONCURRENCY=2"
 EnvironmentFile=$PROJECT_DIR/.env
-ExecStart=$PROJECT_DIR/venv/bin/gunicorn --bind 0.0.0.0:5000 --workers=1 --threads=2 --timeout=120 --reuse-port app:app
+ExecStart=$PROJECT_DIR/venv/bin/gunicorn --bind 0.0.0.0:5000 --workers=\${WEB_CONCURRENCY} --threads=2 --timeout=120 --reuse-port app:app
 Restart=always
 RestartSec=10
 StandardOutput=journal
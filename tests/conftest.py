@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Import app tanpa scheduler, leader election & shared state
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
@@ -0,0 +1,30 @@
+"""find_signals harus memakai batas filter yang sama dengan screener live"""
+import numpy as np
+
+import app
+import backtest
+
+
+def test_idx_boundary_is_exclusive_like_live_screener():
+    # Symbol 0 tepat di batas (change = 25%, volume = min), symbol 1 jelas lolos
+    close = np.array([[200.0, 250.0], [200.0, 300.0]])
+    liquidity = np.array([[app.IDX_MIN_VOLUME] * 2, [app.IDX_MIN_VOLUME * 2] * 2], dtype=float)
+    sym, t = backtest.find_signals(close, liquidity, 1, (25.0, np.inf), app.IDX_MIN_VOLUME,
+                                   app.IDX_TOP_N, strict=True)
+    assert sym.tolist() == [1] and t.tolist() == [1]
+
+    liquidity[0] *= 2
+    sym, _ = backtest.find_signals(close, liquidity, 1, (25.0, np.inf), app.IDX_MIN_VOLUME,
+                                   app.IDX_TOP_N, strict=True)
+    assert sym.tolist() == [1]
+
+
+def test_crypto_volume_boundary_is_inclusive_like_passes_crypto_filters():
+    low, high = app.CRYPTO_CHANGE_RANGE
+    inside = (low + high) / 2
+    close = np.array([[100.0, 100.0 + inside], [100.0, 100.0 + inside], [100.0, 100.0 + high + 5]])
+    liquidity = np.full_like(close, app.CRYPTO_MIN_VOLUME)
+    liquidity[1] -= 1
+    sym, _ = backtest.find_signals(close, liquidity, 1, app.CRYPTO_CHANGE_RANGE,
+                                   app.CRYPTO_MIN_VOLUME, app.CRYPTO_TOP_N)
+    assert sym.tolist() == [0]
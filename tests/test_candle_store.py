@@ -0,0 +1,99 @@
+"""CandleStore: delta append, merge bar yang overlap, view memmap tanpa copy setelah reopen"""
+import time
+
+import numpy as np
+import pytest
+
+import app
+
+HOUR = 3600
+
+
+def bars(start, count, close_offset=0.0):
+    """Array 6 x count bar per jam mulai start (close = 100 + index + close_offset)"""
+    times = start + HOUR * np.arange(count, dtype=np.float64)
+    close = 100 + np.arange(count, dtype=np.float64) + close_offset
+    return np.vstack([times, close - 0.5, close + 1, close - 1, close, np.full(count, 1000.0)])
+
+
+@pytest.fixture
+def start():
+    return float(int(time.time()) // HOUR * HOUR - 10 * HOUR)
+
+
+class Fetcher:
+    def __init__(self, start):
+        self.start = start
+        self.calls = []
+
+    def __call__(self, start_ts, period):
+        self.calls.append(start_ts)
+        if start_ts is None:
+            return bars(self.start, 8)
+        # Delta: bar terakhir tersimpan (candle berjalan, close berubah) + 2 bar baru
+        return bars(start_ts, 3, close_offset=50.0)
+
+
+def test_sync_fetches_only_delta_after_cold_start(tmp_path, start):
+    store = app.CandleStore(str(tmp_path), min_refresh=0)
+    fetch = Fetcher(start)
+    first = store.sync("BTC-USD", "1h", "1mo", fetch)
+    assert len(first["close"]) == 8
+
+    second = store.sync("BTC-USD", "1h", "1mo", fetch)
+    assert fetch.calls == [None, start + 7 * HOUR]
+    assert len(second["close"]) == 10
+    assert np.all(np.diff(second["time"]) == HOUR)
+    stats = store.stats()
+    assert stats["cold_fetches"] == 1 and stats["delta_fetches"] == 1
+    assert stats["bars_downloaded"] == 11
+
+
+def test_overlapping_bar_is_replaced_not_duplicated(tmp_path, start):
+    store = app.CandleStore(str(tmp_path))
+    store.append("ETH-USD", "1h", bars(start, 5))
+    merged = store.append("ETH-USD", "1h", bars(start + 4 * HOUR, 2, close_offset=10.0))
+    assert merged.shape == (6, 6)
+    assert list(merged[0]) == list(start + HOUR * np.arange(6))
+    # Bar ke-5 diganti versi baru (close 100 + 0 + 10), bukan bar lama (close 104); bar sebelumnya tetap
+    assert merged[4, 4] == 110.0
+    assert merged[4, 3] == 103.0
+
+
+def test_sync_skips_fetch_within_min_refresh(tmp_path, start):
+    store = app.CandleStore(str(tmp_path), min_refresh=60)
+    fetch = Fetcher(start)
+    store.sync("SOL-USD", "1h", "1mo", fetch)
+    store.sync("SOL-USD", "1h", "1mo", fetch)
+    assert fetch.calls == [None]
+    assert store.stats()["skipped"] == 1
+
+
+def test_append_keeps_only_max_bars(tmp_path, start):
+    store = app.CandleStore(str(tmp_path), max_bars=4)
+    series = store.append("ADA-USD", "1h", bars(start, 10))
+    assert series.shape == (6, 4)
+    assert series[0, 0] == start + 6 * HOUR
+
+
+def test_window_views_share_memmap_after_reopen(tmp_path, start):
+    app.CandleStore(str(tmp_path)).append("BNB-USD", "1h", bars(start, 8))
+
+    reopened = app.CandleStore(str(tmp_path))
+    series = reopened.load("BNB-USD", "1h")
+    assert isinstance(series, np.memmap)
+    window = reopened.window(series, start + 3 * HOUR)
+    assert len(window["close"]) == 5
+    for field in app.CandleStore.FIELDS:
+        assert np.shares_memory(window[field], series)
+        assert window[field].flags.c_contiguous
+    assert not window["close"].flags.writeable
+
+
+def test_corrupt_file_is_treated_as_missing(tmp_path):
+    store = app.CandleStore(str(tmp_path))
+    path = store.path("XRP-USD", "1h")
+    app.os.makedirs(app.os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"not a npy file")
+    assert store.load("XRP-USD", "1h") is None
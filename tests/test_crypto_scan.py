@@ -0,0 +1,72 @@
+"""scan_crypto_pages: early stop berdasarkan market cap & top-N heap"""
+import app
+
+
+def coin(symbol, market_cap, change_pct=5.0, volume=1_000_000):
+    # market_cap dalam juta USD (sama dengan parser Coinlore/CoinGecko)
+    return app.ScreenedAsset(symbol, 1.0, change_pct, volume, market_cap)
+
+
+class Pages:
+    """Generator halaman yang mencatat berapa halaman benar-benar diminta"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.served = 0
+        self.closed = False
+
+    def __iter__(self):
+        for page in self.pages:
+            self.served += 1
+            yield page
+
+    def close(self):
+        self.closed = True
+
+
+def scan(pages, **kwargs):
+    source = Pages(pages)
+    iterator = iter(source)
+    gainers, pages_read, evaluated = app.scan_crypto_pages(iterator, **kwargs)
+    return gainers, pages_read, evaluated, source
+
+
+def test_zero_market_cap_on_first_page_does_not_stop_scan():
+    pages = [
+        [coin("BTC", 1_000_000, change_pct=1.0), coin("NOCAP", 0), coin("ETH", 400_000, change_pct=2.0)],
+        [coin("MID", 120, change_pct=8.0), coin("SMALL", 60, change_pct=4.0)],
+        [coin("TINY", 10, change_pct=9.0)],
+        [coin("NEVER", 5, change_pct=9.0)],
+    ]
+    gainers, pages_read, evaluated, _ = scan(pages)
+    assert [asset.symbol for asset in gainers] == ["MID", "SMALL"]
+    # Halaman 3 (cap terbesar $10M) menghentikan scan, halaman 4 tidak diminta
+    assert pages_read == 3
+    assert evaluated == 6
+
+
+def test_page_without_valid_caps_continues():
+    pages = [[coin("A", 0), coin("B", 0)], [coin("MID", 100, change_pct=6.0)], [coin("LOW", 20)]]
+    gainers, pages_read, _, _ = scan(pages)
+    assert [asset.symbol for asset in gainers] == ["MID"]
+    assert pages_read == 3
+
+
+def test_stops_when_largest_cap_below_minimum():
+    pages = [[coin("LOW", 40, change_pct=6.0), coin("ZERO", 0)], [coin("NEVER", 500, change_pct=6.0)]]
+    gainers, pages_read, _, source = scan(pages)
+    assert gainers == []
+    assert pages_read == 1
+    assert source.served == 1
+
+
+def test_top_n_keeps_strongest_momentum():
+    page = [coin(f"C{i}", 1000 - i, change_pct=3 + i) for i in range(12)]
+    gainers, _, _, _ = scan([page, []], top_n=5)
+    assert [asset.change_pct for asset in gainers] == [14, 13, 12, 11, 10]
+
+
+def test_filters_out_of_range_momentum_and_low_volume():
+    page = [coin("HOT", 1000, change_pct=40.0), coin("THIN", 1000, volume=1000), coin("OK", 1000, change_pct=3.5)]
+    gainers, _, _, _ = scan([page, []])
+    assert [asset.symbol for asset in gainers] == ["OK"]
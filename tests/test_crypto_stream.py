@@ -0,0 +1,68 @@
+"""Pemilihan symbol mode stream: top likuiditas, slot tidak terpakai state lama, setup di-retry"""
+import threading
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    symbols = frozenset({"AAAUSDT", "BTCUSDT", "ETHUSDT", "ZZZUSDT", "BTCUSDC"})
+    volumes = {"BTCUSDT": 9e9, "ETHUSDT": 5e9, "ZZZUSDT": 2e8, "AAAUSDT": 1e3}
+    monkeypatch.setattr(app, "get_binance_perpetual_symbols", lambda: symbols)
+    monkeypatch.setattr(app, "get_binance_quote_volumes", lambda: volumes)
+    return volumes
+
+
+def test_symbols_ranked_by_quote_volume(listing):
+    assert app.select_stream_symbols(3) == ["BTCUSDT", "ETHUSDT", "ZZZUSDT"]
+
+
+def test_symbols_fall_back_to_alphabetical_without_volumes(listing, monkeypatch):
+    monkeypatch.setattr(app, "get_binance_quote_volumes", lambda: {})
+    assert app.select_stream_symbols(2) == ["AAAUSDT", "BTCUSDT"]
+
+
+def test_seed_drops_states_outside_selection():
+    states = {symbol: app.IndicatorState() for symbol in ("AAAUSDT", "BBBUSDT")}
+    processor = app.CryptoStreamProcessor(max_symbols=2, states=states)
+    processor.seed(["BTCUSDT", "ETHUSDT"], fetch_fn=lambda symbol: [(0.0, 1.0)])
+    assert sorted(processor.states) == ["BTCUSDT", "ETHUSDT"]
+    # Slot penuh oleh symbol terpilih: symbol lain dari miniTicker dibuang
+    assert processor.state("AAAUSDT") is None
+
+
+def test_stream_setup_retries_after_failure(listing, monkeypatch):
+    attempts = []
+    seeded = threading.Event()
+
+    def flaky_symbols(limit):
+        attempts.append(limit)
+        if len(attempts) == 1:
+            raise RuntimeError("exchangeInfo down")
+        return ["BTCUSDT"]
+
+    class StoppedSource:
+        def __init__(self, symbols):
+            seeded.set()
+
+        def __iter__(self):
+            return iter(())
+
+        def stop(self):
+            pass
+
+    monkeypatch.setattr(app, "crypto_stream", None)
+    monkeypatch.setattr(app, "CRYPTO_STREAM_REPLAY", None)
+    monkeypatch.setattr(app, "load_indicator_states", lambda path: {})
+    monkeypatch.setattr(app, "select_stream_symbols", flaky_symbols)
+    monkeypatch.setattr(app, "BinanceStreamSource", StoppedSource)
+    monkeypatch.setattr(app.CryptoStreamProcessor, "seed", lambda self, symbols: None)
+    monkeypatch.setattr(app.CryptoStreamProcessor, "save", lambda self, path=None: None)
+
+    thread = threading.Thread(target=app.crypto_stream_thread, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert seeded.is_set() and len(attempts) == 2
+    assert not thread.is_alive()
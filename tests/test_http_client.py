@@ -0,0 +1,128 @@
+"""HttpClient & TokenBucket terhadap stub server lokal: retry 5xx, Retry-After 429, pacing per host"""
+import time
+
+import pytest
+
+import app
+from benchmarks.stub_server import StubConfig, StubServer
+
+HOST = "api.coinlore.net"
+URL = f"https://{HOST}/api/tickers/"
+
+
+class ScriptedConfig(StubConfig):
+    """Status paksa berurutan per request (None = layani fixture), setelah habis selalu sukses"""
+
+    def __init__(self, statuses=(), retry_after=1):
+        super().__init__(retry_after=retry_after)
+        self.statuses = list(statuses)
+
+    def draw(self, host):
+        with self.lock:
+            return 0.0, self.statuses.pop(0) if self.statuses else None
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = StubServer(ScriptedConfig()).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stub(stub_server):
+    stub_server.config = ScriptedConfig()
+    with stub_server.lock:
+        stub_server.counts.clear()
+    return stub_server
+
+
+def client_for(stub, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return app.HttpClient(host_overrides=stub.host_overrides([HOST]), **kwargs)
+
+
+def test_get_retries_5xx_until_success(stub):
+    stub.config.statuses = [503, 502]
+    client = client_for(stub, max_retries=3)
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert stub.snapshot_counts()[HOST] == 3
+    assert client.stats()["hosts"][HOST] == {"requests": 3, "retries": 2, "errors": 0}
+
+
+def test_get_returns_last_5xx_after_max_retries(stub):
+    stub.config.statuses = [503] * 10
+    client = client_for(stub, max_retries=2)
+    assert client.get(URL).status_code == 503
+    assert stub.snapshot_counts()[HOST] == 3
+
+
+def test_post_is_not_retried_on_5xx(stub):
+    stub.config.statuses = [503]
+    client = client_for(stub, max_retries=3)
+    assert client.post(URL).status_code == 503
+    assert client.stats()["hosts"][HOST]["retries"] == 0
+
+
+def test_429_waits_for_retry_after(stub):
+    stub.config.statuses = [429]
+    stub.config.retry_after = 0.3
+    # Backoff 0: jeda yang terukur hanya berasal dari Retry-After
+    client = client_for(stub, backoff_base=0.0)
+    started = time.monotonic()
+    assert client.post(URL).status_code == 200
+    assert time.monotonic() - started >= 0.3
+    assert client.stats()["hosts"][HOST]["retries"] == 1
+
+
+def test_429_with_retry_after_above_limit_is_returned(stub):
+    stub.config.statuses = [429]
+    stub.config.retry_after = 120
+    client = client_for(stub, max_retry_after=30.0)
+    started = time.monotonic()
+    assert client.get(URL).status_code == 429
+    assert time.monotonic() - started < 1.0
+    assert stub.snapshot_counts()[HOST] == 1
+
+
+def test_connection_errors_are_counted_and_retried():
+    # Port 9 (discard) tidak listen: koneksi langsung ditolak
+    client = app.HttpClient(host_overrides={HOST: "http://127.0.0.1:9"}, max_retries=2, backoff_base=0.01)
+    with pytest.raises(app.requests.ConnectionError):
+        client.get(URL, timeout=1)
+    assert client.stats()["hosts"][HOST] == {"requests": 3, "retries": 2, "errors": 3}
+
+
+def test_token_bucket_paces_requests_per_host(stub):
+    client = client_for(stub, rate_limits={HOST: (2, 20)})
+    started = time.monotonic()
+    for _ in range(6):
+        assert client.get(URL).status_code == 200
+    # Burst 2 langsung, 4 sisanya menunggu token 1/20 detik
+    assert time.monotonic() - started >= 4 / 20 * 0.9
+    limiter = client.stats()["rate_limiters"][HOST]
+    assert limiter["acquired"] == 6
+    assert limiter["throttled"] == 4
+    assert limiter["wait_seconds"] > 0
+
+
+def test_token_bucket_times_out_without_token():
+    bucket = app.TokenBucket(capacity=1, rate=0.5)
+    assert bucket.acquire(max_wait=0.01)
+    assert not bucket.acquire(max_wait=0.01)
+    assert bucket.stats()["acquired"] == 1
+
+
+def test_unlimited_host_has_no_limiter(stub):
+    client = client_for(stub, rate_limits={"api.coingecko.com": (1, 1)})
+    for _ in range(3):
+        client.get(URL)
+    assert HOST not in client.stats()["rate_limiters"]
+
+
+def test_parse_retry_after():
+    assert app._parse_retry_after("2.5") == 2.5
+    assert app._parse_retry_after(None) is None
+    assert app._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert app._parse_retry_after("soon") is None
@@ -0,0 +1,86 @@
+"""get_idx_top_gainers_yfinance: single-flight scan, budget per pemanggil, hasil parsial & error ber-coverage"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import app
+
+TICKERS = [f"T{i:02d}.JK" for i in range(6)]
+
+
+def chunk_frame(chunk):
+    """Bar 2 hari format yf.download(group_by="column"): semua ticker naik 10%"""
+    columns = pd.MultiIndex.from_product([["Close", "Volume"], chunk])
+    rows = [[100.0] * len(chunk) + [1e6] * len(chunk), [110.0] * len(chunk) + [1e6] * len(chunk)]
+    return pd.DataFrame(rows, index=pd.to_datetime(["2026-01-05", "2026-01-06"]), columns=columns)
+
+
+class Downloader:
+    """Pengganti _download_chunk: chunk ke-2 dst. tertahan sampai gate dibuka"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = 0
+
+    def __call__(self, chunk, period, interval):
+        self.calls += 1
+        if self.calls > 1:
+            self.gate.wait(5)
+        return chunk_frame(chunk)
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    downloader = Downloader()
+    monkeypatch.setattr(app, "IDX_UNIVERSE_MODE", "watchlist")
+    monkeypatch.setattr(app, "IDX_TICKERS", TICKERS)
+    monkeypatch.setattr(app, "YF_BULK_CHUNK_SIZE", 3)
+    monkeypatch.setattr(app, "_download_chunk", downloader)
+    monkeypatch.setattr(app.symbol_metadata, "refresh_async", lambda *args, **kwargs: None)
+    return downloader
+
+
+def test_waiter_stops_at_its_own_budget_with_partial_result(downloader):
+    results = {}
+    leader = threading.Thread(target=lambda: results.update(leader=app.get_idx_top_gainers_yfinance(budget=30)))
+    leader.start()
+    while not downloader.calls > 1:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    partial = app.get_idx_top_gainers_yfinance(budget=0.3)
+    assert time.monotonic() - started < 2
+    assert partial.coverage["evaluated"] == 3 and partial.coverage["total"] == 6
+    assert {asset.symbol for asset in partial} == {"T00", "T01", "T02"}
+
+    downloader.gate.set()
+    leader.join(5)
+    assert results["leader"].coverage["evaluated"] == 6
+    assert downloader.calls == 2  # Waiter tidak memicu download sendiri
+
+
+def test_waiter_within_budget_gets_full_result(downloader):
+    results = {}
+    leader = threading.Thread(target=lambda: results.update(leader=app.get_idx_top_gainers_yfinance(budget=30)))
+    leader.start()
+    while not downloader.calls > 1:
+        time.sleep(0.01)
+
+    threading.Timer(0.1, downloader.gate.set).start()
+    waited = app.get_idx_top_gainers_yfinance(budget=5)
+    leader.join(5)
+    assert waited is results["leader"]
+    assert waited.coverage["evaluated"] == 6 and len(waited) == 6
+
+
+def test_scan_error_returns_empty_result_with_coverage(downloader, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("yfinance down")
+
+    monkeypatch.setattr(app, "yf_bulk_download", broken)
+    result = app.get_idx_top_gainers_yfinance(budget=5)
+    assert isinstance(result, app.ScreeningResult) and result == []
+    assert result.coverage["evaluated"] == 0 and result.coverage["total"] == 6
+    assert result.coverage["universe"] == "watchlist"
@@ -0,0 +1,99 @@
+"""IndicatorState O(1) vs batch calculate_*/compute_indicator_set, dan snapshot/restore"""
+import json
+
+import numpy as np
+import pytest
+
+import app
+
+FIELDS = ("close", "ema_20", "ema_50", "rsi", "macd", "macd_signal", "macd_hist", "bb_upper", "bb_middle", "bb_lower")
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(11)
+    return list(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400))))
+
+
+def assert_row_matches(actual, expected):
+    for field in FIELDS:
+        if expected[field] is None:
+            assert actual[field] is None, field
+        else:
+            assert actual[field] == pytest.approx(expected[field], rel=1e-8, abs=1e-10), field
+
+
+@pytest.mark.parametrize("length", [1, 14, 15, 19, 20, 26, 49, 50, 51, 120, 400])
+def test_state_matches_compute_indicator_set(prices, length):
+    state = app.IndicatorState()
+    for price in prices[:length]:
+        row = state.update(price)
+    closes, lengths = app.stack_closes([prices[:length]])
+    assert_row_matches(row, app.indicator_row(app.compute_indicator_set(closes, lengths), 0))
+
+
+def test_each_indicator_matches_calculate_functions(prices):
+    ema, rsi = app.IncrementalEMA(20), app.IncrementalRSI(14)
+    macd, bb = app.IncrementalMACD(), app.IncrementalBollinger()
+    for price in prices:
+        ema.update(price)
+        rsi.update(price)
+        macd.update(price)
+        bb.update(price)
+    assert ema.current() == pytest.approx(app.calculate_ema(prices, 20), rel=1e-9)
+    assert rsi.current() == pytest.approx(app.calculate_rsi(prices), rel=1e-9)
+    assert macd.current() == pytest.approx(app.calculate_macd(prices), rel=1e-8)
+    assert bb.current() == pytest.approx(app.calculate_bollinger_bands(prices), rel=1e-9)
+
+
+def test_rsi_running_sums_do_not_drift():
+    rsi = app.IncrementalRSI(14)
+    # Lonjakan besar lalu turun terus: setelah lonjakan keluar window, gain harus tepat nol
+    path = [1.0, 1e9 + 0.1, 0.3, 1e9 + 0.7] + [100.0 - 0.01 * i for i in range(200)]
+    for price in path:
+        rsi.update(price)
+    assert rsi.gain_sum == sum(rsi.gains) == 0.0
+    assert rsi.loss_sum == pytest.approx(sum(rsi.losses), abs=1e-15)
+    assert rsi.current() == 0.0
+
+
+def test_snapshot_restore_round_trip(prices):
+    live = app.IndicatorState()
+    for i, price in enumerate(prices[:150]):
+        live.update(price, bar_time=i * 3600.0)
+
+    restored = app.IndicatorState.restore(json.loads(json.dumps(live.snapshot())))
+    assert restored.last_time == live.last_time
+    assert_row_matches(restored.row(), live.row())
+
+    # Setelah restore, update berikutnya identik dengan state yang tidak pernah disimpan
+    for i, price in enumerate(prices[150:], start=150):
+        assert_row_matches(restored.update(price, i * 3600.0), live.update(price, i * 3600.0))
+
+
+def test_wilder_rsi_round_trip(prices):
+    live = app.IncrementalRSI(14, smoothing="wilder")
+    for price in prices[:60]:
+        live.update(price)
+    restored = app.IncrementalRSI.from_dict(json.loads(json.dumps(live.to_dict())))
+    for price in prices[60:]:
+        assert restored.update(price) == pytest.approx(live.update(price), rel=1e-12)
+
+
+def test_save_and_load_states(tmp_path, prices):
+    states = {"BTCUSDT": app.IndicatorState(), "ETHUSDT": app.IndicatorState()}
+    for price in prices[:80]:
+        states["BTCUSDT"].update(price)
+    path = str(tmp_path / "states.json")
+    app.save_indicator_states(states, path)
+
+    loaded = app.load_indicator_states(path)
+    assert sorted(loaded) == ["BTCUSDT", "ETHUSDT"]
+    assert_row_matches(loaded["BTCUSDT"].row(), states["BTCUSDT"].row())
+    assert loaded["ETHUSDT"].row()["close"] is None
+
+
+def test_corrupt_state_file_starts_empty(tmp_path):
+    path = tmp_path / "states.json"
+    path.write_text("{not json")
+    assert app.load_indicator_states(str(path)) == {}
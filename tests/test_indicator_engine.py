@@ -0,0 +1,76 @@
+"""Paritas numerik compute_indicator_set (multi-symbol) vs calculate_* per seri"""
+import numpy as np
+import pytest
+
+import app
+
+# Termasuk seri yang lebih pendek dari tiap periode (RSI 15, BB/EMA20 20, MACD 26, EMA50 50)
+LENGTHS = [1, 5, 14, 15, 19, 20, 21, 25, 26, 27, 49, 50, 51, 120, 300]
+
+
+def random_walk(rng, length):
+    return list(100 * np.exp(np.cumsum(rng.normal(0, 0.02, length))))
+
+
+@pytest.fixture(scope="module")
+def series_list():
+    rng = np.random.default_rng(7)
+    return [random_walk(rng, length) for length in LENGTHS]
+
+
+@pytest.fixture(scope="module")
+def indicator_set(series_list):
+    closes, lengths = app.stack_closes(series_list)
+    # Rata kanan dengan NaN padding di kiri untuk seri yang lebih pendek
+    assert closes.shape == (len(LENGTHS), max(LENGTHS))
+    assert np.isnan(closes[0, :-1]).all()
+    return app.compute_indicator_set(closes, lengths)
+
+
+def assert_same(actual, expected):
+    if expected is None or np.isnan(expected):
+        assert np.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("i", range(len(LENGTHS)))
+def test_ema_parity(series_list, indicator_set, i):
+    assert_same(indicator_set["ema_20"][i], app.calculate_ema(series_list[i], 20))
+    assert_same(indicator_set["ema_50"][i], app.calculate_ema(series_list[i], 50))
+
+
+@pytest.mark.parametrize("i", range(len(LENGTHS)))
+def test_rsi_parity(series_list, indicator_set, i):
+    assert_same(indicator_set["rsi"][i], app.calculate_rsi(series_list[i]))
+
+
+@pytest.mark.parametrize("i", range(len(LENGTHS)))
+def test_macd_parity(series_list, indicator_set, i):
+    macd, signal, hist = app.calculate_macd(series_list[i])
+    assert_same(indicator_set["macd"][i], macd)
+    assert_same(indicator_set["macd_signal"][i], signal)
+    assert_same(indicator_set["macd_hist"][i], hist)
+
+
+@pytest.mark.parametrize("i", range(len(LENGTHS)))
+def test_bollinger_parity(series_list, indicator_set, i):
+    upper, middle, lower = app.calculate_bollinger_bands(series_list[i])
+    assert_same(indicator_set["bb_upper"][i], upper)
+    assert_same(indicator_set["bb_middle"][i], middle)
+    assert_same(indicator_set["bb_lower"][i], lower)
+
+
+def test_short_series_are_nan(indicator_set):
+    lengths = np.array(LENGTHS)
+    assert np.isnan(indicator_set["ema_50"][lengths < 50]).all()
+    assert np.isnan(indicator_set["rsi"][lengths < 15]).all()
+    assert np.isnan(indicator_set["macd"][lengths < 26]).all()
+    assert np.isnan(indicator_set["bb_upper"][lengths < 20]).all()
+    assert not np.isnan(indicator_set["ema_50"][lengths >= 50]).any()
+
+
+def test_indicator_row_maps_nan_to_none(indicator_set):
+    row = app.indicator_row(indicator_set, 0)
+    assert row["close"] is not None
+    assert row["ema_20"] is None and row["rsi"] is None and row["macd"] is None
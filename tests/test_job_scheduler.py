@@ -0,0 +1,108 @@
+"""JobScheduler: jadwal dicatat selesai setelah job selesai, sehingga crash di tengah job di-catch-up"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+import app
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def recent_slot():
+    """Jam HH:MM UTC yang baru lewat 2 menit (masih dalam grace window)"""
+    slot = (datetime.now(pytz.UTC) - timedelta(minutes=2)).replace(second=0, microsecond=0)
+    return f"{slot:%H:%M}", slot
+
+
+def reporting_job(runs, gate=None):
+    """Job bernama sama di tiap scheduler (nama job = nama fungsi + session)"""
+    def job_report(session):
+        runs.append(session)
+        if gate is not None:
+            gate.wait(5)
+    return job_report
+
+
+def read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def test_slot_is_saved_only_after_job_finishes(tmp_path, recent_slot):
+    at, slot = recent_slot
+    path = str(tmp_path / "scheduler_state.json")
+    gate = threading.Event()
+    runs = []
+    scheduler = app.JobScheduler(state_path=path)
+    job = scheduler.daily(at, reporting_job(runs, gate), session="TEST")
+    scheduler.start()
+    assert wait_for(lambda: runs == ["TEST"])
+    assert job.running and job.running_since == slot
+    assert read_state(path) == {}
+
+    gate.set()
+    assert wait_for(lambda: not job.running)
+    assert read_state(path) == {job.name: slot.isoformat()}
+    assert job.last_run == slot
+
+
+def test_job_interrupted_mid_run_is_caught_up_on_restart(tmp_path, recent_slot):
+    at, slot = recent_slot
+    path = str(tmp_path / "scheduler_state.json")
+    never = threading.Event()
+    crashed_runs, restarted_runs = [], []
+    # Proses "mati" sebelum job selesai: job tidak pernah kembali
+    crashed = app.JobScheduler(state_path=path)
+    crashed.daily(at, reporting_job(crashed_runs, never), session="TEST")
+    crashed.start()
+    assert wait_for(lambda: crashed_runs)
+
+    restarted = app.JobScheduler(state_path=path)
+    job = restarted.daily(at, reporting_job(restarted_runs), session="TEST")
+    restarted.start()
+    assert wait_for(lambda: job.last_run == slot)
+    assert restarted_runs == ["TEST"]
+    never.set()
+
+
+def test_finished_slot_is_not_run_again(tmp_path, recent_slot):
+    at, slot = recent_slot
+    path = str(tmp_path / "scheduler_state.json")
+    runs = []
+    with open(path, "w") as f:
+        json.dump({"job_report:TEST": slot.isoformat()}, f)
+    scheduler = app.JobScheduler(state_path=path)
+    job = scheduler.daily(at, reporting_job(runs), session="TEST")
+    scheduler.start()
+    time.sleep(0.2)
+    assert runs == []
+    assert job.last_run == slot
+
+
+def test_failing_job_still_counts_as_finished(tmp_path, recent_slot):
+    at, slot = recent_slot
+    path = str(tmp_path / "scheduler_state.json")
+
+    def job_report(session):
+        raise RuntimeError("upstream down")
+
+    scheduler = app.JobScheduler(state_path=path)
+    job = scheduler.daily(at, job_report, session="TEST")
+    scheduler.start()
+    assert wait_for(lambda: job.last_run == slot)
+    assert not job.running
@@ -0,0 +1,112 @@
+"""resample_candles vs pandas resample().agg, timeframe_bias & confluence analyze_timeframes"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+HOUR = 3600
+DAY = 24 * HOUR
+# Awal hari UTC; seri dimulai jam 02:00 agar bucket pertama juga tidak lengkap
+ORIGIN = 1_700_000_000 // DAY * DAY + 2 * HOUR
+
+
+def candles(hours, drop=()):
+    """Window 1h (format CandleStore.window) sepanjang hours bar, bar di index drop dihilangkan (gap)"""
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, hours)))
+    open_ = np.r_[100.0, close[:-1]]
+    keep = np.setdiff1d(np.arange(hours), drop)
+    window = {
+        "time": ORIGIN + HOUR * np.arange(hours, dtype=np.float64),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, hours)),
+        "low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, hours)),
+        "close": close,
+        "volume": rng.uniform(100, 1000, hours)
+    }
+    return {field: values[keep] for field, values in window.items()}
+
+
+def pandas_resample(window, seconds):
+    df = pd.DataFrame({field: window[field] for field in app.CandleStore.FIELDS if field != "time"},
+                      index=pd.to_datetime(window["time"], unit="s", utc=True))
+    agg = df.resample(f"{seconds}s", origin="epoch").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    # Bucket kosong (gap) muncul sebagai NaN di pandas; resample_candles melewatinya
+    agg = agg.dropna(subset=["open"])
+    return agg.index.as_unit("s").asi8.astype(np.float64), agg
+
+
+@pytest.mark.parametrize("hours,drop", [
+    (24 * 10 + 7, ()),            # bucket terakhir parsial (candle berjalan)
+    (24 * 10, ()),
+    (24 * 5 + 3, (30, 31, 32, 33, 34, 35, 36, 37, 80)),  # gap satu bucket 4h penuh + bar hilang
+    (1, ()),
+])
+@pytest.mark.parametrize("seconds", [4 * HOUR, DAY])
+def test_resample_matches_pandas(hours, drop, seconds):
+    window = candles(hours, drop)
+    resampled = app.resample_candles(window, seconds)
+    times, expected = pandas_resample(window, seconds)
+    np.testing.assert_array_equal(resampled["time"], times)
+    for field in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(resampled[field], expected[field].to_numpy(), rtol=1e-12, err_msg=field)
+
+
+def test_partial_last_bucket_uses_latest_bar():
+    window = candles(25)  # 02:00 s/d 02:00 besok -> bucket 4h terakhir (00:00) baru berisi 3 bar
+    resampled = app.resample_candles(window, 4 * HOUR)
+    last_bucket = window["time"] >= resampled["time"][-1]
+    assert last_bucket.sum() == 3
+    assert resampled["close"][-1] == window["close"][-1]
+    assert resampled["open"][-1] == window["open"][last_bucket][0]
+    assert resampled["volume"][-1] == pytest.approx(window["volume"][last_bucket].sum())
+    assert resampled["time"][-1] % (4 * HOUR) == 0
+
+
+def test_resample_empty_window():
+    empty = {field: np.empty(0) for field in app.CandleStore.FIELDS}
+    assert all(len(values) == 0 for values in app.resample_candles(empty, DAY).values())
+
+
+@pytest.mark.parametrize("row,bias", [
+    ({"ema_20": 11, "ema_50": 10, "macd": 1, "macd_signal": 0, "rsi": 55}, 1),
+    ({"ema_20": 9, "ema_50": 10, "macd": -1, "macd_signal": 0, "rsi": 45}, -1),
+    # RSI overbought menahan dua vote bullish jadi tetap bullish (2 - 1)
+    ({"ema_20": 11, "ema_50": 10, "macd": 1, "macd_signal": 0, "rsi": 80}, 1),
+    # Trend turun tapi oversold + MACD naik: vote -1 + 1 + 1
+    ({"ema_20": 9, "ema_50": 10, "macd": 1, "macd_signal": 0, "rsi": 20}, 1),
+    ({"ema_20": 11, "ema_50": 10, "macd": -1, "macd_signal": 0, "rsi": 50}, 0),
+    ({"ema_20": 11, "ema_50": None, "macd": None, "macd_signal": None, "rsi": None}, 0),
+    ({"ema_20": 11, "ema_50": None, "macd": None, "macd_signal": None, "rsi": 75}, -1),
+])
+def test_timeframe_bias(row, bias):
+    assert app.timeframe_bias(row) == bias
+
+
+def test_confluence_averages_timeframes_with_data():
+    window = candles(24 * 40)
+    rows, biases, confluence = app.analyze_timeframes(window, "1h", ["1h", "4h", "1d"])
+    assert list(rows) == ["1h", "4h", "1d"]
+    # Indikator 4h dihitung dari close hasil resample, bukan download terpisah
+    assert rows["4h"]["close"] == app.resample_candles(window, 4 * HOUR)["close"][-1]
+    assert set(biases) == {"1h", "4h", "1d"}
+    assert confluence == round(sum(app.timeframe_bias(rows[tf]) for tf in rows) / 3, 2)
+    assert -1 <= confluence <= 1
+
+
+def test_confluence_needs_two_timeframes():
+    # 30 bar 1h -> 4h hanya 8 bar (EMA20 kosong), 1d tidak cukup sama sekali
+    rows, biases, confluence = app.analyze_timeframes(candles(30), "1h", ["1h", "4h", "1d"])
+    assert list(biases) == ["1h"]
+    assert confluence is None
+    assert rows["1d"]["ema_20"] is None
+
+
+def test_confluence_skips_short_timeframes():
+    # 10 hari bar 1h: 1h & 4h terisi, 1d hanya 11 bar (EMA20 kosong) sehingga tidak ikut dirata-rata
+    window = candles(24 * 10)
+    rows, biases, confluence = app.analyze_timeframes(window, "1h", ["1h", "4h", "1d"])
+    assert set(biases) == {"1h", "4h"}
+    assert confluence == round((biases["1h"] + biases["4h"]) / 2, 2)
@@ -0,0 +1,204 @@
+"""Deployment multi-worker: shared tier, token bucket bersama, dan relay Telegram/webhook follower -> leader"""
+import threading
+import time
+
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("env,enabled", [
+    ({}, False),
+    ({"WEB_CONCURRENCY": "1"}, False),
+    ({"WEB_CONCURRENCY": "3"}, True),
+    ({"WEB_CONCURRENCY": "banyak"}, False),
+    ({"WEB_CONCURRENCY": "1", "SHARED_STATE_ENABLED": "1"}, True),
+    ({"WEB_CONCURRENCY": "4", "SHARED_STATE_ENABLED": "0"}, False),
+])
+def test_shared_state_only_for_multiple_workers(monkeypatch, env, enabled):
+    for name in ("WEB_CONCURRENCY", "SHARED_STATE_ENABLED"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    assert app.shared_state_configured() is enabled
+
+
+def open_store(path):
+    """Satu SharedStateStore per 'worker' (koneksi SQLite sendiri) ke file yang sama"""
+    store = app.SharedStateStore(str(path))
+    store.enabled = True
+    return store
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    store = open_store(tmp_path / "shared.db")
+    monkeypatch.setattr(app, "shared_state", store)
+    return store
+
+
+def test_queue_is_fifo_across_stores(tmp_path):
+    follower_a, follower_b, leader = (open_store(tmp_path / "shared.db") for _ in range(3))
+    follower_a.push("q", ("a", 1))
+    follower_b.push("q", ("b", 2))
+    follower_a.push("q", ("c", 3))
+    follower_a.push("other", "x")
+    assert leader.queue_depth("q") == 3
+    assert leader.pop("q", limit=2) == [("a", 1), ("b", 2)]
+    assert leader.pop("q") == [("c", 3)]
+    assert leader.pop("q") == [] and leader.queue_depth("other") == 1
+    assert leader.stats()["queues"] == {"other": 1}
+
+
+def test_token_bucket_is_shared_between_workers(shared):
+    # Dua bucket = dua worker dengan konfigurasi yang sama untuk host yang sama
+    workers = [app.TokenBucket(2, 10, shared_key="api.example.com") for _ in range(2)]
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for bucket in workers * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    # 6 token dengan burst 2 dan 10 token/detik: minimal 0.4s, bukan 0.2s seperti bucket per proses
+    assert time.monotonic() - started >= 0.35
+    assert sum(bucket.acquired for bucket in workers) == 6
+    assert workers[0].stats()["shared"] is True
+
+
+def test_shared_bucket_respects_max_wait(shared):
+    first, second = (app.TokenBucket(1, 0.1, shared_key="slow.example.com") for _ in range(2))
+    assert first.acquire(max_wait=1)
+    started = time.monotonic()
+    assert not second.acquire(max_wait=1)
+    assert time.monotonic() - started < 0.5
+    # Token tidak diambil saat timeout: bucket tetap di ~0, bukan berutang
+    assert second.stats()["tokens_available"] == pytest.approx(0, abs=0.05)
+
+
+def test_bucket_stays_local_without_shared_state(monkeypatch):
+    monkeypatch.setattr(app.shared_state, "enabled", False)
+    bucket = app.TokenBucket(1, 1, shared_key="api.example.com")
+    assert bucket.acquire() and not bucket.stats()["shared"]
+
+
+class RecordingOutbox:
+    """Pengganti telegram_outbox leader: catat pesan, kapasitas bisa diatur"""
+
+    def __init__(self, max_queue=1000):
+        self.max_queue = max_queue
+        self.messages = []
+
+    @property
+    def depth(self):
+        return len(self.messages)
+
+    def enqueue(self, text, chat_ids):
+        delivery = app.TelegramDelivery([text], chat_ids)
+        if self.depth < self.max_queue:
+            self.messages.append((text, list(chat_ids)))
+        else:
+            delivery.accepted = False
+            delivery.errors.append("Outbox penuh")
+        return delivery
+
+
+@pytest.fixture
+def cluster(tmp_path, monkeypatch):
+    """Relay leader & follower berbagi satu file shared state; role worker diatur lewat as_role()"""
+    outbox = RecordingOutbox()
+    monkeypatch.setattr(app, "TELEGRAM_BOT_TOKEN", "test-token")
+    monkeypatch.setattr(app, "TELEGRAM_CHAT_IDS", ["111"])
+    monkeypatch.setattr(app, "telegram_outbox", outbox)
+    monkeypatch.setattr(app, "webhook_ingestor", app.WebhookIngestor(window=0.1))
+    monkeypatch.setattr(app.leader_election, "role", "follower")
+    relay = app.LeaderRelay(open_store(tmp_path / "shared.db"), poll=0.02)
+    monkeypatch.setattr(app, "leader_relay", relay)
+
+    def as_role(role):
+        monkeypatch.setattr(app.leader_election, "role", role)
+
+    return relay, outbox, as_role
+
+
+def test_follower_telegram_messages_are_sent_by_leader_outbox(cluster):
+    relay, outbox, as_role = cluster
+    assert app.send_telegram_message("pesan 1") == (True, "Pesan masuk antrian Telegram leader")
+    app.send_telegram_message("pesan 2", chat_ids=["222"])
+    assert outbox.messages == []
+
+    as_role("leader")
+    assert relay.drain() == 2
+    assert outbox.messages == [("pesan 1", ["111"]), ("pesan 2", ["222"])]
+    assert relay.stats()["relayed_telegram"] == 2 and relay.stats()["queued_telegram"] == 0
+
+
+def test_leader_only_takes_what_its_outbox_can_hold(cluster):
+    relay, outbox, as_role = cluster
+    outbox.max_queue = 2
+    for i in range(5):
+        app.send_telegram_message(f"pesan {i}")
+    as_role("leader")
+    assert relay.drain() == 2
+    assert relay.stats()["queued_telegram"] == 3 and relay.stats()["dropped"] == 0
+    outbox.messages.clear()
+    relay.drain()
+    assert [text for text, _ in outbox.messages] == ["pesan 2", "pesan 3"]
+
+
+def test_wait_true_is_sent_locally_on_follower(cluster, monkeypatch):
+    relay, outbox, _ = cluster
+    monkeypatch.setattr(app.TelegramDelivery, "wait", lambda self, timeout=None: True)
+    app.send_telegram_message("diagnostik", wait=True)
+    assert outbox.messages == [("diagnostik", ["111"])]
+    assert relay.stats()["queued_telegram"] == 0
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_webhooks_from_all_workers_coalesce_on_leader(cluster):
+    relay, outbox, as_role = cluster
+    client = app.app.test_client()
+    for signal in ("BUY", "BUY", "TP1"):
+        response = client.post("/webhook/tradingview", json={"symbol": "BTCUSDT", "signal": signal})
+        assert response.status_code == 202 and response.get_json()["coalesced"] is None
+
+    as_role("leader")
+    assert client.post("/webhook/tradingview", json={"symbol": "BTCUSDT", "signal": "SL"}).status_code == 202
+    relay.drain()
+    assert wait_for(lambda: outbox.messages)
+    time.sleep(0.2)
+    [(message, _)] = outbox.messages
+    assert "🔁 4 alert digabung" in message and "📈 TP1" in message and "📈 SL" in message
+
+
+def test_follower_backpressure_follows_leader(cluster):
+    relay, outbox, as_role = cluster
+    app.webhook_ingestor.max_pending = 3
+    client = app.app.test_client()
+    for symbol in ("AAA", "BBB", "CCC"):
+        assert client.post("/webhook/tradingview", json={"symbol": symbol}).status_code == 202
+    # Antrian relay sudah max_pending alert: follower menjawab 429 seperti buffer leader yang penuh
+    rejected = client.post("/webhook/tradingview", json={"symbol": "DDD"})
+    assert rejected.status_code == 429 and rejected.headers["Retry-After"] == "1"
+
+    as_role("leader")
+    outbox.max_queue = 0
+    relay.publish_status()
+    as_role("follower")
+    saturated = client.post("/webhook/tradingview", json={"symbol": "EEE"})
+    assert saturated.status_code == 503 and saturated.headers["Retry-After"] == "30"
+
+
+def test_relay_thread_drains_queue(cluster):
+    relay, outbox, as_role = cluster
+    app.send_telegram_message("dari follower")
+    as_role("leader")
+    relay.start()
+    assert wait_for(lambda: outbox.messages == [("dari follower", ["111"])])
@@ -0,0 +1,121 @@
+"""SignalJournal: batch writer, trigger append-only, filter & limit endpoint /signals"""
+import sqlite3
+
+import pytest
+
+import app
+
+NOW = 1_760_000_000.0
+
+
+def stock(kode, entry=1000.0):
+    return app.StockSignal(kode, "Breakout positif", entry, entry * 1.02, entry * 1.04, entry * 0.98, 5e6,
+                           market_cap=100.0, change_pct=1.5)
+
+
+def crypto(symbol, confluence=0.67):
+    return app.CryptoSignal(symbol, symbol.title(), "Momentum", 1.0, 1.05, 1.1, 0.95, 2e7, 500.0,
+                            change_24h=4.2, indicators={"rsi": 61.5}, tech_signals=["MACD cross"],
+                            confluence=confluence)
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    journal = app.SignalJournal(str(tmp_path / "signals.db"))
+    monkeypatch.setattr(app, "signal_journal", journal)
+    return journal
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def record_at(journal, created_at, *args):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(app.time, "time", lambda: created_at)
+        return journal.record(*args)
+
+
+def test_batches_queued_together_are_written_in_one_pass(journal):
+    # Condition memakai RLock: selama dipegang, writer tidak bisa mengambil antrian
+    with journal.condition:
+        assert journal.record("idx", "PAGI", "🚀 YFinance", [stock("BBCA"), stock("BMRI")]) == 2
+        assert journal.record("idx", "SIANG", "🚀 YFinance", [stock("TLKM")]) == 1
+        assert journal.record("crypto", "MALAM", "CoinGecko", [crypto("BTC")]) == 1
+        assert journal.stats()["pending"] == 4
+    assert journal.flush(5)
+    stats = journal.stats()
+    assert stats["written"] == 4 and stats["batches"] == 3 and stats["pending"] == 0
+    assert stats["ready"] and stats["errors"] == 0
+
+
+def test_demo_and_empty_batches_are_not_recorded(journal):
+    assert journal.record("idx", "PAGI", "🔬 Demo Data", [stock("BBCA")]) == 0
+    assert journal.record("idx", "PAGI", "🚀 YFinance", []) == 0
+    assert journal.flush(1)
+    assert journal.recent() == [] and not journal.started
+
+
+def test_rows_are_append_only(journal):
+    journal.record("idx", "PAGI", "🚀 YFinance", [stock("BBCA")])
+    assert journal.flush(5)
+    conn = sqlite3.connect(journal.path)
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        conn.execute("UPDATE signals SET entry = 1")
+    with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+        conn.execute("DELETE FROM signals")
+    conn.close()
+    assert journal.recent()[0]["entry"] == 1000.0
+
+
+def test_crypto_details_round_trip(journal):
+    journal.record("crypto", "MALAM", "CoinGecko", [crypto("ETH")])
+    assert journal.flush(5)
+    [row] = journal.history("eth")
+    assert row["confluence"] == 0.67 and row["change_pct"] == 4.2
+    assert row["details"] == {"name": "Eth", "indicators": {"rsi": 61.5}, "tech_signals": ["MACD cross"]}
+
+
+@pytest.fixture
+def populated(journal, monkeypatch):
+    record_at(journal, NOW - 3 * 86400, "idx", "PAGI", "🚀 YFinance", [stock("BBCA", 900.0)])
+    record_at(journal, NOW - 2 * 3600, "idx", "SIANG", "🚀 YFinance", [stock("BBCA"), stock("TLKM")])
+    record_at(journal, NOW - 60, "crypto", "MALAM", "CoinGecko", [crypto("BTC")])
+    assert journal.flush(5)
+    monkeypatch.setattr(app.time, "time", lambda: NOW)
+    return journal
+
+
+def sessions(response):
+    # Urutan di dalam satu batch (created_at sama) tidak dijamin, jadi bandingkan per session
+    return [signal["session"] for signal in response.get_json()["signals"]]
+
+
+def test_recent_is_newest_first_with_filters(client, populated):
+    assert sessions(client.get("/signals")) == ["MALAM", "SIANG", "SIANG", "PAGI"]
+    assert sessions(client.get("/signals?market=idx")) == ["SIANG", "SIANG", "PAGI"]
+    siang = client.get("/signals?session=SIANG").get_json()["signals"]
+    assert sorted(signal["symbol"] for signal in siang) == ["BBCA", "TLKM"]
+    assert sessions(client.get("/signals?market=idx&hours=24")) == ["SIANG", "SIANG"]
+    assert sessions(client.get("/signals?market=crypto&session=PAGI")) == []
+
+
+def test_history_filters_by_symbol_and_days(client, populated):
+    response = client.get("/signals/bbca")
+    body = response.get_json()
+    assert body["symbol"] == "BBCA" and body["count"] == 2
+    assert [signal["entry"] for signal in body["signals"]] == [1000.0, 900.0]
+    assert [signal["session"] for signal in client.get("/signals/BBCA?days=1").get_json()["signals"]] == ["SIANG"]
+
+
+def test_limit_is_clamped(client, populated, monkeypatch):
+    assert len(client.get("/signals?limit=2").get_json()["signals"]) == 2
+    assert len(client.get("/signals?limit=0").get_json()["signals"]) == 1
+    monkeypatch.setattr(app, "SIGNAL_JOURNAL_MAX_LIMIT", 3)
+    assert client.get("/signals?limit=500").get_json()["count"] == 3
+
+
+def test_queries_before_first_write_are_empty(client, journal):
+    assert client.get("/signals").get_json() == {"status": "ok", "count": 0, "signals": []}
+    assert client.get("/signals/BTC").get_json()["count"] == 0
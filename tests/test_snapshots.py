@@ -0,0 +1,62 @@
+"""Refresher snapshot leader tetap lazy: mulai saat follower pertama kali meminta snapshot"""
+import time
+
+import pytest
+
+import app
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    shared = app.SharedStateStore(str(tmp_path / "shared.db"))
+    shared.enabled = True
+    monkeypatch.setattr(app, "SNAPSHOT_REQUEST_POLL", 0.05)
+    monkeypatch.setattr(app.leader_election, "role", "leader")
+    calls = []
+    leader, follower = app.SnapshotStore(shared=shared), app.SnapshotStore(shared=shared)
+    for store in (leader, follower):
+        store.register("idx", lambda: calls.append(1) or {"computed": len(calls)})
+    return leader, follower, calls, monkeypatch
+
+
+def as_follower(monkeypatch, fn, *args):
+    monkeypatch.setattr(app.leader_election, "role", "follower")
+    try:
+        return fn(*args)
+    finally:
+        monkeypatch.setattr(app.leader_election, "role", "leader")
+
+
+def test_leader_does_not_compute_until_requested(stores):
+    leader, follower, calls, monkeypatch = stores
+    leader.start_on_demand()
+    time.sleep(0.3)
+    assert not leader.started and calls == []
+
+    assert as_follower(monkeypatch, follower.get, "idx") is None
+    assert as_follower(monkeypatch, follower.request_refresh, "idx")
+    assert wait_for(lambda: calls)
+    assert wait_for(lambda: as_follower(monkeypatch, follower.get, "idx") is not None)
+    assert leader.started
+
+
+def test_follower_demands_refresh_of_stale_snapshot(stores):
+    leader, follower, calls, monkeypatch = stores
+    stale = time.time() - 3 * app.SNAPSHOT_REFRESH_INTERVAL
+    leader.shared.put("snapshot", "idx", {"version": 1, "data": {}, "updated_at": stale,
+                                          "updated_at_wib": "-", "compute_seconds": None,
+                                          "last_error": None}, updated_at=stale)
+    leader.start_on_demand()
+
+    snapshot = as_follower(monkeypatch, follower.get, "idx")
+    assert snapshot["version"] == 1
+    assert wait_for(lambda: calls)
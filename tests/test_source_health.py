@@ -0,0 +1,31 @@
+"""Circuit breaker sumber screening: hanya error yang dihitung gagal, hasil kosong tidak"""
+import app
+
+
+def empty_source():
+    return []
+
+
+def broken_source():
+    raise RuntimeError("down")
+
+
+def run(fetch_fn, market, times):
+    for _ in range(times):
+        list(app.run_fallback_tiers([("tier", fetch_fn, 0)], deadline=5, market=market))
+    return app.source_health.get(market, fetch_fn.__name__)
+
+
+def test_empty_results_keep_circuit_closed():
+    health = run(empty_source, "test-empty", app.HEALTH_FAILURE_THRESHOLD + 2)
+    snapshot = health.snapshot()
+    assert snapshot["state"] == app.SourceHealth.CLOSED
+    assert snapshot["consecutive_failures"] == 0
+    assert snapshot["success_rate"] == 1.0
+
+
+def test_errors_open_circuit():
+    health = run(broken_source, "test-error", app.HEALTH_FAILURE_THRESHOLD)
+    snapshot = health.snapshot()
+    assert snapshot["state"] == app.SourceHealth.OPEN
+    assert snapshot["last_failure"] == "error"
@@ -0,0 +1,186 @@
+"""split_telegram_html & TelegramOutbox: chunk HTML seimbang <= 4096, 429 retry_after, urutan per chat"""
+import json
+import re
+import threading
+import time
+
+import pytest
+import requests
+
+import app
+
+TAG_RE = re.compile(r"<(/?)([a-zA-Z0-9-]+)[^>]*>")
+
+
+def assert_balanced(chunk):
+    stack = []
+    for match in TAG_RE.finditer(chunk):
+        closing, name = match.group(1), match.group(2)
+        if closing:
+            assert stack and stack[-1] == name, chunk[:200]
+            stack.pop()
+        else:
+            stack.append(name)
+    assert stack == [], chunk[:200]
+
+
+def visible_text(html):
+    return re.sub(r"\s+", "", TAG_RE.sub("", html))
+
+
+def long_alert(rows=400):
+    lines = ["<b>📊 HYBRID SCALPER ALERT</b>", ""]
+    for i in range(rows):
+        lines.append(f"<b>{i}. BBCA</b> <i>Breakout &amp; volume naik</i> "
+                     f"<a href=\"https://www.tradingview.com/chart/?symbol=IDX:BBCA{i}\">chart</a>")
+        lines.append(f"Entry: <code>{9000 + i}</code> | TP1 <code>{9300 + i}</code>")
+        if i % 25 == 0:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def test_short_message_is_not_split():
+    assert app.split_telegram_html("<b>halo</b>") == ["<b>halo</b>"]
+
+
+@pytest.mark.parametrize("text", [
+    long_alert(),
+    "<b>" + "x" * 9000 + "</b>",  # satu kata panjang di dalam tag: hard split
+    "<b>Header</b>\n<i>" + " ".join(f"kata{i} &lt;{i}&gt;" for i in range(3000)) + "</i>",
+])
+def test_chunks_are_balanced_and_within_limit(text):
+    chunks = app.split_telegram_html(text)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= app.TELEGRAM_MAX_MESSAGE_LENGTH
+        assert_balanced(chunk)
+        # Entity tidak terpotong di tengah
+        assert not re.search(r"&[a-zA-Z0-9#]*$", chunk)
+    assert "".join(visible_text(chunk) for chunk in chunks) == visible_text(text)
+
+
+def telegram_response(status, body):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode()
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+class FakeTelegram:
+    """Pengganti http_client: catat (chat_id, text) per POST, status dari script per chat"""
+
+    def __init__(self, script=None, delay=0.0):
+        self.script = {chat: list(statuses) for chat, statuses in (script or {}).items()}
+        self.delay = delay
+        self.sent = []
+        self.inflight = {}
+        self.max_inflight = 0
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        chat_id = json["chat_id"]
+        with self.lock:
+            self.inflight[chat_id] = self.inflight.get(chat_id, 0) + 1
+            self.max_inflight = max(self.max_inflight, self.inflight[chat_id])
+            statuses = self.script.get(chat_id)
+            status = statuses.pop(0) if statuses else 200
+            self.sent.append((chat_id, json["text"], status))
+        time.sleep(self.delay)
+        with self.lock:
+            self.inflight[chat_id] -= 1
+        if status == 429:
+            return telegram_response(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}})
+        if status != 200:
+            return telegram_response(status, {"ok": False, "description": f"error {status}"})
+        return telegram_response(200, {"ok": True})
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(**kwargs):
+        telegram = FakeTelegram(**kwargs)
+        monkeypatch.setattr(app, "http_client", telegram)
+        return telegram
+    return install
+
+
+def outbox(**kwargs):
+    kwargs.setdefault("private_interval", 0.01)
+    kwargs.setdefault("group_interval", 0.01)
+    return app.TelegramOutbox(**kwargs)
+
+
+def test_429_requeues_after_retry_after_and_keeps_order(fake):
+    telegram = fake(script={"111": [429]})
+    box = outbox()
+    started = time.monotonic()
+    first, second = box.enqueue("pesan 1", ["111"]), box.enqueue("pesan 2", ["111"])
+    assert first.wait(5) and second.wait(5)
+    assert first.ok and second.ok
+    assert [(text, status) for _, text, status in telegram.sent] == [
+        ("pesan 1", 429), ("pesan 1", 200), ("pesan 2", 200)]
+    assert time.monotonic() - started >= 0.2
+    stats = box.stats()
+    assert stats["throttled"] == 1 and stats["sent"] == 2 and stats["depth"] == 0
+
+
+def test_throttled_chat_does_not_block_other_chats(fake):
+    telegram = fake(script={"111": [429]})
+    box = outbox()
+    slow, fast = box.enqueue("ke A", ["111"]), box.enqueue("ke B", ["222"])
+    assert fast.wait(5) and slow.wait(5)
+    delivered = [(chat, text) for chat, text, status in telegram.sent if status == 200]
+    assert delivered == [("222", "ke B"), ("111", "ke A")]
+
+
+def test_per_chat_order_with_many_workers(fake):
+    telegram = fake(delay=0.005)
+    box = outbox(workers=4)
+    deliveries = [box.enqueue(f"msg {i}", ["111", "-100222"]) for i in range(15)]
+    assert all(delivery.wait(10) for delivery in deliveries)
+    for chat in ("111", "-100222"):
+        assert [text for chat_id, text, _ in telegram.sent if chat_id == chat] == [f"msg {i}" for i in range(15)]
+    # Satu chat tidak pernah dikirim dua worker sekaligus
+    assert telegram.max_inflight == 1
+
+
+def test_split_parts_are_sent_in_order(fake):
+    telegram = fake()
+    box = outbox()
+    text = long_alert()
+    delivery = box.enqueue(text, ["111"])
+    assert delivery.wait(10) and delivery.ok
+    assert [sent for _, sent, _ in telegram.sent] == app.split_telegram_html(text)
+    assert delivery.sent == delivery.parts > 1
+
+
+def test_5xx_retries_then_gives_up(fake, monkeypatch):
+    monkeypatch.setattr(app.random, "uniform", lambda low, high: 0.0)
+    telegram = fake(script={"111": [503] * 10})
+    box = outbox(max_attempts=3)
+    delivery = box.enqueue("pesan", ["111"])
+    assert delivery.wait(5)
+    assert not delivery.ok and delivery.errors
+    assert len(telegram.sent) == 3
+    assert box.stats()["retried"] == 2 and box.stats()["failed"] == 1
+
+
+def test_4xx_is_not_retried(fake):
+    telegram = fake(script={"111": [400]})
+    box = outbox()
+    delivery = box.enqueue("<b>rusak", ["111"])
+    assert delivery.wait(5)
+    assert delivery.errors == ["error 400"]
+    assert len(telegram.sent) == 1
+
+
+def test_full_queue_rejects_without_sending(fake):
+    telegram = fake()
+    box = outbox(max_queue=2)
+    box.ensure_started = lambda: None  # Worker tidak jalan: antrian tetap terisi
+    assert box.enqueue("a", ["111", "222"]).accepted
+    rejected = box.enqueue("b", ["111"])
+    assert not rejected.accepted and rejected.event.is_set()
+    assert box.stats()["rejected"] == 1 and box.stats()["depth"] == 2
+    assert telegram.sent == []
@@ -0,0 +1,138 @@
+"""TTLCache: hit/stale-while-revalidate/expired, single-flight loader, LRU eviction"""
+import threading
+import time
+
+import pytest
+
+import app
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(app.time, "monotonic", clock)
+    return clock
+
+
+class Loader:
+    """Loader yang menghitung panggilan; gate opsional menahan load sampai dilepas"""
+
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.gate = gate
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            value = f"v{self.calls}"
+        if self.gate is not None:
+            self.gate.wait(5)
+        return value
+
+
+def wait_until(predicate, timeout=5):
+    # time.monotonic dipalsukan: batasi dengan jumlah iterasi sleep
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_fresh_entry_is_a_hit(clock):
+    cache = app.TTLCache("test_hit", ttl=10)
+    loader = Loader()
+    assert cache.get_or_load("k", loader) == "v1"
+    clock.now += 9.9
+    assert cache.get_or_load("k", loader) == "v1"
+    assert loader.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_entry_is_served_while_refreshing(clock):
+    cache = app.TTLCache("test_stale", ttl=10, stale_ttl=30)
+    gate = threading.Event()
+    loader = Loader()
+    cache.get_or_load("k", loader)
+
+    loader.gate = gate
+    clock.now += 15
+    # Nilai lama langsung dikembalikan walau refresh masih tertahan
+    assert cache.get_or_load("k", loader) == "v1"
+    assert cache.get_or_load("k", loader) == "v1"
+    assert wait_until(lambda: loader.calls == 2)
+    assert cache.stats()["stale_hits"] == 2
+
+    gate.set()
+    assert wait_until(lambda: not cache.inflight)
+    assert cache.get_or_load("k", loader) == "v2"
+    assert loader.calls == 2
+
+
+def test_expired_entry_is_loaded_synchronously(clock):
+    cache = app.TTLCache("test_expired", ttl=10, stale_ttl=30)
+    loader = Loader()
+    cache.get_or_load("k", loader)
+    clock.now += 40
+    assert cache.get_or_load("k", loader) == "v2"
+    assert cache.stats()["misses"] == 2 and cache.stats()["stale_hits"] == 0
+
+
+def test_concurrent_misses_share_one_load(clock):
+    cache = app.TTLCache("test_single_flight", ttl=10)
+    gate = threading.Event()
+    loader = Loader(gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert wait_until(lambda: cache.stats()["misses"] == 8)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["v1"] * 8
+    assert loader.calls == 1 and cache.stats()["loads"] == 1
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = app.TTLCache("test_lru", ttl=10, max_size=2)
+    cache.get_or_load("a", lambda: "A")
+    cache.get_or_load("b", lambda: "B")
+    cache.get_or_load("a", lambda: "A2")  # a jadi paling baru dipakai
+    cache.get_or_load("c", lambda: "C")
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_load("b", lambda: "B2") == "B2"
+
+
+def test_cache_if_skips_unwanted_values(clock):
+    cache = app.TTLCache("test_cache_if", ttl=10)
+    loader = Loader()
+    cache.get_or_load("k", lambda: None, cache_if=bool)
+    assert cache.get_or_load("k", loader, cache_if=bool) == "v1"
+    assert cache.get_or_load("k", loader, cache_if=bool) == "v1"
+    assert loader.calls == 1
+
+
+def test_cached_decorator_keys_on_positional_args(clock):
+    cache = app.TTLCache("test_decorator", ttl=10)
+    calls = []
+
+    @app.cached(cache)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert [square(2), square(3), square(2)] == [4, 9, 4]
+    assert calls == [2, 3]
+    assert square.cache is cache
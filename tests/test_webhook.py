@@ -0,0 +1,124 @@
+"""POST /webhook/tradingview: coalescing per symbol, 429 saat buffer penuh, 503 saat outbox Telegram jenuh"""
+import threading
+import time
+
+import pytest
+
+import app
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class Sent:
+    """Pengganti send_telegram_message: catat pesan gabungan yang di-flush dispatcher"""
+
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def __call__(self, text, chat_ids=None, wait=False, timeout=60):
+        with self.lock:
+            self.messages.append(text)
+        return True, "Pesan masuk antrian Telegram"
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    sent = Sent()
+    monkeypatch.setattr(app, "TELEGRAM_BOT_TOKEN", "test-token")
+    monkeypatch.setattr(app, "TELEGRAM_CHAT_IDS", ["111"])
+    monkeypatch.setattr(app, "send_telegram_message", sent)
+    return sent
+
+
+@pytest.fixture
+def ingestor(monkeypatch, sent):
+    def install(**kwargs):
+        ingestor = app.WebhookIngestor(**kwargs)
+        monkeypatch.setattr(app, "webhook_ingestor", ingestor)
+        return ingestor
+    return install
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def alert(client, symbol, signal="BUY"):
+    return client.post("/webhook/tradingview", json={"symbol": symbol, "signal": signal})
+
+
+def test_duplicate_alerts_are_coalesced_into_one_message(client, ingestor, sent):
+    hub = ingestor(window=0.3)
+    responses = [alert(client, "BTCUSDT", "BUY"), alert(client, "btcusdt", "BUY"),
+                 alert(client, "BTCUSDT", "TP1 hit"), alert(client, "ETHUSDT", "SELL")]
+    assert [r.status_code for r in responses] == [202] * 4
+    assert [r.get_json()["coalesced"] for r in responses] == [False, True, True, False]
+
+    assert wait_for(lambda: len(sent.messages) == 2)
+    btc, eth = sent.messages
+    assert "📊 BTCUSDT" in btc and btc.count("📈 BUY") == 1 and "📈 TP1 hit" in btc
+    assert "🔁 3 alert digabung" in btc
+    assert "📊 ETHUSDT" in eth and "digabung" not in eth
+    stats = hub.stats()
+    assert stats["accepted"] == 2 and stats["coalesced"] == 2 and stats["flushed"] == 2
+    assert stats["pending"] == 0
+
+
+def test_full_buffer_returns_429_with_retry_after(client, ingestor, sent):
+    hub = ingestor(window=60, max_pending=2)
+    assert alert(client, "AAA").status_code == 202
+    assert alert(client, "BBB").status_code == 202
+
+    rejected = alert(client, "CCC")
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "60"
+    # Symbol yang sudah pending tetap bisa digabung walau buffer penuh
+    assert alert(client, "AAA", "SELL").get_json()["coalesced"] is True
+    assert hub.stats()["rejected_full"] == 1 and sent.messages == []
+
+
+def test_saturated_telegram_outbox_returns_503(client, ingestor, monkeypatch):
+    hub = ingestor(window=60)
+    outbox = app.TelegramOutbox(max_queue=1)
+    outbox.ensure_started = lambda: None  # Worker tidak jalan: antrian tetap penuh
+    outbox.enqueue("backlog", ["111"])
+    monkeypatch.setattr(app, "telegram_outbox", outbox)
+
+    response = alert(client, "BTCUSDT")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+    assert hub.stats()["rejected_downstream"] == 1 and hub.stats()["pending"] == 0
+
+
+@pytest.mark.parametrize("payload,status", [
+    ({"symbol": ""}, 400),
+    ({"symbol": "X" * 41}, 400),
+    ({"symbol": "BTC", "signal": ["BUY"]}, 400),
+    ({"symbol": "BTC", "signal": "x" * (app.WEBHOOK_MAX_BODY + 1)}, 413),
+])
+def test_invalid_payload_is_rejected(client, ingestor, payload, status):
+    hub = ingestor(window=60)
+    assert client.post("/webhook/tradingview", json=payload).status_code == status
+    assert hub.stats()["pending"] == 0
+
+
+def test_signal_is_html_escaped(client, ingestor, sent):
+    ingestor(window=0.05)
+    assert alert(client, "<BTC>", "RSI < 30 & naik").status_code == 202
+    assert wait_for(lambda: sent.messages)
+    assert "📊 &lt;BTC&gt;" in sent.messages[0] and "📈 RSI &lt; 30 &amp; naik" in sent.messages[0]
+
+
+def test_missing_telegram_config_returns_503(client, ingestor, monkeypatch):
+    ingestor(window=60)
+    monkeypatch.setattr(app, "TELEGRAM_BOT_TOKEN", "")
+    assert alert(client, "BTCUSDT").status_code == 503